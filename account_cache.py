@@ -0,0 +1,125 @@
+# account_cache.py
+
+"""
+Short-TTL read-through cache for balance and transaction lookups.
+
+Entries are keyed per user, per account and per kind ("balance", "transactions")
+and live for ACCOUNT_CACHE_TTL_S seconds. Any transfer or bill payment touching an
+account drops its entries, so a balance asked right after a payment is never stale.
+Storage is the shared KV backend (Redis when REDIS_URL is set), so every action
+server process sees the same entries and the same invalidations.
+
+The Redis client is synchronous, so the async entry points (read_through,
+ainvalidate) run each Redis call in a worker thread instead of blocking the
+event loop on a network round-trip. LocalKV is in-process and is called directly.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Text
+
+from shared_kv import LocalKV, get_kv
+
+
+# Basic config
+ACCOUNT_CACHE_TTL_S = float(os.getenv("ACCOUNT_CACHE_TTL_S", "20"))
+ACCOUNT_CACHE_ENABLED = os.getenv("ACCOUNT_CACHE_ENABLED", "1") == "1"
+
+CACHED_KINDS = ("balance", "transactions")
+_KEY_PREFIX = "acct_cache"
+
+
+class AccountCache:
+    """Per-user, per-account read-through cache over the shared KV backend."""
+
+    def __init__(self, kv=None, ttl_s: float = ACCOUNT_CACHE_TTL_S, enabled: bool = ACCOUNT_CACHE_ENABLED):
+        self._kv = kv
+        self.ttl_s = ttl_s
+        self.enabled = enabled and ttl_s > 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def kv(self):
+        if self._kv is None:
+            self._kv = get_kv()
+        return self._kv
+
+    @property
+    def shared(self) -> bool:
+        """True when entries live in Redis, where every process sees the same invalidations."""
+        return not isinstance(self.kv, LocalKV)
+
+    @staticmethod
+    def _key(kind: Text, user_id: Text, account_id: Text) -> Text:
+        return f"{_KEY_PREFIX}:{user_id}:{account_id}:{kind}"
+
+    def get(self, kind: Text, user_id: Text, account_id: Text) -> Optional[Dict[Text, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            raw = self.kv.get(self._key(kind, user_id, account_id))
+        except Exception as e:
+            # A cache outage must never fail a banking turn
+            print(f"[ACCT_CACHE] get failed: {e!r}")
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, kind: Text, user_id: Text, account_id: Text, data: Dict[Text, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            # Redis only takes whole seconds for ex (redis-py rejects floats)
+            self.kv.set(self._key(kind, user_id, account_id), json.dumps(data), ex=max(1, int(self.ttl_s)))
+        except Exception as e:
+            print(f"[ACCT_CACHE] set failed: {e!r}")
+
+    def invalidate(self, user_id: Text, *account_ids: Optional[Text]) -> None:
+        """Drop every cached kind for the given accounts of one user."""
+        keys = [
+            self._key(kind, user_id, account_id)
+            for account_id in account_ids if account_id
+            for kind in CACHED_KINDS
+        ]
+        if not keys:
+            return
+        try:
+            self.kv.delete(*keys)
+            print(f"[ACCT_CACHE] Invalidated {', '.join(a for a in account_ids if a)} for user {user_id}")
+        except Exception as e:
+            print(f"[ACCT_CACHE] invalidate failed: {e!r}")
+
+    async def _offload(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a cache call off the event loop when it goes over the network."""
+        if self.shared:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def ainvalidate(self, user_id: Text, *account_ids: Optional[Text]) -> None:
+        """invalidate() for async callers."""
+        await self._offload(self.invalidate, user_id, *account_ids)
+
+    async def read_through(
+        self,
+        kind: Text,
+        user_id: Text,
+        account_id: Text,
+        fetch: Callable[[], Awaitable[Dict[Text, Any]]],
+    ) -> Dict[Text, Any]:
+        """Cached value if fresh, else fetch, store and return it (failures are not cached)."""
+        cached = await self._offload(self.get, kind, user_id, account_id)
+        if cached is not None:
+            self.hits += 1
+            print(f"[ACCT_CACHE] {kind} hit for {user_id}/{account_id}")
+            return cached
+
+        self.misses += 1
+        data = await fetch()
+        await self._offload(self.set, kind, user_id, account_id, data)
+        return data
+
+    def stats(self) -> Dict[Text, Any]:
+        return {"enabled": self.enabled, "ttl_s": self.ttl_s, "hits": self.hits, "misses": self.misses}
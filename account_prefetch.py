@@ -0,0 +1,122 @@
+# account_prefetch.py
+
+"""
+Speculative account prefetch for the voice gateway.
+
+The sender is known as soon as a voice turn arrives, and most turns ask for the
+balance or recent transactions. The gateway starts both lookups while ASR is
+still running, and hands whatever finished to Rasa in the message metadata
+under "prefetch". The balance and transactions actions use that data only if it
+is for the same user and account and is still fresh. Every other action ignores
+it. Lookups that are not done when the turn reaches Rasa are cancelled.
+
+With REDIS_URL set, prefetches read through the shared account cache, so they
+see the action server's entries and its invalidations after a transfer. Without
+it the gateway's cache is per-process and would miss those invalidations, so
+prefetches go straight to the bank. That costs one balance and one transactions
+call per voice turn, whatever the intent. Narrow PREFETCH_KINDS or set
+PREFETCH_ENABLED=0 if the bank's rate limit matters more than the latency.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Text
+
+from banking_client import BankingClient
+
+
+# Basic config
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_ACCOUNT = os.getenv("PREFETCH_ACCOUNT", "acct_savings_1")  # same default the actions use
+PREFETCH_KINDS = [k.strip() for k in os.getenv("PREFETCH_KINDS", "balance,transactions").split(",") if k.strip()]
+PREFETCH_WAIT_MS = int(os.getenv("PREFETCH_WAIT_MS", "150"))  # extra wait after ASR before giving up
+PREFETCH_MAX_AGE_S = float(os.getenv("PREFETCH_MAX_AGE_S", "20"))
+
+
+class AccountPrefetch:
+    """Balance / transaction lookups for one turn, started before the intent is known."""
+
+    def __init__(self, client: BankingClient, user_id: Text, auth: Dict[Text, Any], account_id: Text = PREFETCH_ACCOUNT):
+        self.client = client
+        self.user_id = user_id
+        self.auth = auth
+        self.account_id = account_id
+        self.started_at = time.time()
+        self._tasks: Dict[Text, asyncio.Task] = {}
+        self._fetched_at: Dict[Text, float] = {}
+
+    async def _fetch(self, kind: Text, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        cache = self.client.cache
+        if cache.enabled and cache.shared:
+            getter = self.client.get_balance if kind == "balance" else self.client.get_transactions
+            data = await getter(payload)
+        else:
+            # A per-process cache would miss transfer invalidations: go to the bank
+            data = await self.client.post(kind, payload)
+        self._fetched_at[kind] = time.time()
+        return data
+
+    def start(self) -> "AccountPrefetch":
+        payloads = {
+            "balance": {"user_id": self.user_id, "account_id": self.account_id, "auth": self.auth},
+            "transactions": {"user_id": self.user_id, "from_account": self.account_id, "auth": self.auth},
+        }
+        for kind in PREFETCH_KINDS:
+            if kind in payloads:
+                self._tasks[kind] = asyncio.create_task(self._fetch(kind, payloads[kind]))
+        return self
+
+    async def collect(self, wait_ms: int = PREFETCH_WAIT_MS) -> Optional[Dict[Text, Any]]:
+        """Finished results as a metadata block (None if nothing finished); cancels the rest."""
+        if not self._tasks:
+            return None
+
+        pending = [t for t in self._tasks.values() if not t.done()]
+        if pending and wait_ms > 0:
+            await asyncio.wait(pending, timeout=wait_ms / 1000.0)
+
+        block: Dict[Text, Any] = {
+            "user_id": self.user_id,
+            "account_id": self.account_id,
+        }
+        for kind, task in self._tasks.items():
+            if not task.done():
+                task.cancel()
+                print(f"[PREFETCH] {kind} not ready in time, dropped")
+            elif task.cancelled():
+                continue
+            elif task.exception() is not None:
+                print(f"[PREFETCH] {kind} failed: {task.exception()!r}")
+            else:
+                block[kind] = task.result()
+
+        kinds = [kind for kind in self._tasks if kind in block]
+        if not kinds:
+            return None
+        # The oldest response decides freshness for the whole block
+        block["fetched_at"] = min(self._fetched_at[kind] for kind in kinds)
+        return block
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
+def use_prefetched(
+    metadata: Dict[Text, Any],
+    kind: Text,
+    user_id: Text,
+    account_id: Text,
+    max_age_s: float = PREFETCH_MAX_AGE_S,
+) -> Optional[Dict[Text, Any]]:
+    """Prefetched data of one kind if it is for this user/account and fresh, else None."""
+    block = (metadata or {}).get("prefetch")
+    if not isinstance(block, dict) or kind not in block:
+        return None
+    if block.get("user_id") != user_id or block.get("account_id") != account_id:
+        return None
+    if time.time() - float(block.get("fetched_at", 0)) > max_age_s:
+        return None
+    print(f"[PREFETCH] Using prefetched {kind} for {user_id}/{account_id}")
+    return block[kind]
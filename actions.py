@@ -3,65 +3,59 @@ from typing import Any, Text, Dict, List, Optional
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
+import asyncio
+import contextvars
 import os
-import requests
-from gtts import gTTS
-import random
-import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from banking_client import banking_client
+from account_prefetch import use_prefetched
+from otp_store import OTPRateLimited, get_otp_store
+from number_parser import extract_amount
+from telemetry import span, start_metrics_server, traced_action
+from tts_backends import get_synthesizer
+from tts_cache import TTSCache
+from tts_segments import concat_audio, template_pieces
+from tts_store import TTSStore
+from tts_warmup import warm_templates
 
 
 # Basic config
-SECURE_API_BASE = os.getenv("SECURE_API_BASE", "http://127.0.0.1:8001")
 TTS_OUTPUT_DIR = "tts_responses"
 os.makedirs(TTS_OUTPUT_DIR, exist_ok=True)
+tts_synth = get_synthesizer()  # TTS_BACKEND=gtts|mms
+TTS_VOICE = tts_synth.voice  # part of the cache key
+
+tts_store = TTSStore(TTS_OUTPUT_DIR)
+tts_store.start_sweeper()
+tts_cache = TTSCache(tts_store.cache_dir(), ext=tts_synth.ext)
+
+# Stage histograms for this process (see telemetry.py); 0 = off
+ACTION_METRICS_PORT = int(os.getenv("ACTION_METRICS_PORT", "0"))
+if ACTION_METRICS_PORT:
+    start_metrics_server(ACTION_METRICS_PORT)
 
 
 # OTP settings
-OTP_STORE = {}  # In-memory only; use Redis or DB in production
+otp_store = get_otp_store()  # OTP_BACKEND=memory|shared, see otp_store.py
 OTP_THRESHOLD_AMOUNT = 5000  # Ask OTP for transfers above this
 
 
 def generate_otp(user_id: str) -> str:
-    """Create a 6-digit OTP and store it with basic metadata."""
-    otp = str(random.randint(100000, 999999))
-    OTP_STORE[user_id] = {
-        "otp": otp,
-        "timestamp": time.time(),
-        "attempts": 0,
-        "max_attempts": 3
-    }
-    print(f"[OTP] Generated {otp} for user {user_id}")
+    """Create a 6-digit OTP for the user (raises OTPRateLimited when asked too often)."""
+    otp = otp_store.generate(user_id)
+    print(f"[OTP] Generated OTP for user {user_id}")
     return otp
 
 
 def verify_otp(user_id: str, provided_otp: str) -> bool:
-    """Check OTP with 5-min expiry and limited attempts."""
-    if user_id not in OTP_STORE:
-        print(f"[OTP] No OTP found for user {user_id}")
-        return False
-    
-    stored = OTP_STORE[user_id]
-    
-    # 5 minutes expiry
-    if time.time() - stored["timestamp"] > 300:
-        print(f"[OTP] OTP expired for user {user_id}")
-        del OTP_STORE[user_id]
-        return False
-    
-    if stored["attempts"] >= stored["max_attempts"]:
-        print(f"[OTP] Max attempts exceeded for user {user_id}")
-        del OTP_STORE[user_id]
-        return False
-    
-    if stored["otp"] == provided_otp:
+    """Check the OTP with expiry and limited attempts; a correct OTP is consumed."""
+    if otp_store.verify(user_id, provided_otp):
         print(f"[OTP] OTP verified successfully for user {user_id}")
-        del OTP_STORE[user_id]
         return True
-    else:
-        OTP_STORE[user_id]["attempts"] += 1
-        remaining = stored["max_attempts"] - OTP_STORE[user_id]["attempts"]
-        print(f"[OTP] Invalid OTP for user {user_id}. {remaining} attempts remaining")
-        return False
+    return False
 
 
 def send_otp_sms(user_id: str, otp: str):
@@ -129,6 +123,16 @@ TEMPLATES = {
         "te": "తప్పు OTP. దయచేసి మళ్లీ ప్రయత్నించండి లేదా కొత్త OTP కోరండి.",
         "en": "Incorrect OTP. Please try again or request a new OTP."
     },
+    # Too many OTP requests
+    "otp_rate_limited": {
+        "hi": "बहुत अधिक OTP अनुरोध। कृपया कुछ मिनट बाद फिर से कोशिश करें।",
+        "bn": "অনেক বেশি OTP অনুরোধ। অনুগ্রহ করে কয়েক মিনিট পরে আবার চেষ্টা করুন।",
+        "mr": "खूप जास्त OTP विनंत्या। कृपया काही मिनिटांनी पुन्हा प्रयत्न करा।",
+        "or": "ବହୁତ ଅଧିକ OTP ଅନୁରୋଧ। ଦୟାକରି କିଛି ମିନିଟ୍ ପରେ ପୁନର୍ବାର ଚେଷ୍ଟା କରନ୍ତୁ।",
+        "ta": "அதிகமான OTP கோரிக்கைகள். சில நிமிடங்கள் கழித்து மீண்டும் முயற்சிக்கவும்.",
+        "te": "చాలా ఎక్కువ OTP అభ్యర్థనలు. దయచేసి కొన్ని నిమిషాల తర్వాత మళ్లీ ప్రయత్నించండి.",
+        "en": "Too many OTP requests. Please try again in a few minutes."
+    },
     "transfer_success": {
         "hi": "{amount} रुपये {from_account} से {to_account} में सफलतापूर्वक भेजे गए। ट्रांजेक्शन आईडी {tx_id}।",
         "bn": "{amount} টাকা {from_account} থেকে {to_account} এ সফলভাবে পাঠানো হয়েছে। লেনদেন আইডি {tx_id}।",
@@ -267,7 +271,7 @@ def get_template(action: Text, lang: Text) -> Text:
 
 
 def _map_lang_to_tts(lang: Text) -> Text:
-    """Map internal lang codes to gTTS codes."""
+    """Map internal lang codes to synthesizer codes."""
     mapping = {
         "hi": "hi",
         "bn": "bn",
@@ -280,21 +284,135 @@ def _map_lang_to_tts(lang: Text) -> Text:
     return mapping.get(lang, "hi")
 
 
-def synthesize_tts(text: Text, lang: Text, action_name: Text) -> Text:
-    """Generate an mp3 file for the reply and return its path."""
+def _synthesize_file(text: Text, tts_lang: Text, action_name: Text, out_path: Text) -> None:
+    print(f"[TTS] Synthesizing {action_name} ({tts_lang})")
+    with span("tts_synthesize"):
+        tts_synth.synthesize(text, tts_lang, out_path)
+
+
+def synthesize_tts(
+    text: Text,
+    lang: Text,
+    action_name: Text,
+    session_id: Optional[Text] = None,
+) -> Text:
+    """
+    Return an audio path for the reply.
+
+    Replies that carry account data pass session_id: they get a unique per-session
+    file that expires in the background. Everything else is shared through the cache.
+    """
     tts_lang = _map_lang_to_tts(lang)
-    filename = f"{action_name}_{lang}.mp3"
-    out_path = os.path.join(TTS_OUTPUT_DIR, filename)
-    
+
+    def _synthesize(out_path: Text) -> None:
+        _synthesize_file(text, tts_lang, action_name, out_path)
+
     try:
-        tts = gTTS(text=text, lang=tts_lang)
-        tts.save(out_path)
-        return out_path
+        if session_id:
+            return tts_store.atomic_write(
+                tts_store.new_session_path(session_id, tts_synth.ext), _synthesize
+            )
+        return tts_cache.get_or_create(text, tts_lang, TTS_VOICE, _synthesize)
     except Exception as e:
         print(f"[TTS ERROR] {e}")
         return ""
 
 
+# Prebuilt audio for static templates (see tts_warmup.py)
+TTS_WARMUP_ON_START = os.getenv("TTS_WARMUP_ON_START", "1") == "1"
+
+
+def _warm_up_templates() -> None:
+    try:
+        warm_templates(TEMPLATES, synthesize_tts, voice=TTS_VOICE)
+    except Exception as e:
+        print("[TTS_WARMUP ERROR]", repr(e))
+
+
+def template_tts(template_name: Text, lang: Text, action_name: Text) -> Text:
+    """
+    Audio path for a static template: prebuilt if warmed up, synthesized otherwise.
+
+    Looked up in the cache by the template's current text, so an edited template
+    never gets the audio of its old wording.
+    """
+    with span("tts"):
+        return synthesize_tts(get_template(template_name, lang), lang, action_name)
+
+
+# Segmented TTS for templated replies (see tts_segments.py)
+TTS_SEGMENTED = os.getenv("TTS_SEGMENTED", "1") == "1"
+TTS_SEGMENT_WORKERS = int(os.getenv("TTS_SEGMENT_WORKERS", "4"))  # pieces synthesized at once
+_segment_pool = ThreadPoolExecutor(max_workers=TTS_SEGMENT_WORKERS, thread_name_prefix="tts-segment")
+
+
+def segmented_tts(
+    parts: List[tuple],
+    lang: Text,
+    action_name: Text,
+    session_id: Text,
+) -> Text:
+    """
+    Audio for a templated reply built from cached pieces.
+
+    parts is a list of (template_name, values). Fixed text comes from (or is added
+    to) the shared cache. Slot values are account data, so they are synthesized into
+    a private scratch dir and never cached. Missing pieces are synthesized
+    concurrently, then joined into a per-session file.
+    """
+    with span("tts"):
+        return _segmented_tts(parts, lang, action_name, session_id)
+
+
+def _segmented_tts(parts: List[tuple], lang: Text, action_name: Text, session_id: Text) -> Text:
+    full_text = " ".join(get_template(name, lang).format(**values) for name, values in parts)
+    if not TTS_SEGMENTED:
+        return synthesize_tts(full_text, lang, action_name, session_id=session_id)
+
+    pieces = []
+    for name, values in parts:
+        pieces.extend(template_pieces(get_template(name, lang), values))
+
+    tts_lang = _map_lang_to_tts(lang)
+    segment_name = f"{action_name}_segment"
+
+    # Outside tts_responses/, which the gateway serves publicly
+    with tempfile.TemporaryDirectory(prefix="sahayaa-tts-") as scratch:
+
+        def _piece_audio(index: int, text: Text, is_value: bool) -> Text:
+            if not is_value:
+                return synthesize_tts(text, lang, segment_name)
+            out_path = os.path.join(scratch, f"{index}.{tts_synth.ext}")
+            try:
+                _synthesize_file(text, tts_lang, segment_name, out_path)
+                return out_path
+            except Exception as e:
+                print(f"[TTS ERROR] {e}")
+                return ""
+
+        # One context copy per task, so stage timings land in this turn's trace
+        futures = [
+            _segment_pool.submit(contextvars.copy_context().run, _piece_audio, i, text, is_value)
+            for i, (text, is_value) in enumerate(pieces)
+        ]
+        paths = [f.result() for f in futures]
+
+        if paths and all(paths):
+            try:
+                return tts_store.atomic_write(
+                    tts_store.new_session_path(session_id, tts_synth.ext),
+                    lambda tmp_path: concat_audio(paths, tmp_path, tts_synth.ext),
+                )
+            except Exception as e:
+                print(f"[TTS ERROR] segment join failed for {action_name}: {e}")
+
+    return synthesize_tts(full_text, lang, action_name, session_id=session_id)
+
+
+if TTS_WARMUP_ON_START:
+    threading.Thread(target=_warm_up_templates, name="tts-warmup", daemon=True).start()
+
+
 def _get_auth_from_metadata(tracker: Tracker) -> Dict[Text, Any]:
     """Read auth block from message metadata; fall back to sender_id."""
     meta = tracker.latest_message.get("metadata") or {}
@@ -310,13 +428,19 @@ def _get_lang_from_metadata(tracker: Tracker) -> Text:
     return meta.get("lang", "hi")
 
 
+def _get_prefetched(tracker: Tracker, kind: Text, user_id: Text, account_id: Text) -> Optional[Dict[Text, Any]]:
+    """Gateway-prefetched account data for this turn, if it matches and is fresh."""
+    return use_prefetched(tracker.latest_message.get("metadata") or {}, kind, user_id, account_id)
+
+
 # Rasa actions
 class ActionCheckBalance(Action):
     def name(self) -> Text:
         return "action_check_balance"
 
 
-    def run(
+    @traced_action
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -335,16 +459,19 @@ class ActionCheckBalance(Action):
         }
 
         try:
-            resp = requests.post(f"{SECURE_API_BASE}/balance/", json=payload, timeout=5)
-            resp.raise_for_status()
-            data = resp.json()
+            data = _get_prefetched(tracker, "balance", user_id, account_id)
+            if data is None:
+                data = await banking_client.get_balance(payload)
             balance = data.get("balance")
             currency = data.get("currency", "INR")
 
+            values = {"account_id": account_id, "balance": balance, "currency": currency}
             template = get_template("balance", lang)
-            bot_text = template.format(account_id=account_id, balance=balance, currency=currency)
+            bot_text = template.format(**values)
             
-            audio_path = synthesize_tts(bot_text, lang, "balance_reply")
+            audio_path = await asyncio.to_thread(
+                segmented_tts, [("balance", values)], lang, "balance_reply", tracker.sender_id
+            )
             
             if audio_path:
                 dispatcher.utter_message(
@@ -366,7 +493,7 @@ class ActionCheckBalance(Action):
             error_text = get_template("error_balance", lang)
             dispatcher.utter_message(text=error_text)
             
-            audio_path = synthesize_tts(error_text, lang, "balance_error")
+            audio_path = await asyncio.to_thread(template_tts, "error_balance", lang, "balance_error")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -384,7 +511,8 @@ class ActionMakeTransfer(Action):
         return "action_make_transfer"
 
 
-    def run(
+    @traced_action
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -405,9 +533,9 @@ class ActionMakeTransfer(Action):
             user_message = tracker.latest_message.get('text', '')
             print(f"[DEBUG] Slot empty, extracting from text: {user_message}")
 
-            numbers = re.findall(r'\d+', user_message)
-            if numbers:
-                amount = numbers[0]
+            extracted = extract_amount(user_message, lang)
+            if extracted is not None:
+                amount = extracted
                 print(f"[DEBUG] Extracted amount from text: {amount}")
             else:
                 amount = 500
@@ -438,13 +566,27 @@ class ActionMakeTransfer(Action):
             if not otp_verified:
                 print(f"[OTP] Amount {amount} > {OTP_THRESHOLD_AMOUNT}, requesting OTP")
                 
-                otp = generate_otp(user_id)
+                try:
+                    otp = generate_otp(user_id)
+                except OTPRateLimited as e:
+                    print(f"[OTP] {e}")
+                    dispatcher.utter_message(text=get_template("otp_rate_limited", lang))
+                    audio_path = await asyncio.to_thread(template_tts, "otp_rate_limited", lang, "otp_rate_limited")
+                    if audio_path:
+                        dispatcher.utter_message(
+                            json_message={
+                                "type": "audio_reply",
+                                "audio_file": audio_path,
+                                "lang": lang
+                            }
+                        )
+                    return [SlotSet("awaiting_otp", False)]
                 send_otp_sms(user_id, otp)
                 
                 bot_text = get_template("otp_required", lang)
                 dispatcher.utter_message(text=bot_text)
                 
-                audio_path = synthesize_tts(bot_text, lang, "otp_request")
+                audio_path = await asyncio.to_thread(template_tts, "otp_required", lang, "otp_request")
                 if audio_path:
                     dispatcher.utter_message(
                         json_message={
@@ -476,22 +618,23 @@ class ActionMakeTransfer(Action):
 
         try:
             print(f"[TRANSFER] Initiating transfer: {amount} {currency} from {from_account} to {to_account}")
-            resp = requests.post(f"{SECURE_API_BASE}/transfer/", json=payload, timeout=8)
-            resp.raise_for_status()
-            data = resp.json()
+            data = await banking_client.transfer(payload)
             tx_id = data.get("tx_id", "N/A")
 
+            values = {
+                "amount": int(amount),
+                "from_account": from_account,
+                "to_account": to_account,
+                "tx_id": tx_id,
+            }
             template = get_template("transfer_success", lang)
-            bot_text = template.format(
-                amount=int(amount),
-                from_account=from_account,
-                to_account=to_account,
-                tx_id=tx_id
-            )
+            bot_text = template.format(**values)
             
             dispatcher.utter_message(text=bot_text)
             
-            audio_path = synthesize_tts(bot_text, lang, "transfer_reply")
+            audio_path = await asyncio.to_thread(
+                segmented_tts, [("transfer_success", values)], lang, "transfer_reply", tracker.sender_id
+            )
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -522,7 +665,7 @@ class ActionMakeTransfer(Action):
             error_text = get_template("error_transfer", lang)
             dispatcher.utter_message(text=error_text)
             
-            audio_path = synthesize_tts(error_text, lang, "transfer_error")
+            audio_path = await asyncio.to_thread(template_tts, "error_transfer", lang, "transfer_error")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -539,6 +682,7 @@ class ActionVerifyOTP(Action):
         return "action_verify_otp"
 
 
+    @traced_action
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -559,7 +703,7 @@ class ActionVerifyOTP(Action):
             bot_text = get_template("otp_verified", lang)
             dispatcher.utter_message(text=bot_text)
             
-            audio_path = synthesize_tts(bot_text, lang, "otp_success")
+            audio_path = template_tts("otp_verified", lang, "otp_success")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -586,7 +730,7 @@ class ActionVerifyOTP(Action):
             bot_text = get_template("otp_failed", lang)
             dispatcher.utter_message(text=bot_text)
             
-            audio_path = synthesize_tts(bot_text, lang, "otp_failed")
+            audio_path = template_tts("otp_failed", lang, "otp_failed")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -606,7 +750,8 @@ class ActionGetTransactions(Action):
         return "action_get_transactions"
 
 
-    def run(
+    @traced_action
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -625,17 +770,20 @@ class ActionGetTransactions(Action):
         }
 
         try:
-            resp = requests.post(f"{SECURE_API_BASE}/transactions/", json=payload, timeout=8)
-            resp.raise_for_status()
-            data = resp.json()
+            data = _get_prefetched(tracker, "transactions", user_id, from_account)
+            if data is None:
+                data = await banking_client.get_transactions(payload)
             items = data.get("items", [])
 
             if not items:
+                values = {"from_account": from_account}
                 template = get_template("transactions_empty", lang)
-                bot_text = template.format(from_account=from_account)
+                bot_text = template.format(**values)
                 dispatcher.utter_message(text=bot_text)
                 
-                audio_path = synthesize_tts(bot_text, lang, "transactions_empty")
+                audio_path = await asyncio.to_thread(
+                    segmented_tts, [("transactions_empty", values)], lang, "transactions_empty", tracker.sender_id
+                )
                 if audio_path:
                     dispatcher.utter_message(
                         json_message={
@@ -650,18 +798,22 @@ class ActionGetTransactions(Action):
             item_template = get_template("transaction_item", lang)
             
             lines = [header]
+            parts = [("transactions_header", {})]
             for tx in items[:3]:
-                line = item_template.format(
-                    amount=tx.get("amount"),
-                    to_account=tx.get("to_account"),
-                    created_at=tx.get("created_at")
-                )
-                lines.append(line)
+                values = {
+                    "amount": tx.get("amount"),
+                    "to_account": tx.get("to_account"),
+                    "created_at": tx.get("created_at"),
+                }
+                lines.append(item_template.format(**values))
+                parts.append(("transaction_item", values))
             
             bot_text = " ".join(lines)
             dispatcher.utter_message(text=bot_text)
             
-            audio_path = synthesize_tts(bot_text, lang, "transactions_reply")
+            audio_path = await asyncio.to_thread(
+                segmented_tts, parts, lang, "transactions_reply", tracker.sender_id
+            )
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -679,7 +831,7 @@ class ActionGetTransactions(Action):
             error_text = get_template("error_transactions", lang)
             dispatcher.utter_message(text=error_text)
             
-            audio_path = synthesize_tts(error_text, lang, "transactions_error")
+            audio_path = await asyncio.to_thread(template_tts, "error_transactions", lang, "transactions_error")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -697,7 +849,8 @@ class ActionPayBill(Action):
         return "action_pay_bill"
 
 
-    def run(
+    @traced_action
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
@@ -722,21 +875,18 @@ class ActionPayBill(Action):
         }
 
         try:
-            resp = requests.post(f"{SECURE_API_BASE}/paybill/", json=payload, timeout=8)
-            resp.raise_for_status()
-            data = resp.json()
+            data = await banking_client.pay_bill(payload)
             tx_id = data.get("tx_id", "N/A")
 
+            values = {"amount": amount, "from_account": from_account, "tx_id": tx_id}
             template = get_template("bill_payment_success", lang)
-            bot_text = template.format(
-                amount=amount,
-                from_account=from_account,
-                tx_id=tx_id
-            )
+            bot_text = template.format(**values)
             
             dispatcher.utter_message(text=bot_text)
             
-            audio_path = synthesize_tts(bot_text, lang, "paybill_reply")
+            audio_path = await asyncio.to_thread(
+                segmented_tts, [("bill_payment_success", values)], lang, "paybill_reply", tracker.sender_id
+            )
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -757,7 +907,7 @@ class ActionPayBill(Action):
             error_text = get_template("error_bill_payment", lang)
             dispatcher.utter_message(text=error_text)
             
-            audio_path = synthesize_tts(error_text, lang, "paybill_error")
+            audio_path = await asyncio.to_thread(template_tts, "error_bill_payment", lang, "paybill_error")
             if audio_path:
                 dispatcher.utter_message(
                     json_message={
@@ -775,6 +925,7 @@ class ActionLoanInfo(Action):
         return "action_loan_info"
 
 
+    @traced_action
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -787,7 +938,7 @@ class ActionLoanInfo(Action):
         
         dispatcher.utter_message(text=bot_text)
         
-        audio_path = synthesize_tts(bot_text, lang, "loan_info_reply")
+        audio_path = template_tts("loan_info", lang, "loan_info_reply")
         if audio_path:
             dispatcher.utter_message(
                 json_message={
@@ -805,6 +956,7 @@ class ActionCreditLimit(Action):
         return "action_credit_limit"
 
 
+    @traced_action
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -817,7 +969,7 @@ class ActionCreditLimit(Action):
         
         dispatcher.utter_message(text=bot_text)
         
-        audio_path = synthesize_tts(bot_text, lang, "credit_limit_reply")
+        audio_path = template_tts("credit_limit", lang, "credit_limit_reply")
         if audio_path:
             dispatcher.utter_message(
                 json_message={
@@ -835,6 +987,7 @@ class ActionSetReminder(Action):
         return "action_set_reminder"
 
 
+    @traced_action
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -847,7 +1000,7 @@ class ActionSetReminder(Action):
         
         dispatcher.utter_message(text=bot_text)
         
-        audio_path = synthesize_tts(bot_text, lang, "reminder_reply")
+        audio_path = template_tts("reminder_set", lang, "reminder_reply")
         if audio_path:
             dispatcher.utter_message(
                 json_message={
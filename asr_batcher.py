@@ -0,0 +1,161 @@
+# asr_batcher.py
+
+"""
+Dynamic micro-batching for IndicConformer ASR.
+
+Concurrent requests submit one utterance each; the batcher holds them for a short
+window (or until the batch is full), groups them by language and runs a single
+padded forward pass per group, then hands each caller its own transcript.
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telemetry import observe
+
+
+# Basic config
+ASR_BATCH_WINDOW_MS = float(os.getenv("ASR_BATCH_WINDOW_MS", "25"))
+ASR_MAX_BATCH_SIZE = int(os.getenv("ASR_MAX_BATCH_SIZE", "8"))
+ASR_MAX_INFLIGHT_BATCHES = int(os.getenv("ASR_MAX_INFLIGHT_BATCHES", "1"))
+
+# batch_fn(wavs, lang_code) -> one transcript per wav, same order
+BatchFn = Callable[[List[Any], str], List[str]]
+
+
+class ASRBatcher:
+    """Gather ASR requests from many coroutines into per-language batches."""
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        window_ms: float = ASR_BATCH_WINDOW_MS,
+        max_batch_size: int = ASR_MAX_BATCH_SIZE,
+        max_inflight: int = ASR_MAX_INFLIGHT_BATCHES,
+        executor: Optional[Executor] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.executor = executor
+
+        self._max_inflight = max(1, max_inflight)
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[str, List[Tuple[Any, asyncio.Future]]] = defaultdict(list)
+        self._full: Dict[str, asyncio.Event] = {}
+        self._drainers: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self._batches = 0
+        self._utterances = 0
+        self._max_queue_depth = 0
+        self._batch_size_counts: Dict[int, int] = defaultdict(int)
+        self._last_batch_ms = 0.0
+
+    # Public API
+
+    async def transcribe(self, wav: Any, lang_code: str) -> str:
+        """Queue one utterance and wait for its transcript."""
+        loop = asyncio.get_running_loop()
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self._max_inflight)
+
+        fut = loop.create_future()
+        queue = self._pending[lang_code]
+        queue.append((wav, fut))
+
+        depth = self.queue_depth()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+
+        if len(queue) >= self.max_batch_size:
+            self._full.setdefault(lang_code, asyncio.Event()).set()
+
+        if lang_code not in self._drainers:
+            self._full.setdefault(lang_code, asyncio.Event())
+            self._drainers[lang_code] = asyncio.create_task(self._drain(lang_code))
+
+        return await fut
+
+    def queue_depth(self) -> int:
+        """Utterances waiting for a batch slot, across all languages."""
+        return sum(len(q) for q in self._pending.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue and batch-size metrics."""
+        avg = (self._utterances / self._batches) if self._batches else 0.0
+        return {
+            "queue_depth": self.queue_depth(),
+            "queue_depth_by_lang": {k: len(v) for k, v in self._pending.items() if v},
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "utterances": self._utterances,
+            "avg_batch_size": round(avg, 3),
+            "batch_size_counts": dict(self._batch_size_counts),
+            "last_batch_ms": round(self._last_batch_ms, 2),
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+        }
+
+    # Scheduling
+
+    async def _drain(self, lang_code: str) -> None:
+        """Wait for the window (or a full batch), then run batches until the queue is empty."""
+        full = self._full[lang_code]
+        try:
+            if self.window > 0:
+                try:
+                    await asyncio.wait_for(full.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+
+            async with self._inflight:
+                queue = self._pending[lang_code]
+                while queue:
+                    items = queue[: self.max_batch_size]
+                    del queue[: self.max_batch_size]
+                    if len(queue) < self.max_batch_size:
+                        full.clear()
+                    await self._run_batch(lang_code, items)
+        finally:
+            self._drainers.pop(lang_code, None)
+            if not self._pending[lang_code]:
+                self._pending.pop(lang_code, None)
+                self._full.pop(lang_code, None)
+
+    async def _run_batch(self, lang_code: str, items: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run one forward pass for a group and resolve each caller's future."""
+        loop = asyncio.get_running_loop()
+        wavs = [wav for wav, _ in items]
+        futures = [fut for _, fut in items]
+
+        t0 = time.perf_counter()
+        try:
+            texts = await loop.run_in_executor(self.executor, self.batch_fn, wavs, lang_code)
+            if len(texts) != len(wavs):
+                raise RuntimeError(
+                    f"ASR batch returned {len(texts)} results for {len(wavs)} inputs"
+                )
+        except Exception as e:
+            print("[ASR_BATCH ERROR]", repr(e))
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._last_batch_ms = elapsed * 1000.0
+            # One forward pass serves several requests, so it is not added to any one trace
+            observe("asr_forward", elapsed, in_trace=False)
+
+        self._batches += 1
+        self._utterances += len(wavs)
+        self._batch_size_counts[len(wavs)] += 1
+
+        for fut, text in zip(futures, texts):
+            if not fut.done():
+                fut.set_result(text)
@@ -0,0 +1,222 @@
+# asr_optimize.py
+
+"""
+CPU inference modes for the IndicConformer model.
+
+ASR_QUANTIZE=int8 applies dynamic INT8 quantization to the Linear layers. Weights
+are stored as int8 and activations are quantized on the fly, which on CPU cuts
+memory traffic, the main cost of the conformer's feed-forward and attention
+projections. ASR_COMPILE=compile|script wraps the model with torch.compile or
+TorchScript. Either one is tried on a warm-up clip first, and the model falls
+back to eager if tracing fails. ASR_TORCH_THREADS / ASR_INTEROP_THREADS pin
+torch's thread pools.
+
+Quantization changes numerics, so check accuracy on held-out audio before
+turning it on:
+
+    python asr_optimize.py wer heldout.jsonl --quantize int8
+    # heldout.jsonl: {"audio": "clips/001.webm", "text": "reference transcript", "lang": "hi"}
+
+This runs the fp32 model and the optimized one on the same clips and reports WER
+and speed for each. It exits non-zero if the optimized WER is worse by more than
+--max-wer-increase. The same check runs in the test suite when ASR_HELDOUT
+points at a manifest (tests/test_asr_optimize.py):
+
+    ASR_HELDOUT=heldout.jsonl python -m pytest -q tests/test_asr_optimize.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+import torch
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+
+# Basic config
+ASR_QUANTIZE = os.getenv("ASR_QUANTIZE", "none")     # none | int8
+ASR_COMPILE = os.getenv("ASR_COMPILE", "none")       # none | compile | script
+ASR_TORCH_THREADS = int(os.getenv("ASR_TORCH_THREADS", "0"))      # 0 = torch default
+ASR_INTEROP_THREADS = int(os.getenv("ASR_INTEROP_THREADS", "0"))
+ASR_WARMUP_LANG = os.getenv("ASR_WARMUP_LANG", "hi")
+
+
+def configure_threads(threads: int = ASR_TORCH_THREADS, interop: int = ASR_INTEROP_THREADS) -> None:
+    """Pin torch's intra-op (and, once per process, inter-op) thread counts."""
+    if threads > 0:
+        torch.set_num_threads(threads)
+    if interop > 0:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            # Only allowed before the first parallel op in the process
+            pass
+
+
+def _warmup(model) -> None:
+    with torch.inference_mode():
+        model(torch.zeros(1, TARGET_SAMPLE_RATE), ASR_WARMUP_LANG, "rnnt")
+
+
+def quantize_int8(model):
+    """Dynamic INT8 quantization of every nn.Linear (CPU only)."""
+    n_linear = sum(1 for m in model.modules() if isinstance(m, torch.nn.Linear))
+    if n_linear == 0:
+        print("[ASR_OPT] No Linear layers found, INT8 quantization skipped")
+        return model
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    print(f"[ASR_OPT] Quantized {n_linear} Linear layers to INT8")
+    return quantized
+
+
+def compile_model(model, mode: Text):
+    """torch.compile or TorchScript version of the model, or the model itself if that fails."""
+    try:
+        if mode == "compile":
+            compiled = torch.compile(model, dynamic=True)
+        else:
+            compiled = torch.jit.script(model)
+        _warmup(compiled)
+    except Exception as e:
+        print(f"[ASR_OPT] {mode} failed, running eager: {e!r}")
+        return model
+    print(f"[ASR_OPT] Model wrapped with {mode}")
+    return compiled
+
+
+def optimize_model(model, device: Text, quantize: Text = ASR_QUANTIZE, compile_mode: Text = ASR_COMPILE):
+    """Apply the configured inference mode to a freshly loaded model."""
+    model.eval()
+    for p in model.parameters():
+        p.requires_grad_(False)
+
+    if quantize == "int8":
+        if device == "cpu":
+            model = quantize_int8(model)
+        else:
+            print(f"[ASR_OPT] INT8 dynamic quantization is CPU-only, ignored on {device}")
+    elif quantize != "none":
+        raise ValueError(f"Unknown ASR_QUANTIZE {quantize!r}; choose 'none' or 'int8'")
+
+    if compile_mode in ("compile", "script"):
+        model = compile_model(model, compile_mode)
+    elif compile_mode != "none":
+        raise ValueError(f"Unknown ASR_COMPILE {compile_mode!r}; choose 'none', 'compile' or 'script'")
+    else:
+        _warmup(model)
+    return model
+
+
+# Accuracy check
+
+def word_errors(ref: List[Text], hyp: List[Text]) -> int:
+    """Word-level edit distance (substitutions + deletions + insertions)."""
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1]
+
+
+def _load_heldout(path: Text, limit: int) -> List[Dict[Text, Any]]:
+    base = os.path.dirname(os.path.abspath(path))
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not os.path.isabs(item["audio"]):
+                item["audio"] = os.path.join(base, item["audio"])
+            items.append(item)
+            if limit and len(items) >= limit:
+                break
+    return items
+
+
+def _run_model(model, wavs: List[Tuple[torch.Tensor, Text]]) -> Tuple[List[Text], float]:
+    texts = []
+    started = time.perf_counter()
+    with torch.inference_mode():
+        for wav, lang in wavs:
+            texts.append(model(wav, lang, "rnnt"))
+    return texts, time.perf_counter() - started
+
+
+def compare_wer(
+    heldout_path: Text,
+    quantize: Text = "int8",
+    compile_mode: Text = "none",
+    limit: int = 0,
+) -> Dict[Text, Any]:
+    """WER and real-time factor of fp32 vs the optimized model on one held-out set."""
+    from audio_decode import decode_audio_bytes
+    from inference_pool import DEVICE, load_asr_model
+    from normalizer_multi import normalize_text
+
+    items = _load_heldout(heldout_path, limit)
+    if not items:
+        raise SystemExit(f"[ASR_OPT] No clips in {heldout_path}")
+
+    wavs = []
+    for item in items:
+        with open(item["audio"], "rb") as f:
+            wavs.append((decode_audio_bytes(f.read(), item["audio"]), item.get("lang", "hi")))
+    audio_s = sum(w.shape[-1] for w, _ in wavs) / TARGET_SAMPLE_RATE
+
+    configure_threads()
+    results: Dict[Text, Any] = {"clips": len(items), "audio_seconds": round(audio_s, 1)}
+    for label, q, c in (("fp32", "none", "none"), ("optimized", quantize, compile_mode)):
+        model = load_asr_model(optimize=False)
+        model = optimize_model(model, DEVICE, quantize=q, compile_mode=c)
+        hyps, elapsed = _run_model(model, wavs)
+        del model
+
+        errors = words = 0
+        for item, hyp in zip(items, hyps):
+            lang = item.get("lang", "hi")
+            ref_words = normalize_text(item["text"], lang).split()
+            errors += word_errors(ref_words, normalize_text(hyp, lang).split())
+            words += len(ref_words)
+
+        results[label] = {
+            "wer": round(errors / max(1, words), 4),
+            "seconds": round(elapsed, 2),
+            "rtf": round(elapsed / max(audio_s, 1e-6), 4),
+        }
+        print(f"[ASR_OPT] {label}: {results[label]}")
+
+    results["wer_increase"] = round(results["optimized"]["wer"] - results["fp32"]["wer"], 4)
+    results["speedup"] = round(results["fp32"]["seconds"] / max(results["optimized"]["seconds"], 1e-6), 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="IndicConformer inference-mode tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    wer = sub.add_parser("wer", help="compare fp32 and optimized WER on a held-out JSONL set")
+    wer.add_argument("heldout")
+    wer.add_argument("--quantize", choices=["none", "int8"], default="int8")
+    wer.add_argument("--compile", choices=["none", "compile", "script"], default="none")
+    wer.add_argument("--limit", type=int, default=0, help="use only the first N clips")
+    wer.add_argument("--max-wer-increase", type=float, default=0.01,
+                     help="absolute WER increase that still passes (default 0.01 = 1 point)")
+    args = parser.parse_args()
+
+    if args.command == "wer":
+        results = compare_wer(args.heldout, args.quantize, args.compile, args.limit)
+        print(json.dumps(results, indent=2))
+        if results["wer_increase"] > args.max_wer_increase:
+            print(f"[ASR_OPT] FAIL: WER increased by {results['wer_increase']:.4f}")
+            sys.exit(1)
+        print("[ASR_OPT] PASS")
+
+
+if __name__ == "__main__":
+    main()
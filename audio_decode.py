@@ -0,0 +1,123 @@
+# audio_decode.py
+
+"""
+In-memory audio decoding for the SahaYaa voice gateway.
+
+Turns uploaded bytes (WebM/Opus from the web UI, Ogg, MP3, M4A, WAV) into a mono
+16 kHz float tensor of shape (1, T) without writing intermediate files. Plain PCM
+WAV is parsed directly; everything else goes through libav in-process via
+torchaudio's StreamReader. The ffmpeg CLI is only a fallback and talks over pipes.
+"""
+
+import io
+import os
+import subprocess
+import wave
+
+import torch
+import torchaudio
+
+from telemetry import span
+
+# Basic config
+TARGET_SAMPLE_RATE = 16000
+FFMPEG_BIN = os.getenv("FFMPEG_PATH", "ffmpeg")
+
+_PCM_DTYPES = {1: torch.uint8, 2: torch.int16, 4: torch.int32}
+
+
+# Decoders
+
+def _to_mono_16k(wav: torch.Tensor, sr: int) -> torch.Tensor:
+    """Downmix (C, T) to (1, T) and resample to 16 kHz if needed."""
+    wav = torch.mean(wav, dim=0, keepdim=True)
+    if sr != TARGET_SAMPLE_RATE:
+        with span("resample"):
+            wav = torchaudio.functional.resample(wav, orig_freq=sr, new_freq=TARGET_SAMPLE_RATE)
+    return wav
+
+
+def _decode_pcm_wav(data: bytes) -> torch.Tensor:
+    """Parse an uncompressed PCM WAV with the stdlib reader."""
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        width = wf.getsampwidth()
+        channels = wf.getnchannels()
+        sr = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    dtype = _PCM_DTYPES.get(width)
+    if dtype is None:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    pcm = torch.frombuffer(bytearray(frames), dtype=dtype).to(torch.float32)
+    if width == 1:
+        pcm = (pcm - 128.0) / 128.0
+    else:
+        pcm = pcm / float(2 ** (8 * width - 1))
+
+    wav = pcm.view(-1, channels).t()
+    return _to_mono_16k(wav, sr)
+
+
+def _decode_libav(data: bytes) -> torch.Tensor:
+    """Demux, decode, downmix and resample in-process with libav."""
+    from torchaudio.io import StreamReader
+
+    reader = StreamReader(io.BytesIO(data))
+    reader.add_basic_audio_stream(
+        frames_per_chunk=TARGET_SAMPLE_RATE,
+        buffer_chunk_size=-1,
+        sample_rate=TARGET_SAMPLE_RATE,
+        num_channels=1,
+    )
+
+    chunks = [chunk for (chunk,) in reader.stream() if chunk is not None]
+    if not chunks:
+        raise ValueError("No audio frames decoded")
+
+    # StreamReader yields (frames, channels)
+    return torch.cat(chunks, dim=0).t().contiguous()
+
+
+def _decode_ffmpeg_pipe(data: bytes) -> torch.Tensor:
+    """Fallback: let the ffmpeg CLI decode from stdin to raw float32 on stdout."""
+    cmd = [
+        FFMPEG_BIN,
+        "-nostdin",
+        "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "f32le",
+        "-ac", "1",
+        "-ar", str(TARGET_SAMPLE_RATE),
+        "pipe:1",
+    ]
+    proc = subprocess.run(cmd, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    if not proc.stdout:
+        raise ValueError("ffmpeg produced no audio")
+    return torch.frombuffer(bytearray(proc.stdout), dtype=torch.float32).unsqueeze(0)
+
+
+def decode_audio_bytes(data: bytes, filename: str = "") -> torch.Tensor:
+    """
+    Decode an upload into a mono 16 kHz waveform of shape (1, T).
+    """
+    if not data:
+        raise ValueError("Empty audio upload")
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_pcm_wav(data)
+        except (wave.Error, ValueError) as e:
+            # e.g. float or compressed WAV; libav handles those
+            print(f"[DECODE] stdlib WAV reader failed for {filename!r}: {e}")
+
+    try:
+        return _decode_libav(data)
+    except Exception as e:
+        print(f"[DECODE] in-process decode failed for {filename!r}, using ffmpeg: {e!r}")
+
+    try:
+        return _decode_ffmpeg_pipe(data)
+    except Exception as e:
+        print("[FFMPEG ERROR]", e)
+        raise RuntimeError(f"Failed to decode {filename or 'upload'}") from e
@@ -0,0 +1,205 @@
+# banking_client.py
+
+"""
+Shared async client for the secure banking API.
+
+One pooled keep-alive httpx session per process, per-endpoint timeouts, retries
+with exponential backoff for idempotent reads only, and a circuit breaker that
+fails fast while the upstream is down. Balance and transaction reads go through
+a short-TTL account cache that transfers and bill payments invalidate.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, NamedTuple, Optional, Text
+
+import httpx
+
+from account_cache import AccountCache
+from telemetry import span
+
+
+# Basic config
+SECURE_API_BASE = os.getenv("SECURE_API_BASE", "http://127.0.0.1:8001")
+BANK_MAX_CONNECTIONS = int(os.getenv("BANK_MAX_CONNECTIONS", "50"))
+BANK_MAX_KEEPALIVE = int(os.getenv("BANK_MAX_KEEPALIVE", "20"))
+BANK_CONNECT_TIMEOUT_S = float(os.getenv("BANK_CONNECT_TIMEOUT_S", "2"))
+BANK_READ_RETRIES = int(os.getenv("BANK_READ_RETRIES", "2"))
+BANK_BACKOFF_S = float(os.getenv("BANK_BACKOFF_S", "0.1"))
+BANK_BREAKER_FAILURES = int(os.getenv("BANK_BREAKER_FAILURES", "5"))
+BANK_BREAKER_RESET_S = float(os.getenv("BANK_BREAKER_RESET_S", "30"))
+
+
+class Endpoint(NamedTuple):
+    path: Text
+    timeout_s: float
+    idempotent: bool
+
+
+ENDPOINTS: Dict[Text, Endpoint] = {
+    "balance": Endpoint("/balance/", 5.0, True),
+    "transactions": Endpoint("/transactions/", 8.0, True),
+    "transfer": Endpoint("/transfer/", 8.0, False),
+    "paybill": Endpoint("/paybill/", 8.0, False),
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the upstream while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after N consecutive failures -> half-open after a cool-down.
+
+    Half-open lets exactly one probe call through. Everything else fails fast
+    until the probe succeeds (closed) or fails (open again).
+    """
+
+    def __init__(self, failure_threshold: int = BANK_BREAKER_FAILURES, reset_timeout_s: float = BANK_BREAKER_RESET_S):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> Text:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Closed lets every call through; half-open only the first, as the probe."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """The probe ended without saying anything about the upstream (4xx, cancelled)."""
+        self._probing = False
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Transport errors and 5xx are worth retrying; 4xx are the caller's problem."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+class BankingClient:
+    """Async, connection-pooled client for /balance/, /transactions/, /transfer/, /paybill/."""
+
+    def __init__(self, base_url: Text = SECURE_API_BASE, cache: Optional[AccountCache] = None):
+        self.base_url = base_url.rstrip("/")
+        self.breaker = CircuitBreaker()
+        self.cache = cache or AccountCache()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _session(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the action server's running loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=BANK_MAX_CONNECTIONS,
+                    max_keepalive_connections=BANK_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(10.0, connect=BANK_CONNECT_TIMEOUT_S),
+            )
+        return self._client
+
+    async def post(self, endpoint: Text, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        """POST to one named endpoint and return its JSON body."""
+        spec = ENDPOINTS[endpoint]
+        attempts = 1 + (BANK_READ_RETRIES if spec.idempotent else 0)
+
+        for attempt in range(attempts):
+            probe = self.breaker.state == "half_open"
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"secure API circuit open, skipping {endpoint}")
+
+            try:
+                with span(f"bank_{endpoint}"):
+                    resp = await self._session().post(
+                        spec.path,
+                        json=payload,
+                        timeout=httpx.Timeout(spec.timeout_s, connect=BANK_CONNECT_TIMEOUT_S),
+                    )
+                    resp.raise_for_status()
+            except Exception as e:
+                if not _is_retryable(e):
+                    if probe:
+                        self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                delay = BANK_BACKOFF_S * (2 ** attempt) * (0.5 + random.random())
+                print(f"[BANK] {endpoint} attempt {attempt + 1} failed ({type(e).__name__}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if probe:
+                    self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return resp.json()
+
+        raise RuntimeError("unreachable")
+
+    async def get_balance(self, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        return await self.cache.read_through(
+            "balance", payload["user_id"], payload["account_id"],
+            lambda: self.post("balance", payload),
+        )
+
+    async def get_transactions(self, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        return await self.cache.read_through(
+            "transactions", payload["user_id"], payload["from_account"],
+            lambda: self.post("transactions", payload),
+        )
+
+    async def transfer(self, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        try:
+            return await self.post("transfer", payload)
+        finally:
+            # Also on errors: a timed-out transfer may still have gone through
+            await self.cache.ainvalidate(payload["user_id"], payload.get("from_account"), payload.get("to_account"))
+
+    async def pay_bill(self, payload: Dict[Text, Any]) -> Dict[Text, Any]:
+        try:
+            return await self.post("paybill", payload)
+        finally:
+            await self.cache.ainvalidate(payload["user_id"], payload.get("from_account"))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Process-wide instance shared by all actions
+banking_client = BankingClient()
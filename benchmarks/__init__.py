@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+
+"""
+Benchmarks for the SahaYaa voice stack. Run from the repo root:
+
+    python -m benchmarks.micro                    # normalizer / number parser
+    python -m benchmarks.load_test --start-stack  # end-to-end /api/voice-query
+    python -m benchmarks.replay traffic_capture/  # replay captured traffic
+"""
@@ -0,0 +1,491 @@
+# benchmarks/load_test.py
+
+"""
+End-to-end load test for /api/voice-query.
+
+Sends a corpus of recorded and/or synthetic clips at a fixed concurrency and
+reports:
+  - throughput, errors, client-side latency p50/p95/p99
+  - per-stage p50/p95/p99 from the gateway's /metrics histograms (difference
+    between scrapes before and after the run, so warm-up traffic is excluded)
+  - CPU time, average cores used, and peak RSS of the gateway process tree
+
+--start-stack launches the mock bank and mock Rasa (benchmarks/mock_services.py),
+the real action server (rasa_sdk, TTS_BACKEND=stub) against the mock bank, and a
+gateway wired to them. The mock Rasa runs a mix of actions on the action server,
+so bank calls, the account cache and TTS are exercised; only NLU/Core are faked.
+--gateway-only skips the action server and measures the gateway alone (the mock
+Rasa then echoes). Without --start-stack, point --url at a running gateway (and
+pass --gateway-pid for CPU/RSS).
+
+    python -m benchmarks.load_test --start-stack --synthetic 20 --concurrency 8 --requests 400
+    python -m benchmarks.load_test --url http://127.0.0.1:8002 --clips recordings/ --duration 120
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import wave
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+
+# Basic config
+BENCH_GATEWAY_PORT = int(os.getenv("BENCH_GATEWAY_PORT", "8800"))
+BENCH_BANK_PORT = int(os.getenv("BENCH_BANK_PORT", "8801"))
+BENCH_RASA_PORT = int(os.getenv("BENCH_RASA_PORT", "8805"))
+BENCH_ACTIONS_PORT = int(os.getenv("BENCH_ACTIONS_PORT", "8806"))
+BENCH_READY_TIMEOUT_S = float(os.getenv("BENCH_READY_TIMEOUT_S", "600"))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LANG_CODES = ("hi", "mr", "en", "ta", "te", "bn", "or")
+AUDIO_EXTS = (".wav", ".webm", ".ogg", ".mp3", ".m4a")
+SAMPLE_RATE = 16000
+
+
+class Clip(NamedTuple):
+    name: str
+    data: bytes
+    lang: str
+
+
+# Clips
+
+def synthetic_clip(seconds: float, seed: int) -> bytes:
+    """
+    16 kHz PCM WAV shaped like a recorder upload: dead air, voiced bursts with
+    pauses, dead air. Not intelligible, but it exercises decode, VAD and a full-length forward pass.
+    """
+    rng = random.Random(seed)
+    n = int(seconds * SAMPLE_RATE)
+    lead = int(rng.uniform(0.3, 0.8) * SAMPLE_RATE)
+    tail = int(rng.uniform(0.3, 0.8) * SAMPLE_RATE)
+
+    samples = [rng.gauss(0.0, 0.002) for _ in range(n)]
+    pos = lead
+    while pos < n - tail:
+        burst = min(int(rng.uniform(0.2, 0.6) * SAMPLE_RATE), n - tail - pos)
+        f0 = rng.uniform(110, 240)
+        for i in range(burst):
+            t = i / SAMPLE_RATE
+            env = math.sin(math.pi * i / burst)
+            samples[pos + i] += env * 0.25 * (
+                math.sin(2 * math.pi * f0 * t) + 0.5 * math.sin(4 * math.pi * f0 * t) + 0.25 * math.sin(6 * math.pi * f0 * t)
+            ) / 1.75
+        pos += burst + int(rng.uniform(0.05, 0.25) * SAMPLE_RATE)
+
+    pcm = b"".join(
+        int(max(-1.0, min(1.0, s)) * 32767).to_bytes(2, "little", signed=True) for s in samples
+    )
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def load_clips(clip_dir: Optional[str], synthetic: int, default_lang: str, seed: int = 7) -> List[Clip]:
+    """Recorded clips from clip_dir (a 'hi_' style prefix sets the language) plus synthetic ones."""
+    clips: List[Clip] = []
+    if clip_dir:
+        for name in sorted(os.listdir(clip_dir)):
+            if not name.lower().endswith(AUDIO_EXTS):
+                continue
+            prefix = re.split(r"[_\-.]", name, 1)[0].lower()
+            lang = prefix if prefix in LANG_CODES else default_lang
+            with open(os.path.join(clip_dir, name), "rb") as f:
+                clips.append(Clip(name, f.read(), lang))
+
+    rng = random.Random(seed)
+    for i in range(synthetic):
+        seconds = rng.choice([1.5, 2.5, 3.5, 5.0, 8.0])
+        clips.append(Clip(f"synthetic_{i:03d}_{seconds}s.wav", synthetic_clip(seconds, seed + i), default_lang))
+
+    if not clips:
+        raise SystemExit("[BENCH] No clips: pass --clips DIR and/or --synthetic N")
+    return clips
+
+
+# Gateway process tree: CPU and RSS from /proc
+
+def _children(pid: int) -> List[int]:
+    kids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[1]) == pid:
+                kids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return kids
+
+
+def _tree(pid: int) -> List[int]:
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        stack.extend(_children(p))
+    return pids
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat", "r") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class ProcessSampler:
+    """Samples CPU time and RSS of a process and its children in a background thread (Linux)."""
+
+    def __init__(self, pid: int, interval_s: float = 0.5):
+        self.pid = pid
+        self.interval_s = interval_s
+        self._cpu: Dict[int, Tuple[float, float]] = {}  # pid -> (first, last) cpu seconds
+        self._rss: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-sampler", daemon=True)
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def _sample(self) -> None:
+        rss = 0
+        for p in _tree(self.pid):
+            try:
+                cpu = _cpu_seconds(p)
+                rss += _rss_bytes(p)
+            except OSError:
+                continue
+            first = self._cpu.get(p, (cpu, cpu))[0]
+            self._cpu[p] = (first, cpu)
+        self._rss.append(rss)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval_s)
+
+    def start(self) -> "ProcessSampler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self._elapsed = time.perf_counter() - self._started
+        cpu = sum(last - first for first, last in self._cpu.values())
+        return {
+            "cpu_seconds": round(cpu, 2),
+            "avg_cores": round(cpu / max(self._elapsed, 1e-6), 2),
+            "peak_rss_mb": round(max(self._rss or [0]) / 2 ** 20, 1),
+            "avg_rss_mb": round(sum(self._rss) / max(1, len(self._rss)) / 2 ** 20, 1),
+        }
+
+
+# Per-stage percentiles from /metrics
+
+_BUCKET_LINE = re.compile(r'^sahayaa_stage_duration_seconds_bucket\{(.*)\} (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def scrape_stages(base_url: str) -> Dict[str, Dict[float, float]]:
+    """stage -> {upper bound: cumulative count}, summed over the action label."""
+    text = httpx.get(base_url.rstrip("/") + "/metrics", timeout=10).text
+    stages: Dict[str, Dict[float, float]] = defaultdict(lambda: defaultdict(float))
+    for line in text.splitlines():
+        m = _BUCKET_LINE.match(line)
+        if not m:
+            continue
+        labels = dict(_LABEL.findall(m.group(1)))
+        le = math.inf if labels["le"] == "+Inf" else float(labels["le"])
+        stages[labels["stage"]][le] += float(m.group(2))
+    return stages
+
+
+def _quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """histogram_quantile over (upper bound, count in run) pairs, linear within a bucket."""
+    total = buckets[-1][1]
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def stage_percentiles(before, after) -> Dict[str, Dict[str, Any]]:
+    report = {}
+    for stage, cumulative in after.items():
+        prior = before.get(stage, {})
+        buckets = sorted((le, n - prior.get(le, 0.0)) for le, n in cumulative.items())
+        if not buckets or buckets[-1][1] <= 0:
+            continue
+        report[stage] = {
+            "count": int(buckets[-1][1]),
+            **{f"p{int(q * 100)}_ms": round(_quantile(q, buckets) * 1000.0, 1) for q in (0.5, 0.95, 0.99)},
+        }
+    return dict(sorted(report.items()))
+
+
+# Load
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def _post_clip(client: httpx.AsyncClient, url: str, clip: Clip, sender: str) -> Tuple[float, int]:
+    started = time.perf_counter()
+    try:
+        resp = await client.post(
+            url,
+            files={"file": (clip.name, clip.data)},
+            data={"lang": clip.lang, "sender_id": sender},
+        )
+        status = resp.status_code
+    except httpx.HTTPError:
+        status = 0
+    return time.perf_counter() - started, status
+
+
+async def run_load(
+    base_url: str,
+    clips: List[Clip],
+    concurrency: int,
+    requests: int,
+    duration_s: float,
+    senders: int,
+) -> Dict[str, Any]:
+    """Closed-loop load: `concurrency` workers, each sending its next clip as soon as the last one returns."""
+    url = base_url.rstrip("/") + "/api/voice-query"
+    latencies: List[float] = []
+    statuses: Dict[int, int] = defaultdict(int)
+    counter = iter(range(requests)) if requests else None
+    deadline = time.perf_counter() + duration_s if duration_s else None
+
+    async def worker(wid: int) -> None:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(120.0)) as client:
+            i = wid
+            while True:
+                if counter is not None and next(counter, None) is None:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                clip = clips[i % len(clips)]
+                elapsed, status = await _post_clip(client, url, clip, f"bench_{i % senders}")
+                statuses[status] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+                i += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    done = sum(statuses.values())
+    return {
+        "requests": done,
+        "ok": statuses.get(200, 0),
+        "errors": {str(k): v for k, v in statuses.items() if k != 200},
+        "wall_seconds": round(wall, 2),
+        "throughput_rps": round(statuses.get(200, 0) / max(wall, 1e-6), 2),
+        "latency_ms": {
+            f"p{int(q * 100)}": round(percentile(latencies, q) * 1000.0, 1) for q in (0.5, 0.95, 0.99)
+        },
+    }
+
+
+# Local stack
+
+class Stack:
+    """Mock bank + action server + mock Rasa + a gateway pointed at them, as subprocesses."""
+
+    def __init__(
+        self,
+        gateway_port: int,
+        bank_port: int,
+        rasa_port: int,
+        extra_env: Dict[str, str],
+        actions_port: Optional[int] = BENCH_ACTIONS_PORT,
+    ):
+        self.gateway_port = gateway_port
+        self.bank_port = bank_port
+        self.rasa_port = rasa_port
+        self.actions_port = actions_port  # None: no action server, the mock Rasa echoes
+        self.extra_env = extra_env
+        self.procs: List[subprocess.Popen] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.gateway_port}"
+
+    def _spawn(self, args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+        proc = subprocess.Popen([sys.executable] + args, cwd=REPO_ROOT, env=env)
+        self.procs.append(proc)
+        return proc
+
+    def start(self) -> subprocess.Popen:
+        env = dict(os.environ)
+        bank_url = f"http://127.0.0.1:{self.bank_port}"
+        self._spawn(["-m", "benchmarks.mock_services", "bank", "--port", str(self.bank_port)], env)
+
+        rasa_env = dict(env)
+        if self.actions_port:
+            actions_env = dict(env)
+            actions_env.update({
+                "SECURE_API_BASE": bank_url,
+                "TTS_BACKEND": "stub",
+                "TTS_WARMUP_ON_START": "0",
+                "TELEMETRY_TRACE_LOG": "0",
+            })
+            self._spawn(["-m", "rasa_sdk", "--actions", "actions", "--port", str(self.actions_port)], actions_env)
+            rasa_env["MOCK_ACTION_URL"] = f"http://127.0.0.1:{self.actions_port}/webhook"
+        self._spawn(["-m", "benchmarks.mock_services", "rasa", "--port", str(self.rasa_port)], rasa_env)
+
+        gw_env = dict(env)
+        gw_env.update({
+            "SECURE_API_BASE": bank_url,
+            "RASA_REST_URL": f"http://127.0.0.1:{self.rasa_port}/webhooks/rest/webhook",
+            "RASA_REST_URLS": f"http://127.0.0.1:{self.rasa_port}/webhooks/rest/webhook",
+            "TTS_BACKEND": "stub",
+            "TTS_WARMUP_ON_START": "0",
+            "TELEMETRY_TRACE_LOG": "0",
+        })
+        gw_env.update(self.extra_env)
+        gateway = self._spawn(
+            ["-m", "uvicorn", "voice_api:app", "--port", str(self.gateway_port), "--log-level", "warning"],
+            gw_env,
+        )
+        self._wait_ready()
+        return gateway
+
+    def _wait_ready(self) -> None:
+        deadline = time.time() + BENCH_READY_TIMEOUT_S
+        checks = [("Gateway", self.url + "/readyz")]
+        if self.actions_port:
+            checks.append(("Action server", f"http://127.0.0.1:{self.actions_port}/health"))
+
+        for name, url in checks:
+            print(f"[BENCH] Waiting for {name.lower()} readiness on {url} ...")
+            while True:
+                if any(p.poll() is not None for p in self.procs):
+                    self.stop()
+                    raise SystemExit("[BENCH] A stack process exited during startup")
+                try:
+                    if httpx.get(url, timeout=2).status_code == 200:
+                        print(f"[BENCH] {name} ready")
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.time() >= deadline:
+                    self.stop()
+                    raise SystemExit(f"[BENCH] {name} did not become ready in time")
+                time.sleep(1.0)
+
+    def stop(self) -> None:
+        for proc in reversed(self.procs):
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self.procs = []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the SahaYaa voice gateway.")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{BENCH_GATEWAY_PORT}")
+    parser.add_argument("--start-stack", action="store_true", help="launch mocks, action server + gateway locally")
+    parser.add_argument("--gateway-only", action="store_true",
+                        help="with --start-stack, skip the action server (mock Rasa echoes)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra gateway env with --start-stack (e.g. ASR_QUANTIZE=int8)")
+    parser.add_argument("--gateway-pid", type=int, default=0, help="gateway pid for CPU/RSS without --start-stack")
+    parser.add_argument("--clips", default=None, help="directory of recorded clips")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic clips to add")
+    parser.add_argument("--lang", default="hi", help="language for synthetic clips and unprefixed recordings")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="total requests (0 = use --duration)")
+    parser.add_argument("--duration", type=float, default=0.0, help="run for this many seconds instead")
+    parser.add_argument("--warmup", type=int, default=5, help="requests sent before measuring")
+    parser.add_argument("--senders", type=int, default=50, help="distinct sender ids to rotate through")
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips, args.synthetic, args.lang)
+    print(f"[BENCH] {len(clips)} clip(s)")
+
+    stack = None
+    pid = args.gateway_pid
+    base_url = args.url
+    if args.start_stack:
+        extra = dict(kv.split("=", 1) for kv in args.env)
+        actions_port = None if args.gateway_only else BENCH_ACTIONS_PORT
+        stack = Stack(BENCH_GATEWAY_PORT, BENCH_BANK_PORT, BENCH_RASA_PORT, extra, actions_port)
+        pid = stack.start().pid
+        base_url = stack.url
+
+    try:
+        if args.warmup:
+            asyncio.run(run_load(base_url, clips, 1, args.warmup, 0, args.senders))
+
+        before = scrape_stages(base_url)
+        sampler = ProcessSampler(pid).start() if pid and os.path.isdir("/proc") else None
+        load = asyncio.run(run_load(base_url, clips, args.concurrency, args.requests, args.duration, args.senders))
+        resources = sampler.stop() if sampler else {}
+        after = scrape_stages(base_url)
+    finally:
+        if stack is not None:
+            stack.stop()
+
+    report = {
+        "concurrency": args.concurrency,
+        "clips": len(clips),
+        **load,
+        "stages": stage_percentiles(before, after),
+        "resources": resources,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/micro.py
+
+"""
+Micro-benchmarks for the text stages of a voice turn.
+
+Times normalize_text (per language profile and the union profile),
+normalize_batch, parse_numbers (the successor of convert_hindi_numbers_to_digits)
+and extract_amount. The corpus is the data/nlu.yml examples, with entity
+annotations stripped, plus number-heavy phrases, cycled to --n calls. Compiled
+engines and lru caches are warmed first, so the figures are steady-state. A
+--cold run clears the caches before every pass, the worst case for novel text.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --compare baseline.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NLU_PATH = os.path.join(REPO_ROOT, "data", "nlu.yml")
+
+_ENTITY_ANNOTATION = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+
+NUMBER_PHRASES = [
+    "riya ko paanch sau rupaye bhejo",
+    "ढाई लाख रुपये ट्रांसफर करो",
+    "send two thousand five hundred rupees to mom",
+    "saade teen hazaar ka bill bharo",
+    "पंद्रह सौ रुपये भेजो",
+    "transfer 1.5 lakh to savings",
+    "তিন হাজার টাকা পাঠাও",
+    "मला दोन हजार पाचशे रुपये पाठवा",
+]
+
+
+def load_corpus() -> List[str]:
+    with open(NLU_PATH, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    texts = []
+    for block in data.get("nlu", []):
+        if "intent" not in block:
+            continue
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                texts.append(_ENTITY_ANNOTATION.sub(r"\1", line[2:].strip()))
+    return texts + NUMBER_PHRASES
+
+
+def _clear_caches() -> None:
+    import normalizer_multi
+
+    for engine in list(normalizer_multi._ENGINES.values()) + [normalizer_multi._DEFAULT_ENGINE]:
+        engine._resolve.cache_clear()
+    normalizer_multi._is_latin.cache_clear()
+
+
+def bench(fn: Callable[[], Any], calls: int, repeat: int, cold: bool) -> Dict[str, float]:
+    """Best-of-repeat and median microseconds per call."""
+    fn()  # warm
+    per_call = []
+    for _ in range(repeat):
+        if cold:
+            _clear_caches()
+        started = time.perf_counter()
+        fn()
+        per_call.append((time.perf_counter() - started) / calls * 1e6)
+    return {"best_us": round(min(per_call), 3), "median_us": round(statistics.median(per_call), 3)}
+
+
+def run(n: int, repeat: int, cold: bool) -> Dict[str, Dict[str, float]]:
+    from normalizer_multi import normalize_batch, normalize_text
+    from number_parser import extract_amount, parse_numbers
+
+    corpus = load_corpus()
+    texts = (corpus * (n // len(corpus) + 1))[:n]
+    normalized = [normalize_text(t) for t in texts]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "normalize_text[union]": lambda: [normalize_text(t) for t in texts],
+        "normalize_text[hi]": lambda: [normalize_text(t, "hi") for t in texts],
+        "normalize_text[en]": lambda: [normalize_text(t, "en") for t in texts],
+        "normalize_batch[hi]": lambda: list(normalize_batch(texts, "hi")),
+        "parse_numbers[hi]": lambda: [parse_numbers(t, "hi") for t in normalized],
+        "parse_numbers[union]": lambda: [parse_numbers(t) for t in normalized],
+        "extract_amount[hi]": lambda: [extract_amount(t, "hi") for t in normalized],
+    }
+    return {name: bench(fn, len(texts), repeat, cold) for name, fn in cases.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for SahaYaa text processing.")
+    parser.add_argument("--n", type=int, default=5000, help="calls per pass")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="clear normalizer caches before every pass")
+    parser.add_argument("--save", default=None, help="write results as a baseline JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="fail if best_us is slower than the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    results = run(args.n, args.repeat, args.cold)
+    width = max(len(k) for k in results)
+    for name, r in results.items():
+        print(f"{name:<{width}}  best {r['best_us']:9.3f} us/call   median {r['median_us']:9.3f} us/call")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[BENCH] Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            change = r["best_us"] / base["best_us"] - 1.0
+            flag = "REGRESSION" if change > args.max_regression else "ok"
+            print(f"[BENCH] {name}: {change:+.1%} vs baseline ({flag})")
+            if change > args.max_regression:
+                failed.append(name)
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# benchmarks/mock_services.py
+
+"""
+Local stand-ins for the gateway's upstreams, for load tests.
+
+  bank_app - the secure banking API: /balance/, /transactions/, /transfer/, /paybill/
+  rasa_app - a Rasa server: the REST webhook plus the tracker endpoints the fast
+             path uses (--enable-api)
+
+Each answers after a fixed delay (MOCK_BANK_LATENCY_MS / MOCK_RASA_LATENCY_MS)
+with responses shaped like the real ones, so the gateway runs its normal code
+paths without Rasa, a model-backed NLU, or the bank being present.
+
+With MOCK_ACTION_URL set (a rasa_sdk action server's /webhook), the mock Rasa
+stands in for NLU and Core only. Each turn runs the next action from
+MOCK_ACTION_MIX on the real action server, with slots that take it straight to
+the bank call (no OTP), and returns what the action uttered. Without it, the
+webhook just echoes the message.
+
+    python -m benchmarks.mock_services bank --port 8801
+    python -m benchmarks.mock_services rasa --port 8805
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+
+
+# Basic config
+MOCK_BANK_LATENCY_MS = float(os.getenv("MOCK_BANK_LATENCY_MS", "20"))
+MOCK_RASA_LATENCY_MS = float(os.getenv("MOCK_RASA_LATENCY_MS", "60"))
+MOCK_ACTION_URL = os.getenv("MOCK_ACTION_URL", "")
+MOCK_ACTION_MIX = [a.strip() for a in os.getenv(
+    "MOCK_ACTION_MIX", "action_check_balance,action_get_transactions,action_make_transfer,action_pay_bill"
+).split(",") if a.strip()]
+
+# Slots that take each action straight to its bank call
+_ACTION_SLOTS: Dict[str, Dict[str, Any]] = {
+    "action_check_balance": {"account_id": "acct_savings_1"},
+    "action_get_transactions": {"from_account": "acct_savings_1"},
+    "action_make_transfer": {"from_account": "acct_savings_1", "to_account": "acct_friend_riya", "amount": 300.0},
+    "action_pay_bill": {"from_account": "acct_savings_1", "amount": 450.0},
+}
+
+_tx_ids = itertools.count(1)
+
+
+async def _delay(ms: float) -> None:
+    if ms > 0:
+        await asyncio.sleep(ms / 1000.0)
+
+
+# Secure banking API
+
+bank_app = FastAPI(title="Mock secure banking API")
+
+
+@bank_app.post("/balance/")
+async def balance(payload: Dict[str, Any]):
+    await _delay(MOCK_BANK_LATENCY_MS)
+    return {"account_id": payload.get("account_id"), "balance": 48500.5, "currency": "INR"}
+
+
+@bank_app.post("/transactions/")
+async def transactions(payload: Dict[str, Any]):
+    await _delay(MOCK_BANK_LATENCY_MS)
+    return {
+        "items": [
+            {"amount": 300, "to_account": "acct_friend_riya", "created_at": "2024-01-05 10:12"},
+            {"amount": 1200, "to_account": "acct_electricity", "created_at": "2024-01-03 18:40"},
+            {"amount": 99, "to_account": "acct_mobile", "created_at": "2024-01-01 09:05"},
+        ]
+    }
+
+
+@bank_app.post("/transfer/")
+async def transfer(payload: Dict[str, Any]):
+    await _delay(MOCK_BANK_LATENCY_MS)
+    return {"status": "success", "tx_id": f"TX{next(_tx_ids):05d}", "signed_token": "mock-token"}
+
+
+@bank_app.post("/paybill/")
+async def paybill(payload: Dict[str, Any]):
+    await _delay(MOCK_BANK_LATENCY_MS)
+    return {"status": "success", "tx_id": f"TX{next(_tx_ids):05d}"}
+
+
+# Rasa server
+
+rasa_app = FastAPI(title="Mock Rasa server")
+
+
+_next_action = itertools.cycle(MOCK_ACTION_MIX)
+_action_client: Optional[httpx.AsyncClient] = None
+
+
+async def _run_action(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run the next mixed-in action on the action server, as Rasa Core would."""
+    global _action_client
+    if _action_client is None:
+        _action_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0))
+
+    sender = body.get("sender")
+    action = next(_next_action)
+    resp = await _action_client.post(MOCK_ACTION_URL, json={
+        "next_action": action,
+        "sender_id": sender,
+        "version": "3.6.13",
+        "domain": {},
+        "tracker": {
+            "sender_id": sender,
+            "slots": dict(_ACTION_SLOTS.get(action, {})),
+            "latest_message": {
+                "text": body.get("message", ""),
+                "intent": {"name": "mock", "confidence": 1.0},
+                "entities": [],
+                "metadata": body.get("metadata") or {},
+            },
+            "events": [],
+            "paused": False,
+            "followup_action": None,
+            "active_loop": {},
+            "latest_action_name": "action_listen",
+        },
+    })
+    resp.raise_for_status()
+
+    messages = []
+    for m in resp.json().get("responses", []):
+        out: Dict[str, Any] = {"recipient_id": sender}
+        for key in ("text", "custom", "image", "buttons", "attachment"):
+            if m.get(key):
+                out[key] = m[key]
+        messages.append(out)
+    return messages
+
+
+@rasa_app.post("/webhooks/rest/webhook")
+async def webhook(request: Request) -> List[Dict[str, Any]]:
+    body = await request.json()
+    await _delay(MOCK_RASA_LATENCY_MS)
+    if MOCK_ACTION_URL:
+        return await _run_action(body)
+    lang = (body.get("metadata") or {}).get("lang", "hi")
+    return [
+        {"recipient_id": body.get("sender"), "text": f"[mock] {body.get('message', '')}"},
+        {
+            "recipient_id": body.get("sender"),
+            "custom": {"type": "audio_reply", "audio_file": "tts_responses/mock.wav", "lang": lang},
+        },
+    ]
+
+
+@rasa_app.get("/conversations/{sender_id}/tracker")
+async def tracker(sender_id: str):
+    return {"sender_id": sender_id, "slots": {}, "latest_message": {}, "events": [], "paused": False}
+
+
+@rasa_app.post("/conversations/{sender_id}/tracker/events")
+async def append_events(sender_id: str, request: Request):
+    await request.json()
+    return {"sender_id": sender_id, "slots": {}, "latest_message": {}, "events": []}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run one mock upstream for SahaYaa load tests.")
+    parser.add_argument("service", choices=["bank", "rasa"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    app = bank_app if args.service == "bank" else rasa_app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
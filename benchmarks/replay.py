@@ -0,0 +1,306 @@
+# benchmarks/replay.py
+
+"""
+Replay captured gateway traffic (traffic_capture.py) against a build.
+
+Turns are read from the capture's traffic-*.jsonl files and sent in captured
+order. Each one gets the captured sender (with --sender-prefix so it does not mix
+with real conversations), language and X-Request-ID "replay-<original id>".
+Turns from the same sender are always sent one after another, so every
+conversation sees the same sequence of states it did live.
+
+  --speed 1   original inter-arrival times (2 = twice as fast)
+  --speed 0   as fast as possible, at most --concurrency turns in flight
+
+  --mode audio  POST the stored upload to /api/voice-query (needs the capture to
+                have run with TRAFFIC_CAPTURE_AUDIO=1); exercises ASR onwards
+  --mode text   POST the captured user_text to the Rasa webhook, with the same
+                metadata (auth block included) the gateway sends; NLU and
+                actions only
+
+The report compares latency with what the capture recorded, and counts how often
+the transcript and first bot text still match.
+
+    python -m benchmarks.replay traffic_capture/ --start-stack --speed 0 --concurrency 8
+    python -m benchmarks.replay traffic_capture/ --url http://127.0.0.1:8002 --out replay.json
+    python -m benchmarks.replay traffic_capture/ --mode text --rasa-url http://localhost:5005/webhooks/rest/webhook
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.load_test import (
+    BENCH_BANK_PORT,
+    BENCH_GATEWAY_PORT,
+    BENCH_RASA_PORT,
+    Stack,
+    percentile,
+)
+
+
+# Captured turns
+
+def _capture_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "traffic-*.jsonl")))
+        else:
+            files.append(path)
+    return files
+
+
+def load_turns(paths: List[str], statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """All captured turns, ordered by start time. Torn lines (a crash mid-write) are skipped."""
+    turns = []
+    for path in _capture_files(paths):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    turn = json.loads(line)
+                except ValueError:
+                    continue
+                if statuses and turn.get("status") not in statuses:
+                    continue
+                turn["_capture_dir"] = os.path.dirname(os.path.abspath(path))
+                turns.append(turn)
+    turns.sort(key=lambda t: (t["ts"], t["request_id"]))
+    return turns
+
+
+def audio_path(turn: Dict[str, Any]) -> Optional[str]:
+    digest = turn.get("audio_sha256")
+    if not digest:
+        return None
+    hits = glob.glob(os.path.join(turn["_capture_dir"], "audio", digest + ".*"))
+    return hits[0] if hits else None
+
+
+def first_text(rasa_messages: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    for msg in rasa_messages or []:
+        if "text" in msg:
+            return msg["text"]
+    return None
+
+
+# Replay
+
+async def _send_audio(client: httpx.AsyncClient, base_url: str, turn: Dict[str, Any], sender: str) -> Dict[str, Any]:
+    path = audio_path(turn)
+    if path is None:
+        return {"status": "missing_audio"}
+    with open(path, "rb") as f:
+        data = f.read()
+    resp = await client.post(
+        base_url.rstrip("/") + "/api/voice-query",
+        files={"file": (turn.get("filename") or os.path.basename(path), data)},
+        data={"lang": turn["lang"], "sender_id": sender},
+        headers={"X-Request-ID": "replay-" + turn["request_id"]},
+    )
+    if resp.status_code != 200:
+        return {"status": f"http_{resp.status_code}"}
+    body = resp.json()
+    return {"status": "ok", "user_text": body.get("user_text"), "bot_text": body.get("bot_text")}
+
+
+def _gateway_auth(sender: str) -> Dict[str, Any]:
+    """Same auth block as voice_api.gateway_auth (importing voice_api loads the ASR model)."""
+    return {
+        "user_id": sender,
+        "biometric_score": 0.92,
+        "liveness_passed": True,
+        "otp_verified": False,
+        "channel": "voice",
+        "risk_label": "low",
+    }
+
+
+async def _send_text(client: httpx.AsyncClient, rasa_url: str, turn: Dict[str, Any], sender: str) -> Dict[str, Any]:
+    if not (turn.get("user_text") or "").strip():
+        return {"status": "no_text"}
+    resp = await client.post(
+        rasa_url,
+        json={
+            "sender": sender,
+            "message": turn["user_text"],
+            "metadata": {
+                "lang": turn["lang"],
+                "auth": _gateway_auth(sender),
+                "request_id": "replay-" + turn["request_id"],
+            },
+        },
+    )
+    if resp.status_code != 200:
+        return {"status": f"http_{resp.status_code}"}
+    return {"status": "ok", "user_text": turn["user_text"], "bot_text": first_text(resp.json())}
+
+
+def _captured_ms(turn: Dict[str, Any], mode: str) -> Optional[float]:
+    """Captured time for the part of the turn being replayed."""
+    if mode == "audio":
+        return turn.get("total_ms")
+    stages = turn.get("stages_ms") or {}
+    return stages.get("rasa", stages.get("fast_path"))
+
+
+async def replay(
+    turns: List[Dict[str, Any]],
+    mode: str,
+    target_url: str,
+    speed: float,
+    concurrency: int,
+    sender_prefix: str,
+) -> List[Dict[str, Any]]:
+    """Send every turn on its (scaled) captured schedule; returns one result per turn."""
+    send = _send_audio if mode == "audio" else _send_text
+    limit = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+    previous: Dict[str, asyncio.Task] = {}
+    origin = turns[0]["ts"] if turns else 0.0
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0)) as client:
+        started = time.perf_counter()
+
+        async def one(turn: Dict[str, Any], before: Optional[asyncio.Task]) -> Dict[str, Any]:
+            due = (turn["ts"] - origin) / speed if speed > 0 else 0.0
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if before is not None:
+                await asyncio.wait({before})
+            if limit is not None:
+                await limit.acquire()
+            try:
+                lag = (time.perf_counter() - started) - due
+                sent = time.perf_counter()
+                try:
+                    out = await send(client, target_url, turn, sender_prefix + turn["sender_id"])
+                except httpx.HTTPError as e:
+                    out = {"status": type(e).__name__}
+                elapsed_ms = (time.perf_counter() - sent) * 1000.0
+            finally:
+                if limit is not None:
+                    limit.release()
+            return {
+                "request_id": turn["request_id"],
+                "sender_id": turn["sender_id"],
+                "lang": turn["lang"],
+                "captured_ms": _captured_ms(turn, mode),
+                "replay_ms": round(elapsed_ms, 2),
+                "schedule_lag_ms": round(max(lag * 1000.0, 0.0), 2) if speed > 0 else None,
+                "captured_user_text": turn.get("user_text"),
+                "captured_bot_text": first_text(turn.get("rasa_messages")),
+                **out,
+            }
+
+        tasks = []
+        for turn in turns:
+            task = asyncio.create_task(one(turn, previous.get(turn["sender_id"])))
+            previous[turn["sender_id"]] = task
+            tasks.append(task)
+        return list(await asyncio.gather(*tasks))
+
+
+def summarize(results: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    statuses: Dict[str, int] = defaultdict(int)
+    for r in results:
+        statuses[r["status"]] += 1
+    ok = [r for r in results if r["status"] == "ok"]
+
+    def pcts(values: List[float]) -> Dict[str, float]:
+        return {f"p{int(q * 100)}": round(percentile(values, q), 1) for q in (0.5, 0.95, 0.99)}
+
+    def match_rate(key: str) -> Optional[float]:
+        pairs = [r for r in ok if r.get(f"captured_{key}") is not None]
+        if not pairs:
+            return None
+        return round(sum(r.get(key) == r[f"captured_{key}"] for r in pairs) / len(pairs), 4)
+
+    lags = [r["schedule_lag_ms"] for r in results if r.get("schedule_lag_ms") is not None]
+    return {
+        "turns": len(results),
+        "statuses": dict(statuses),
+        "wall_seconds": round(wall_s, 2),
+        "captured_latency_ms": pcts([r["captured_ms"] for r in ok if r.get("captured_ms") is not None]),
+        "replay_latency_ms": pcts([r["replay_ms"] for r in ok]),
+        "schedule_lag_ms": pcts(lags) if lags else None,
+        "user_text_match": match_rate("user_text"),
+        "bot_text_match": match_rate("bot_text"),
+    }
+
+
+def _mismatches(results: List[Dict[str, Any]], limit: int) -> List[Tuple[str, str, Any, Any]]:
+    out = []
+    for r in results:
+        if r["status"] != "ok":
+            continue
+        for key in ("user_text", "bot_text"):
+            if r.get(f"captured_{key}") is not None and r.get(key) != r[f"captured_{key}"]:
+                out.append((r["request_id"], key, r[f"captured_{key}"], r.get(key)))
+    return out[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay captured SahaYaa traffic against a build.")
+    parser.add_argument("captures", nargs="+", help="capture directories and/or traffic-*.jsonl files")
+    parser.add_argument("--mode", choices=["audio", "text"], default="audio")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{BENCH_GATEWAY_PORT}", help="gateway for --mode audio")
+    parser.add_argument("--rasa-url", default=os.getenv("RASA_REST_URL", "http://localhost:5005/webhooks/rest/webhook"),
+                        help="Rasa webhook for --mode text")
+    parser.add_argument("--start-stack", action="store_true", help="launch mocks, action server + gateway locally (audio mode)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra gateway env with --start-stack")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="time scale for captured inter-arrival gaps; 0 sends as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=0, help="max turns in flight (0 = no limit)")
+    parser.add_argument("--status", action="append", default=None,
+                        help="captured statuses to replay (default: ok, no_speech)")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N turns")
+    parser.add_argument("--sender-prefix", default="replay_")
+    parser.add_argument("--show-mismatches", type=int, default=10)
+    parser.add_argument("--out", default=None, help="write the report and per-turn results as JSON")
+    args = parser.parse_args()
+
+    turns = load_turns(args.captures, args.status or ["ok", "no_speech"])
+    if args.limit:
+        turns = turns[:args.limit]
+    if not turns:
+        raise SystemExit("[REPLAY] No captured turns found")
+    print(f"[REPLAY] {len(turns)} turn(s) from {len({t['sender_id'] for t in turns})} sender(s), mode={args.mode}")
+
+    stack = None
+    target = args.url if args.mode == "audio" else args.rasa_url
+    if args.start_stack:
+        extra = dict(kv.split("=", 1) for kv in args.env)
+        stack = Stack(BENCH_GATEWAY_PORT, BENCH_BANK_PORT, BENCH_RASA_PORT, extra)
+        stack.start()
+        if args.mode == "audio":
+            target = stack.url
+
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(replay(turns, args.mode, target, args.speed, args.concurrency, args.sender_prefix))
+        wall = time.perf_counter() - started
+    finally:
+        if stack is not None:
+            stack.stop()
+
+    report = {"mode": args.mode, "speed": args.speed, "concurrency": args.concurrency, **summarize(results, wall)}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for request_id, key, before, after in _mismatches(results, args.show_mismatches):
+        print(f"[REPLAY] {request_id} {key}: {before!r} -> {after!r}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"report": report, "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
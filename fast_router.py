@@ -0,0 +1,324 @@
+# fast_router.py
+
+"""
+In-gateway fast path for common, easy turns.
+
+A compact keyword matcher is built from the data/nlu.yml examples, and the
+intent -> action mapping comes from the single-step rules in data/rules.yml. It
+runs on the normalized, number-parsed text. When the matcher is confident and the
+intent is whitelisted (FAST_PATH_INTENTS), the gateway runs the action in-process
+instead of sending the turn through Rasa NLU/Core and the action server.
+
+The conversation stays consistent with Rasa. The fast path reads the current
+slots from the tracker and only fires when no OTP, form or follow-up action is
+pending. Afterwards it appends the same events Rasa would have logged (user,
+action, bot messages, slot sets, action_listen) to the tracker. If anything is
+uncertain or fails, the turn falls through to Rasa unchanged. Callers hold
+sender_lock(sender_id) for the whole turn, so the tracker read and the append
+are not interleaved with another turn from the same sender.
+
+Balance reads must match what the action server sees. Transfers invalidate the
+account cache through the shared KV, so without REDIS_URL the gateway turns its
+own copy of the cache off.
+
+Needs the Rasa server started with --enable-api, and the action dependencies
+(rasa_sdk, TTS) installed in the gateway.
+"""
+
+import asyncio
+import os
+import re
+import time
+import weakref
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set, Text, Tuple
+
+import yaml
+
+from normalizer_multi import normalize_text
+from number_parser import parse_numbers
+
+
+# Basic config
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "0") == "1"
+FAST_PATH_INTENTS = [i.strip() for i in os.getenv("FAST_PATH_INTENTS", "balance_check,transaction_history").split(",") if i.strip()]
+FAST_PATH_THRESHOLD = float(os.getenv("FAST_PATH_THRESHOLD", "0.9"))
+FAST_PATH_MAX_TOKENS = int(os.getenv("FAST_PATH_MAX_TOKENS", "8"))
+NLU_DATA_PATH = os.getenv("NLU_DATA_PATH", os.path.join(BASE_DIR, "data", "nlu.yml"))
+RULES_DATA_PATH = os.getenv("RULES_DATA_PATH", os.path.join(BASE_DIR, "data", "rules.yml"))
+
+_ENTITY_ANNOTATION = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_UNKNOWN_WEIGHT = 0.5  # how much an unseen word counts against a match
+
+# Pronouns, helper verbs and politeness words: they carry no intent, so they are
+# neither scored nor counted as unknown (the training data is mostly native script)
+_NEUTRAL_WORDS = frozenset("""
+    mera meri mere mujhe muje hamara apna ka ki ke ko hai he kya kitna kitne kitni
+    batao bata bataiye bataye dikhao dikha dikhaiye karo kar kariye do dijiye zara
+    jara please pls plz na yaar ji abhi
+    my me i is the a of what how show tell give can you please now
+    मेरा मेरी मेरे मुझे का की के को है क्या कितना कितने बताओ बताइए दिखाओ करो दो ज़रा जरा अभी
+""".split())
+
+
+def _tokens(text: Text) -> List[Text]:
+    """Content tokens of normalized text (punctuation, bare numbers and neutral words dropped)."""
+    return [t for t in text.split() if any(ch.isalpha() for ch in t) and t not in _NEUTRAL_WORDS]
+
+
+def _features(tokens: List[Text]) -> Set[Text]:
+    feats = set(tokens)
+    feats.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return feats
+
+
+class IntentMatcher:
+    """
+    Keyword matcher over training examples.
+
+    Each word and bigram gets a weight per intent: the share of training examples
+    containing it that belong to that intent. An utterance scores
+    top_intent / (all intents + 0.5 per unseen word), so text outside the training
+    vocabulary, or keywords of another intent, pull confidence down. Exact
+    training examples match with confidence 1.0. Utterances with an amount or an
+    account (the nlu.yml regexes and lookups) always go to Rasa for entity extraction.
+    Neutral words (pronouns, "batao", "please") are ignored on both sides.
+    """
+
+    def __init__(self, examples: Dict[Text, List[Text]], reject_patterns: List[Text], min_amount: float = 100):
+        self.exact: Dict[Text, Text] = {}
+        self.weights: Dict[Text, Dict[Text, float]] = {}
+        self.reject = re.compile("|".join(f"(?:{p})" for p in reject_patterns), re.IGNORECASE) if reject_patterns else None
+        self.min_amount = min_amount
+
+        doc_freq: Dict[Text, Counter] = defaultdict(Counter)
+        for intent, texts in examples.items():
+            for text in texts:
+                norm = self._prepare(text)
+                self.exact.setdefault(norm, intent)
+                for feat in _features(_tokens(norm)):
+                    doc_freq[feat][intent] += 1
+
+        for feat, per_intent in doc_freq.items():
+            total = sum(per_intent.values())
+            self.weights[feat] = {intent: n / total for intent, n in per_intent.items()}
+
+    @staticmethod
+    def _prepare(text: Text, lang: Optional[Text] = None) -> Text:
+        return parse_numbers(normalize_text(text, lang), lang)
+
+    @classmethod
+    def from_nlu_file(cls, path: Text = NLU_DATA_PATH) -> "IntentMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+
+        examples: Dict[Text, List[Text]] = defaultdict(list)
+        reject: List[Text] = []
+        amounts: List[float] = []
+
+        for block in data.get("nlu", []):
+            lines = [
+                line.strip()[2:].strip()
+                for line in (block.get("examples") or "").splitlines()
+                if line.strip().startswith("- ")
+            ]
+            if "intent" in block:
+                examples[block["intent"]].extend(_ENTITY_ANNOTATION.sub(r"\1", line) for line in lines)
+            elif block.get("regex") == "account":
+                reject.extend(lines)
+            elif "lookup" in block:
+                amounts.extend(float(x) for x in lines if _NUMBER.fullmatch(x))
+
+        return cls(examples, reject, min(amounts) if amounts else 100)
+
+    def has_entities(self, text: Text) -> bool:
+        if self.reject is not None and self.reject.search(text):
+            return True
+        return any(float(n) >= self.min_amount for n in _NUMBER.findall(text))
+
+    def match(self, text: Text) -> Optional[Tuple[Text, float]]:
+        """(intent, confidence) for already-normalized text, or None."""
+        text = text.strip()
+        if not text or self.has_entities(text):
+            return None
+
+        if text in self.exact:
+            return self.exact[text], 1.0
+
+        if len(text.split()) > FAST_PATH_MAX_TOKENS:
+            return None
+        tokens = _tokens(text)
+        if not tokens:
+            return None
+
+        scores: Dict[Text, float] = defaultdict(float)
+        unknown = sum(1 for tok in tokens if tok not in self.weights)
+        for feat in _features(tokens):
+            for intent, w in self.weights.get(feat, {}).items():
+                scores[intent] += w
+
+        if not scores:
+            return None
+        intent, top = max(scores.items(), key=lambda kv: kv[1])
+        confidence = top / (sum(scores.values()) + _UNKNOWN_WEIGHT * unknown)
+        return intent, round(confidence, 4)
+
+
+def load_rule_routes(path: Text = RULES_DATA_PATH) -> Dict[Text, Text]:
+    """intent -> action for every rule that is exactly 'intent, then one action'."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    routes: Dict[Text, Text] = {}
+    for rule in data.get("rules", []):
+        steps = rule.get("steps") or []
+        if len(steps) == 2 and "intent" in steps[0] and "action" in steps[1]:
+            routes[steps[0]["intent"]] = steps[1]["action"]
+    return routes
+
+
+class FastRouter:
+    """Answers whitelisted high-confidence turns in-process, keeping the Rasa tracker in sync."""
+
+    def __init__(self, rasa_client, intents: Optional[List[Text]] = None, threshold: float = FAST_PATH_THRESHOLD):
+        self.rasa = rasa_client
+        self.intents = set(intents or FAST_PATH_INTENTS)
+        self.threshold = threshold
+        self.matcher: Optional[IntentMatcher] = None
+        self.routes: Dict[Text, Text] = {}
+        self._actions: Dict[Text, Any] = {}
+        self._locks: "weakref.WeakValueDictionary[Text, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.counts: Counter = Counter()
+
+    def start(self) -> None:
+        """Build the matcher and load the action classes (blocking; call from a thread)."""
+        self.matcher = IntentMatcher.from_nlu_file()
+        self.routes = {i: a for i, a in load_rule_routes().items() if i in self.intents}
+
+        # The action server owns TTS warm-up; the gateway finds its audio in the cache
+        os.environ.setdefault("TTS_WARMUP_ON_START", "0")
+        import actions
+        from rasa_sdk import Action
+
+        cache = actions.banking_client.cache
+        if cache.enabled and not cache.shared:
+            # Transfers on the action server can't invalidate an in-process cache
+            cache.enabled = False
+            print("[FAST_PATH] REDIS_URL not set, account cache off in the gateway")
+
+        for obj in vars(actions).values():
+            if isinstance(obj, type) and issubclass(obj, Action) and obj is not Action:
+                instance = obj()
+                if instance.name() in self.routes.values():
+                    self._actions[instance.name()] = instance
+
+        print(f"[FAST_PATH] Routing {sorted(self.routes.items())} above confidence {self.threshold}")
+
+    def sender_lock(self, sender_id: Text) -> asyncio.Lock:
+        """One lock per sender, dropped once no turn holds it."""
+        lock = self._locks.get(sender_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[sender_id] = lock
+        return lock
+
+    def classify(self, text: Text) -> Optional[Tuple[Text, float]]:
+        if self.matcher is None:
+            return None
+        hit = self.matcher.match(text)
+        if hit is None or hit[0] not in self.routes or hit[1] < self.threshold:
+            return None
+        return hit
+
+    async def handle(self, text: Text, sender_id: Text, metadata: Dict[Text, Any]) -> Optional[List[Dict[Text, Any]]]:
+        """
+        Rasa-style REST messages if the turn was answered here, else None (send it to Rasa).
+
+        Call with sender_lock(sender_id) held.
+        """
+        from rasa_sdk import Tracker
+        from rasa_sdk.executor import CollectingDispatcher
+        from starlette.concurrency import run_in_threadpool
+
+        hit = self.classify(text)
+        if hit is None:
+            self.counts["passed"] += 1
+            return None
+        intent, confidence = hit
+        action_name = self.routes[intent]
+        action = self._actions.get(action_name)
+        if action is None:
+            self.counts["passed"] += 1
+            return None
+
+        try:
+            state = await self.rasa.get_tracker(sender_id)
+        except Exception as e:
+            print("[FAST_PATH] Tracker unavailable, using Rasa:", repr(e))
+            self.counts["fallback"] += 1
+            return None
+
+        slots = state.get("slots") or {}
+        if slots.get("awaiting_otp") or (state.get("active_loop") or {}).get("name") or state.get("followup_action") or state.get("paused"):
+            # Mid-flow turns need Rasa's policies
+            self.counts["passed"] += 1
+            return None
+
+        parse_data = {
+            "text": text,
+            "intent": {"name": intent, "confidence": confidence},
+            "intent_ranking": [{"name": intent, "confidence": confidence}],
+            "entities": [],
+        }
+        state["latest_message"] = {**parse_data, "metadata": metadata}
+        tracker = Tracker.from_dict(state)
+        dispatcher = CollectingDispatcher()
+
+        try:
+            if asyncio.iscoroutinefunction(action.run):
+                events = await action.run(dispatcher, tracker, {})
+            else:
+                events = await run_in_threadpool(action.run, dispatcher, tracker, {})
+        except Exception as e:
+            print(f"[FAST_PATH] {action_name} failed, using Rasa:", repr(e))
+            self.counts["fallback"] += 1
+            return None
+
+        now = time.time()
+        tracker_events = [
+            {"event": "user", "timestamp": now, "text": text, "parse_data": parse_data,
+             "input_channel": "rest", "metadata": metadata},
+            {"event": "action", "timestamp": now, "name": action_name, "policy": "fast_path", "confidence": confidence},
+            *[
+                {"event": "bot", "timestamp": now, "text": m.get("text"),
+                 "data": {k: m.get(k) for k in ("elements", "quick_replies", "buttons", "attachment", "image", "custom")},
+                 "metadata": {}}
+                for m in dispatcher.messages
+            ],
+            *(events or []),
+            {"event": "action", "timestamp": now, "name": "action_listen"},
+        ]
+
+        try:
+            await self.rasa.append_events(sender_id, tracker_events)
+        except Exception as e:
+            # The user already has an answer; the tracker just misses this turn
+            print("[FAST_PATH] Could not append events to tracker:", repr(e))
+            self.counts["unsynced"] += 1
+
+        self.counts[f"handled:{intent}"] += 1
+        print(f"[FAST_PATH] {intent} ({confidence}) -> {action_name}")
+
+        messages = []
+        for m in dispatcher.messages:
+            out: Dict[Text, Any] = {"recipient_id": sender_id}
+            for key in ("text", "custom", "image", "buttons", "attachment"):
+                if m.get(key):
+                    out[key] = m[key]
+            messages.append(out)
+        return messages
+
+    def stats(self) -> Dict[Text, Any]:
+        return {"enabled": self.matcher is not None, "threshold": self.threshold, "counts": dict(self.counts)}
@@ -0,0 +1,200 @@
+# inference_pool.py
+
+"""
+Inference execution layer for the SahaYaa voice gateway.
+
+Owns the IndicConformer model and runs forward passes on a thread pool or a
+process pool, so the FastAPI event loop never blocks on model compute. In process
+mode each worker loads the model once (in the pool initializer) and receives
+batches over the pool's work queue. With INFERENCE_SHARE_WEIGHTS=1 the parent
+loads it instead and hands the workers its weights in shared memory, so N workers
+hold one copy.
+
+If ASR_SNAPSHOT_DIR points at a local copy of the model repo (see
+`python model_lifecycle.py snapshot`), it is loaded from disk with no hub round
+trips; safetensors weights are memory-mapped rather than read into fresh buffers.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+import torch
+import torch.multiprocessing as torch_mp
+
+from asr_optimize import ASR_TORCH_THREADS, configure_threads, optimize_model
+
+
+# Basic config
+ASR_MODEL_ID = os.getenv("ASR_MODEL_ID", "ai4bharat/indic-conformer-600m-multilingual")
+ASR_SNAPSHOT_DIR = os.getenv("ASR_SNAPSHOT_DIR", "")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "thread")  # thread | process
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_SHARE_WEIGHTS = os.getenv("INFERENCE_SHARE_WEIGHTS", "0") == "1"
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+
+# Model (one instance per process)
+
+_asr_model = None
+_model_lock = threading.Lock()
+_batch_forward_ok = True
+
+
+def model_source() -> str:
+    """Local snapshot directory if one is configured and present, else the hub model id."""
+    if ASR_SNAPSHOT_DIR and os.path.isdir(ASR_SNAPSHOT_DIR):
+        return ASR_SNAPSHOT_DIR
+    return ASR_MODEL_ID
+
+
+def load_asr_model(optimize: bool = True):
+    """Load a fresh IndicConformer instance, in the configured inference mode (see asr_optimize.py)."""
+    # Imported here: transformers alone adds seconds to gateway import
+    from transformers import AutoModel
+
+    source = model_source()
+    print(f"[INFERENCE] pid={os.getpid()} loading IndicConformer from {source} on {DEVICE}...")
+    model = AutoModel.from_pretrained(
+        source,
+        trust_remote_code=True,
+        local_files_only=source != ASR_MODEL_ID,
+    ).to(DEVICE)
+    if optimize:
+        model = optimize_model(model, DEVICE)
+    return model
+
+
+def get_asr_model():
+    """Load IndicConformer on first use and reuse it for the life of the process."""
+    global _asr_model
+
+    if _asr_model is None:
+        with _model_lock:
+            if _asr_model is None:
+                _asr_model = load_asr_model()
+                print(f"[INFERENCE] pid={os.getpid()} model ready")
+    return _asr_model
+
+
+def _shareable_model():
+    """Parent-loaded model with its tensors moved to shared memory, or None if it can't be sent."""
+    model = get_asr_model()
+    try:
+        model.share_memory()
+        # Importing torch.multiprocessing makes this pickler send tensors as shared handles
+        torch_mp.reductions.ForkingPickler.dumps(model)
+    except Exception as e:
+        print(f"[INFERENCE] Weights can't be shared with workers, each loads its own: {e!r}")
+        return None
+    return model
+
+
+def forward_batch(wavs: List[torch.Tensor], lang_code: str) -> List[str]:
+    """
+    Pad same-language waveforms into one (B, T) tensor and decode them together.
+
+    Falls back to one call per utterance if the model returns a single hypothesis.
+    """
+    global _batch_forward_ok
+
+    model = get_asr_model()
+
+    with torch.inference_mode():
+        if len(wavs) == 1 or not _batch_forward_ok:
+            return [model(w.to(DEVICE), lang_code, "rnnt") for w in wavs]
+
+        max_len = max(w.shape[-1] for w in wavs)
+        batch = torch.zeros(len(wavs), max_len)
+        for i, w in enumerate(wavs):
+            batch[i, : w.shape[-1]] = w[0]
+
+        out = model(batch.to(DEVICE), lang_code, "rnnt")
+        if isinstance(out, (list, tuple)) and len(out) == len(wavs):
+            return list(out)
+
+        print("[ASR_BATCH] Model did not return one hypothesis per row; batching disabled")
+        _batch_forward_ok = False
+        return [model(w.to(DEVICE), lang_code, "rnnt") for w in wavs]
+
+
+def _init_worker(torch_threads: int, shared_model=None) -> None:
+    """Process-pool initializer: pin thread count and load (or adopt) the model once."""
+    global _asr_model
+
+    configure_threads(torch_threads)
+    if shared_model is not None:
+        _asr_model = shared_model
+        print(f"[INFERENCE] pid={os.getpid()} using shared weights")
+    get_asr_model()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+# Pool
+
+class InferencePool:
+    """Thread- or process-backed executor for model work."""
+
+    def __init__(self, backend: str = INFERENCE_BACKEND, workers: int = INFERENCE_WORKERS):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown inference backend: {backend!r}")
+        self.backend = backend
+        self.workers = max(1, workers)
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        return self._executor
+
+    def start(self) -> Executor:
+        """Create the executor and load the model in its workers; blocks until they are ready."""
+        if self._executor is not None:
+            return self._executor
+
+        if self.backend == "thread":
+            configure_threads()
+            get_asr_model()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="asr-infer",
+            )
+        else:
+            torch_threads = ASR_TORCH_THREADS or max(1, (os.cpu_count() or 1) // self.workers)
+            shared = _shareable_model() if INFERENCE_SHARE_WEIGHTS else None
+            # spawn, not fork: torch/CUDA state must not be inherited half-initialised
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=(torch_mp if shared is not None else multiprocessing).get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(torch_threads, shared),
+            )
+            # Start every worker now and wait until each has its model
+            try:
+                for ping in [executor.submit(_ping) for _ in range(self.workers)]:
+                    ping.result()
+            except Exception:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            self._executor = executor
+
+        print(f"[INFERENCE] {self.backend} pool started with {self.workers} worker(s)")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the pool and await the result without blocking the loop."""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,114 @@
+# model_lifecycle.py
+
+"""
+Background model loading and readiness for the voice gateway.
+
+The gateway process comes up straight away, and IndicConformer loads on a
+background thread (in the inference pool's workers for the process backend).
+Liveness (/healthz) only says the process is serving. Readiness (/readyz) turns
+green once the model is loaded, so a load balancer keeps traffic on the old
+replicas until the new ones can answer.
+
+Startup is fastest from a local snapshot of the model repo, which avoids hub
+lookups and lets safetensors weights be memory-mapped:
+
+    python model_lifecycle.py snapshot /models/indic-conformer
+    ASR_SNAPSHOT_DIR=/models/indic-conformer uvicorn voice_api:app
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from inference_pool import ASR_MODEL_ID, InferencePool
+
+
+class ModelLifecycle:
+    """Loads the inference pool in the background and tracks loading -> ready | failed."""
+
+    def __init__(self, pool: InferencePool, on_ready: Optional[Callable[[InferencePool], None]] = None):
+        self.pool = pool
+        self.on_ready = on_ready
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start loading; returns immediately."""
+        if self._thread is not None:
+            return
+        self.state = "loading"
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._load, name="model-load", daemon=True)
+        self._thread.start()
+
+    def _load(self) -> None:
+        try:
+            self.pool.start()
+            if self.on_ready is not None:
+                self.on_ready(self.pool)
+        except Exception as e:
+            self.state = "failed"
+            self.error = repr(e)
+            print("[MODEL] Load failed:", self.error)
+            return
+
+        self._ready_at = time.time()
+        self.state = "ready"
+        self._ready.set()
+        print(f"[MODEL] Ready after {self._ready_at - self._started_at:.1f}s")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self.state == "failed"
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        load_s = None
+        if self._started_at is not None:
+            load_s = round((self._ready_at or time.time()) - self._started_at, 1)
+        return {
+            "state": self.state,
+            "backend": self.pool.backend,
+            "workers": self.pool.workers,
+            "load_seconds": load_s,
+            "error": self.error,
+        }
+
+
+# Snapshot CLI
+
+def snapshot(target_dir: str, model_id: str = ASR_MODEL_ID) -> str:
+    """Download the model repo (weights, config, remote code) into target_dir."""
+    from huggingface_hub import snapshot_download
+
+    path = snapshot_download(repo_id=model_id, local_dir=target_dir)
+    print(f"[MODEL] Snapshot of {model_id} written to {path}; set ASR_SNAPSHOT_DIR={path}")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model utilities for the SahaYaa voice gateway.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="copy the ASR model repo to a local directory")
+    snap.add_argument("target_dir")
+    snap.add_argument("--model-id", default=ASR_MODEL_ID)
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        snapshot(os.path.abspath(args.target_dir), args.model_id)
+
+
+if __name__ == "__main__":
+    main()
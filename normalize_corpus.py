@@ -0,0 +1,237 @@
+# normalize_corpus.py
+
+"""
+Re-normalize an archived transcript corpus with the current normalizer.
+
+Streams a JSONL or plain-text file through normalizer_multi across a process
+pool, in chunks, and writes the results in input order. Only a bounded number of
+chunks is in flight, so memory stays flat whatever the corpus size. After every
+written chunk a small checkpoint records how far the run got; --resume picks up
+from there after an interruption.
+
+  python normalize_corpus.py transcripts.jsonl out.jsonl --field text --lang-field lang
+  python normalize_corpus.py transcripts.txt out.txt --resume
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Text, Tuple
+
+
+# Basic config
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", str(os.cpu_count() or 1)))
+NORMALIZE_CHUNK_LINES = int(os.getenv("NORMALIZE_CHUNK_LINES", "2000"))
+
+
+# Worker side
+
+def _normalize_chunk(
+    job: Tuple[List[Text], Text, List[Text], Text, Optional[Text], Text],
+) -> Tuple[List[Text], int]:
+    """Normalize one chunk of raw lines; returns output lines and how many were passed through."""
+    from normalizer_multi import normalize_text
+
+    lines, fmt, fields, out_field, lang, lang_field = job
+    out: List[Text] = []
+    skipped = 0
+
+    for line in lines:
+        if fmt == "text":
+            out.append(normalize_text(line, lang))
+            continue
+
+        if not line.strip():
+            out.append(line)
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            out.append(line)
+            skipped += 1
+            continue
+
+        record_lang = record.get(lang_field, lang) if lang_field and isinstance(record, dict) else lang
+        if record_lang is not None and not isinstance(record_lang, str):
+            # A malformed code must not kill the chunk; unknown codes get the union profile
+            record_lang = str(record_lang)
+        for field in fields:
+            value = record.get(field) if isinstance(record, dict) else None
+            if isinstance(value, str):
+                if not out_field:
+                    target = field
+                elif len(fields) == 1:
+                    target = out_field
+                else:
+                    target = f"{field}_{out_field}"
+                record[target] = normalize_text(value, record_lang)
+        out.append(json.dumps(record, ensure_ascii=False))
+
+    return out, skipped
+
+
+# Checkpointing
+
+def _checkpoint_path(out_path: Text) -> Text:
+    return out_path + ".ckpt"
+
+
+def _load_checkpoint(out_path: Text) -> Optional[Dict[Text, Any]]:
+    try:
+        with open(_checkpoint_path(out_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(out_path: Text, state: Dict[Text, Any]) -> None:
+    path = _checkpoint_path(out_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+# Driver
+
+def _read_chunks(path: Text, chunk_lines: int, skip_lines: int) -> Iterator[List[Text]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        lines = (line.rstrip("\r\n") for line in f)
+        for _ in islice(lines, skip_lines):
+            pass
+        while True:
+            chunk = list(islice(lines, chunk_lines))
+            if not chunk:
+                return
+            yield chunk
+
+
+def normalize_corpus(
+    in_path: Text,
+    out_path: Text,
+    fmt: Text = "jsonl",
+    fields: Optional[List[Text]] = None,
+    out_field: Text = "",
+    lang: Optional[Text] = None,
+    lang_field: Text = "",
+    workers: int = NORMALIZE_WORKERS,
+    chunk_lines: int = NORMALIZE_CHUNK_LINES,
+    resume: bool = False,
+) -> Dict[Text, Any]:
+    """Normalize in_path into out_path; returns run stats."""
+    fields = fields or ["text"]
+    settings = {
+        "input": os.path.abspath(in_path),
+        "format": fmt,
+        "fields": fields,
+        "out_field": out_field,
+        "lang": lang,
+        "lang_field": lang_field,
+    }
+
+    done_lines = 0
+    done_bytes = 0
+    if resume:
+        state = _load_checkpoint(out_path)
+        if state and state.get("settings") == settings:
+            done_lines = state["lines"]
+            done_bytes = state["bytes"]
+            print(f"[NORMALIZE] Resuming after {done_lines} lines")
+        elif state:
+            raise SystemExit("[NORMALIZE] Checkpoint was written with different settings; rerun without --resume")
+
+    mode = "r+b" if done_bytes else "wb"
+    if mode == "r+b" and not os.path.exists(out_path):
+        raise SystemExit(f"[NORMALIZE] Checkpoint found but {out_path} is missing")
+
+    skipped = 0
+    started = time.perf_counter()
+    start_lines = done_lines
+    last_report = started
+
+    with open(out_path, mode) as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        # Drop whatever a killed run wrote after its last checkpoint
+        out.seek(done_bytes)
+        out.truncate()
+
+        inflight = deque()
+        chunks = _read_chunks(in_path, chunk_lines, done_lines)
+
+        def submit_next() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            inflight.append((len(chunk), pool.submit(_normalize_chunk, (chunk, fmt, fields, out_field, lang, lang_field))))
+            return True
+
+        for _ in range(max(1, workers) * 2):
+            if not submit_next():
+                break
+
+        while inflight:
+            n_lines, future = inflight.popleft()
+            lines, chunk_skipped = future.result()
+            submit_next()
+
+            out.write("".join(line + "\n" for line in lines).encode("utf-8"))
+            out.flush()
+            done_lines += n_lines
+            done_bytes = out.tell()
+            skipped += chunk_skipped
+            _save_checkpoint(out_path, {"settings": settings, "lines": done_lines, "bytes": done_bytes})
+
+            now = time.perf_counter()
+            if now - last_report >= 5.0:
+                last_report = now
+                print(f"[NORMALIZE] {done_lines} lines ({(done_lines - start_lines) / (now - started):.0f} lines/s)")
+
+    os.remove(_checkpoint_path(out_path))
+
+    stats = {
+        "lines": done_lines,
+        "skipped": skipped,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    print(f"[NORMALIZE] Done: {stats}")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-normalize a transcript corpus for SahaYaa.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=["jsonl", "text"], default=None,
+                        help="default: jsonl for .jsonl/.json inputs, text otherwise")
+    parser.add_argument("--field", action="append", dest="fields",
+                        help="JSONL field to normalize (repeatable, default: text)")
+    parser.add_argument("--out-field", default="",
+                        help="write results to this field instead of overwriting (<field>_<out-field> with several fields)")
+    parser.add_argument("--lang", default=None, help="language profile for every line (default: union profile)")
+    parser.add_argument("--lang-field", default="", help="JSONL field holding each record's language code")
+    parser.add_argument("--workers", type=int, default=NORMALIZE_WORKERS)
+    parser.add_argument("--chunk-lines", type=int, default=NORMALIZE_CHUNK_LINES)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+
+    fmt = args.format or ("jsonl" if args.input.endswith((".jsonl", ".json")) else "text")
+
+    normalize_corpus(
+        args.input,
+        args.output,
+        fmt=fmt,
+        fields=args.fields,
+        out_field=args.out_field,
+        lang=args.lang,
+        lang_field=args.lang_field,
+        workers=args.workers,
+        chunk_lines=args.chunk_lines,
+        resume=args.resume,
+    )
+
+
+if __name__ == "__main__":
+    main()
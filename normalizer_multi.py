@@ -6,6 +6,9 @@ Lightweight Indic code-mix normalizer for SahaYaa.
 Cleans fillers, common banking slang, simple Hinglish, and prepares text for intent models.
 """
 
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
 import regex as re
 from unidecode import unidecode
 
@@ -99,98 +102,217 @@ BANKING_SYNONYMS = {
 }
 
 
-# Token helpers
+# Compiled engine
 
-def _tokenize(text: str):
-    """
-    Split text into simple word and punctuation tokens.
-    """
-    text = re.sub(r"([,.!?])", r" \1 ", text)
-    tokens = text.split()
-    return tokens
+NORMALIZER_CACHE_SIZE = 65536  # distinct tokens remembered per engine
 
+# One translate pass: unify quotes and pad sentence punctuation so split() isolates it
+_TOKEN_TABLE = str.maketrans({
+    "“": "\"", "”": "\"",
+    "’": "'", "‘": "'",
+    ",": " , ", ".": " . ", "!": " ! ", "?": " ? ",
+})
 
-def _is_latin(word: str) -> bool:
-    """
-    True if token is mainly Latin script (likely romanized).
-    """
-    w = unidecode(word)
-    return bool(re.fullmatch(r"[A-Za-z]+", w))
+_LATIN_RE = re.compile(r"[A-Za-z]+")
+_NA_ZARA_PARTS = ("zra", "zara", "jra", "sra")
+_NA_VARIANTS = frozenset({"na", "naa", "naaa"})
 
 
-# Filler detection
+class _PhraseTrie:
+    """Word-level trie over multiword fillers ("you know", "i mean")."""
+
+    _END = None
+
+    def __init__(self, phrases):
+        self.root = {}
+        for phrase in phrases:
+            words = phrase.split()
+            if len(words) < 2:
+                continue
+            node = self.root
+            for w in words:
+                node = node.setdefault(w, {})
+            node[self._END] = len(words)
 
-def is_filler_token(token: str) -> bool:
+    def match(self, tokens, i: int) -> int:
+        """Length of the longest filler phrase starting at tokens[i], 0 if none."""
+        node = self.root
+        best = 0
+        for tok in tokens[i:]:
+            node = node.get(tok)
+            if node is None:
+                break
+            best = node.get(self._END, best)
+        return best
+
+
+class CompiledNormalizer:
     """
-    Decide if a token is just conversational filler.
+    Normalizer for one filler set, compiled once.
+
+    Tokens are resolved (filler check, transliteration, slang maps) once each and
+    memoized, so a hypothesis costs one translate, one split and a dict hit per token.
     """
-    raw = token.strip().lower()
-    if not raw:
-        return False
 
-    if re.match(r"^ना.*रा$", raw) and len(raw) <= 5:
-        return True
+    def __init__(
+        self,
+        fillers,
+        synonyms=None,
+        roman_map=None,
+        na_zara: bool = True,
+        digits: str = "",
+        cache_size: int = NORMALIZER_CACHE_SIZE,
+    ):
+        self.fillers = frozenset(fillers)
+        self.synonyms = BANKING_SYNONYMS if synonyms is None else synonyms
+        self.roman_map = ROMAN_HI_MAP if roman_map is None else roman_map
+        self.na_zara = na_zara  # Hinglish "na" / "na zara" spellings
+        self.phrases = _PhraseTrie(self.fillers)
+        self._table = dict(_TOKEN_TABLE)
+        if digits:
+            # Native-script digits -> ASCII, in the same translate pass
+            self._table.update(str.maketrans(digits, "0123456789"))
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_token)
+
+    def is_filler(self, token: str) -> bool:
+        raw = token.strip().lower()
+        if not raw:
+            return False
+
+        # ना...रा, e.g. "नाज़रा", a common ASR spelling of "na zara"
+        if self.na_zara and raw.startswith("ना") and raw.endswith("रा") and len(raw) <= 5:
+            return True
 
-    roman = unidecode(raw).lower()
+        roman = unidecode(raw).lower()
 
-    if raw in ALL_FILLERS or roman in ALL_FILLERS:
-        return True
+        if raw in self.fillers or roman in self.fillers:
+            return True
 
-    if roman in {"na", "naa", "naaa"}:
-        return True
+        if not self.na_zara:
+            return False
 
-    if roman.startswith("na") and len(roman) <= 7:
-        if any(sub in roman for sub in ["zra", "zara", "jra", "sra"]):
+        if roman in _NA_VARIANTS:
             return True
 
-    return False
+        if roman.startswith("na") and len(roman) <= 7:
+            if any(sub in roman for sub in _NA_ZARA_PARTS):
+                return True
 
+        return False
 
-# Main normalizer
+    def _resolve_token(self, tok: str):
+        """Normalized form of one token, or None if it is a filler."""
+        if self.is_filler(tok):
+            return None
+
+        base = self.synonyms.get(tok, tok)
+        if base in self.roman_map and _is_latin(base):
+            base = self.roman_map[base]
+
+        return " ".join(base.split()) or None
+
+    def normalize(self, text: str) -> str:
+        tokens = text.strip().lower().translate(self._table).split()
+        resolve = self._resolve
+        match_phrase = self.phrases.match if self.phrases.root else None
 
-def normalize_text(text: str) -> str:
+        out = []
+        i = 0
+        n = len(tokens)
+        while i < n:
+            if match_phrase is not None:
+                skip = match_phrase(tokens, i)
+                if skip:
+                    i += skip
+                    continue
+            norm = resolve(tokens[i])
+            if norm is not None:
+                out.append(norm)
+            i += 1
+
+        return " ".join(out)
+
+
+# Token helpers
+
+def _tokenize(text: str):
     """
-    Clean code-mixed ASR text: drop fillers, map slang, and tidy spacing.
+    Split text into simple word and punctuation tokens.
     """
-    text = text.strip().lower()
+    return text.translate(_TOKEN_TABLE).split()
+
 
-    text = re.sub(r"[“”\"]", "\"", text)
-    text = re.sub(r"[’‘']", "'", text)
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def _is_latin(word: str) -> bool:
+    """
+    True if token is mainly Latin script (likely romanized).
+    """
+    return bool(_LATIN_RE.fullmatch(unidecode(word)))
+
+
+# Per-language profiles
+#
+# Each spoken language gets only its own fillers (plus English, which everyone
+# code-mixes), so a Tamil "ma" or Bengali "to" is left alone in Hindi speech.
+# Slang maps and the "na zara" rules are Hinglish-only. Native-script digits
+# are folded to ASCII. Unknown or missing lang codes use the union profile.
+
+LANG_PROFILES = {
+    "hi": dict(fillers=CORE_FILLERS | HINDI_FILLERS | ENGLISH_FILLERS, roman_map=ROMAN_HI_MAP,
+               na_zara=True, digits="०१२३४५६७८९"),
+    "mr": dict(fillers=CORE_FILLERS | ENGLISH_FILLERS, roman_map=ROMAN_HI_MAP,
+               na_zara=True, digits="०१२३४५६७८९"),
+    "en": dict(fillers=CORE_FILLERS | ENGLISH_FILLERS, roman_map={},
+               na_zara=False, digits=""),
+    "ta": dict(fillers=TAMIL_FILLERS | ENGLISH_FILLERS, roman_map={},
+               na_zara=False, digits="௦௧௨௩௪௫௬௭௮௯"),
+    "te": dict(fillers=TELUGU_FILLERS | ENGLISH_FILLERS, roman_map={},
+               na_zara=False, digits="౦౧౨౩౪౫౬౭౮౯"),
+    "bn": dict(fillers=BENGALI_FILLERS | ENGLISH_FILLERS, roman_map={},
+               na_zara=False, digits="০১২৩৪৫৬৭৮৯"),
+    "or": dict(fillers=CORE_FILLERS | ENGLISH_FILLERS, roman_map={},
+               na_zara=False, digits="୦୧୨୩୪୫୬୭୮୯"),
+}
 
-    tokens = _tokenize(text)
-    normalized_tokens = []
+_DEFAULT_ENGINE = CompiledNormalizer(ALL_FILLERS)
+_ENGINES = {lang: CompiledNormalizer(**profile) for lang, profile in LANG_PROFILES.items()}
 
-    for tok in tokens:
-        base = tok
 
-        if is_filler_token(base):
-            continue
+def get_normalizer(lang_code: Optional[str] = None) -> CompiledNormalizer:
+    """
+    Compiled engine for a language code (e.g. "hi", "ta-IN"); union profile if unknown.
+    """
+    if not lang_code:
+        return _DEFAULT_ENGINE
+    return _ENGINES.get(lang_code.split("-")[0].lower(), _DEFAULT_ENGINE)
 
-        leading_punct = ""
-        trailing_punct = ""
 
-        m_lead = re.match(r"^([,.!?]+)(.+)$", base)
-        if m_lead:
-            leading_punct, base = m_lead.group(1), m_lead.group(2)
+# Filler detection
 
-        m_trail = re.match(r"^(.+?)([,.!?]+)$", base)
-        if m_trail:
-            base, trailing_punct = m_trail.group(1), m_trail.group(2)
+def is_filler_token(token: str, lang_code: Optional[str] = None) -> bool:
+    """
+    Decide if a token is just conversational filler.
+    """
+    return get_normalizer(lang_code).is_filler(token)
 
-        if base in BANKING_SYNONYMS:
-            base = BANKING_SYNONYMS[base]
 
-        if _is_latin(base) and base in ROMAN_HI_MAP:
-            base = ROMAN_HI_MAP[base]
+# Main normalizer
 
-        token_final = leading_punct + base + trailing_punct
+def normalize_text(text: str, lang_code: Optional[str] = None) -> str:
+    """
+    Clean code-mixed ASR text: drop fillers (including multiword ones like
+    "you know"), map slang, and tidy spacing, using the profile for lang_code.
+    """
+    return get_normalizer(lang_code).normalize(text)
 
-        if token_final.strip():
-            normalized_tokens.append(token_final)
 
-    cleaned = " ".join(normalized_tokens)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    return cleaned
+def normalize_batch(texts: Iterable[str], lang_code: Optional[str] = None) -> Iterator[str]:
+    """
+    Lazily normalize many texts, in input order (see normalize_corpus.py for files).
+    """
+    normalize = get_normalizer(lang_code).normalize
+    for text in texts:
+        yield normalize(text)
 
 
 # Quick manual check
@@ -206,4 +328,4 @@ if __name__ == "__main__":
 
     for s in examples:
         print("\nRAW: ", s)
-        print("NORM:", normalize_text(s))
+        print("NORM:", normalize_text(s, "hi"))
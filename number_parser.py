@@ -0,0 +1,512 @@
+# number_parser.py
+
+"""
+Single-pass number-word parser for spoken amounts.
+
+Turns number words in normalized ASR text into digits, so amounts reach Rasa and
+the transfer action already numeric:
+
+  "पाँच हजार तीन सौ"     -> "5300"
+  "ढाई लाख"              -> "250000"
+  "saadhe teen hazaar"   -> "3500"
+  "৫ হাজার"              -> "5000"
+  "இரண்டாயிரம் ஐந்நூறு"   -> "2500"
+  "एक दो तीन चार"         -> "1 2 3 4"   (spoken digits, e.g. an OTP, stay separate)
+
+Covers Hindi, Marathi, Bengali, Tamil, Telugu, Odia, English and romanized Hindi,
+plus every native digit script. Each language's lexicon is compiled once into a
+dict. Parsing is one left-to-right pass over the tokens with one token of
+lookahead, so it is linear in the input.
+
+Some number words are also everyday words ("दो" = give, "do", "saath" = with,
+Bengali "নয়" = is not). They become numbers only in numeric context: right before
+a multiplier or currency word, after a fraction word (साढ़े, सवा, पौने), after a
+larger multiplier ("ek sau das" -> "110"), or inside a spoken digit sequence
+("ek do teen").
+
+"and" / "aur" / "और" (and the other languages' "and") right after a multiplier joins the parts of one number ("five
+hundred and fifty" -> "550"), but never two amounts of the same size ("two
+hundred and three hundred" stays two numbers).
+"""
+
+import re
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Text, Tuple
+
+
+# Lexicons
+#
+# units: word -> value (0-99, numbers that never combine with a following unit)
+# tens:  word -> value (20, 30, ... in languages that say "twenty five")
+# mults: word -> multiplier
+# fracs: word -> fractional value (डेढ़ = 1.5, ढाई = 2.5)
+# mods:  word -> offset applied to the next number (साढ़े +0.5, सवा +0.25, पौने -0.25)
+# compounds: word -> (unit, multiplier) for one-word forms like "पाचशे", "ஐந்தாயிரம்"
+# ambiguous: words that are only numbers in numeric context
+# connectors: words joining the parts of one number ("five hundred and fifty")
+
+_HINDI_1_TO_99 = (
+    "एक दो तीन चार पाँच छह सात आठ नौ दस "
+    "ग्यारह बारह तेरह चौदह पंद्रह सोलह सत्रह अठारह उन्नीस बीस "
+    "इक्कीस बाईस तेईस चौबीस पच्चीस छब्बीस सत्ताईस अट्ठाईस उनतीस तीस "
+    "इकतीस बत्तीस तैंतीस चौंतीस पैंतीस छत्तीस सैंतीस अड़तीस उनतालीस चालीस "
+    "इकतालीस बयालीस तैंतालीस चवालीस पैंतालीस छियालीस सैंतालीस अड़तालीस उनचास पचास "
+    "इक्यावन बावन तिरपन चौवन पचपन छप्पन सत्तावन अट्ठावन उनसठ साठ "
+    "इकसठ बासठ तिरसठ चौंसठ पैंसठ छियासठ सड़सठ अड़सठ उनहत्तर सत्तर "
+    "इकहत्तर बहत्तर तिहत्तर चौहत्तर पचहत्तर छिहत्तर सतहत्तर अठहत्तर उन्यासी अस्सी "
+    "इक्यासी बयासी तिरासी चौरासी पचासी छियासी सत्तासी अट्ठासी नवासी नब्बे "
+    "इक्यानवे बानवे तिरानवे चौरानवे पचानवे छियानवे सत्तानवे अट्ठानवे निन्यानवे"
+).split()
+
+HINDI = {
+    "units": {
+        "शून्य": 0,
+        **{w: i for i, w in enumerate(_HINDI_1_TO_99, start=1)},
+        "पांच": 5, "छः": 6, "छ": 6, "छे": 6, "पन्द्रह": 15,
+    },
+    "mults": {"सौ": 100, "हज़ार": 1000, "हजार": 1000, "लाख": 100000, "करोड़": 10 ** 7, "करोड": 10 ** 7},
+    "fracs": {"डेढ़": 1.5, "डेढ": 1.5, "ढाई": 2.5},
+    "mods": {"साढ़े": 0.5, "साढे": 0.5, "सवा": 0.25, "पौने": -0.25},
+    "ambiguous": {"दो", "तेरा"},  # तेरा is 13 in Marathi, "your" in Hindi
+    "connectors": {"और"},
+}
+
+HINGLISH = {
+    "units": {
+        "ek": 1, "do": 2, "teen": 3, "tin": 3, "char": 4, "chaar": 4, "paanch": 5, "panch": 5,
+        "chhe": 6, "chhah": 6, "saat": 7, "aath": 8, "nau": 9, "das": 10,
+        "gyarah": 11, "barah": 12, "baarah": 12, "terah": 13, "chaudah": 14, "pandrah": 15,
+        "solah": 16, "satrah": 17, "atharah": 18, "unnees": 19, "unnis": 19, "bees": 20,
+        "pachees": 25, "pachchis": 25, "tees": 30, "chalis": 40, "chaalis": 40,
+        "pachas": 50, "pachaas": 50, "saath": 60, "sath": 60, "sattar": 70, "assi": 80, "nabbe": 90,
+    },
+    "mults": {
+        "sau": 100, "hazaar": 1000, "hazar": 1000, "hajar": 1000, "hajaar": 1000,
+        "lakh": 100000, "lac": 100000, "crore": 10 ** 7, "karod": 10 ** 7,
+    },
+    "fracs": {"dedh": 1.5, "dhai": 2.5, "dhaai": 2.5},
+    "mods": {"sadhe": 0.5, "saadhe": 0.5, "sava": 0.25, "sawa": 0.25, "paune": -0.25},
+    "ambiguous": {"do", "teen", "tin", "char", "nau", "das", "bees", "saath", "sath"},
+    "connectors": {"aur"},
+}
+
+ENGLISH = {
+    "units": {
+        "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+        "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+        "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    },
+    "tens": {
+        "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+        "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+    },
+    "mults": {
+        "hundred": 100, "thousand": 1000, "lakh": 100000, "lakhs": 100000, "lac": 100000,
+        "million": 10 ** 6, "crore": 10 ** 7, "crores": 10 ** 7,
+    },
+    "ambiguous": {"one"},
+    "connectors": {"and"},
+}
+
+MARATHI = {
+    "units": {
+        "शून्य": 0, "एक": 1, "दोन": 2, "तीन": 3, "चार": 4, "पाच": 5, "सहा": 6, "सात": 7, "आठ": 8,
+        "नऊ": 9, "दहा": 10, "अकरा": 11, "बारा": 12, "तेरा": 13, "चौदा": 14, "पंधरा": 15,
+        "सोळा": 16, "सतरा": 17, "अठरा": 18, "एकोणीस": 19, "वीस": 20, "पंचवीस": 25, "तीस": 30,
+        "चाळीस": 40, "पन्नास": 50, "साठ": 60, "सत्तर": 70, "ऐंशी": 80, "नव्वद": 90,
+    },
+    "mults": {"शंभर": 100, "हजार": 1000, "हज़ार": 1000, "लाख": 100000, "कोटी": 10 ** 7},
+    "compounds": {
+        "दोनशे": (2, 100), "तीनशे": (3, 100), "चारशे": (4, 100), "पाचशे": (5, 100),
+        "सहाशे": (6, 100), "सातशे": (7, 100), "आठशे": (8, 100), "नऊशे": (9, 100),
+    },
+    "fracs": {"दीड": 1.5, "अडीच": 2.5},
+    "mods": {"साडे": 0.5, "सव्वा": 0.25, "पावणे": -0.25},
+    "ambiguous": set(),
+    "connectors": {"आणि"},
+}
+
+BENGALI = {
+    "units": {
+        "শূন্য": 0, "এক": 1, "দুই": 2, "তিন": 3, "চার": 4, "পাঁচ": 5, "ছয়": 6, "সাত": 7, "আট": 8,
+        "নয়": 9, "দশ": 10, "এগারো": 11, "বারো": 12, "তেরো": 13, "চোদ্দ": 14, "পনেরো": 15,
+        "ষোলো": 16, "সতেরো": 17, "আঠারো": 18, "উনিশ": 19, "বিশ": 20, "কুড়ি": 20, "পঁচিশ": 25,
+        "ত্রিশ": 30, "তিরিশ": 30, "চল্লিশ": 40, "পঞ্চাশ": 50, "ষাট": 60, "সত্তর": 70,
+        "আশি": 80, "নব্বই": 90,
+    },
+    "mults": {"শো": 100, "শত": 100, "হাজার": 1000, "লাখ": 100000, "লক্ষ": 100000, "কোটি": 10 ** 7},
+    "compounds": {
+        "একশো": (1, 100), "দুশো": (2, 100), "তিনশো": (3, 100), "চারশো": (4, 100), "পাঁচশো": (5, 100),
+        "ছশো": (6, 100), "সাতশো": (7, 100), "আটশো": (8, 100), "নশো": (9, 100),
+    },
+    "fracs": {"দেড়": 1.5, "আড়াই": 2.5},
+    "mods": {"সাড়ে": 0.5, "সোয়া": 0.25, "পৌনে": -0.25},
+    "ambiguous": {"নয়"},
+    "connectors": {"আর", "এবং"},
+}
+
+TAMIL = {
+    "units": {
+        "பூஜ்ஜியம்": 0, "ஒன்று": 1, "ஒரு": 1, "இரண்டு": 2, "மூன்று": 3, "நான்கு": 4, "ஐந்து": 5,
+        "ஆறு": 6, "ஏழு": 7, "எட்டு": 8, "ஒன்பது": 9, "பத்து": 10, "பதினொன்று": 11, "பன்னிரண்டு": 12,
+        "இருபது": 20, "முப்பது": 30, "நாற்பது": 40, "ஐம்பது": 50, "அறுபது": 60, "எழுபது": 70,
+        "எண்பது": 80, "தொண்ணூறு": 90,
+    },
+    # Combining forms: இருபத்து ஐந்து = 25
+    "tens": {
+        "இருபத்து": 20, "முப்பத்து": 30, "நாற்பத்து": 40, "ஐம்பத்து": 50,
+        "அறுபத்து": 60, "எழுபத்து": 70, "எண்பத்து": 80, "தொண்ணூற்று": 90,
+    },
+    "mults": {"நூறு": 100, "ஆயிரம்": 1000, "லட்சம்": 100000, "கோடி": 10 ** 7},
+    "compounds": {
+        "இருநூறு": (2, 100), "முந்நூறு": (3, 100), "நானூறு": (4, 100), "ஐந்நூறு": (5, 100),
+        "ஐநூறு": (5, 100), "அறுநூறு": (6, 100), "எழுநூறு": (7, 100), "எண்ணூறு": (8, 100),
+        "தொள்ளாயிரம்": (9, 100), "இரண்டாயிரம்": (2, 1000), "மூவாயிரம்": (3, 1000),
+        "நான்காயிரம்": (4, 1000), "ஐந்தாயிரம்": (5, 1000), "ஆறாயிரம்": (6, 1000),
+        "ஏழாயிரம்": (7, 1000), "எட்டாயிரம்": (8, 1000), "ஒன்பதாயிரம்": (9, 1000),
+        "பத்தாயிரம்": (10, 1000),
+    },
+    "ambiguous": {"ஒரு"},
+    "connectors": {"மற்றும்"},
+}
+
+TELUGU = {
+    "units": {
+        "సున్నా": 0, "ఒకటి": 1, "ఒక": 1, "రెండు": 2, "మూడు": 3, "నాలుగు": 4, "ఐదు": 5, "ఆరు": 6,
+        "ఏడు": 7, "ఎనిమిది": 8, "తొమ్మిది": 9, "పది": 10,
+    },
+    "tens": {
+        "ఇరవై": 20, "ముప్పై": 30, "నలభై": 40, "యాభై": 50,
+        "అరవై": 60, "డెబ్బై": 70, "ఎనభై": 80, "తొంభై": 90,
+    },
+    "mults": {
+        "వంద": 100, "వందలు": 100, "వందల": 100, "నూరు": 100,
+        "వెయ్యి": 1000, "వేలు": 1000, "వేల": 1000,
+        "లక్ష": 100000, "లక్షలు": 100000, "లక్షల": 100000, "కోటి": 10 ** 7, "కోట్లు": 10 ** 7,
+    },
+    "fracs": {"ఒకటిన్నర": 1.5, "రెండున్నర": 2.5},
+    "ambiguous": {"ఒక"},
+    "connectors": {"మరియు"},
+}
+
+ODIA = {
+    "units": {
+        "ଶୂନ": 0, "ଏକ": 1, "ଦୁଇ": 2, "ତିନି": 3, "ଚାରି": 4, "ପାଞ୍ଚ": 5, "ଛଅ": 6, "ସାତ": 7, "ଆଠ": 8,
+        "ନଅ": 9, "ଦଶ": 10, "କୋଡ଼ିଏ": 20, "ତିରିଶ": 30, "ଚାଳିଶ": 40, "ପଚାଶ": 50, "ଷାଠିଏ": 60,
+        "ସତୁରୀ": 70, "ଅଶୀ": 80, "ନବେ": 90,
+    },
+    "mults": {"ଶହ": 100, "ଶହେ": 100, "ହଜାର": 1000, "ଲକ୍ଷ": 100000, "କୋଟି": 10 ** 7},
+    "fracs": {"ଦେଢ଼": 1.5, "ଅଢ଼େଇ": 2.5},
+    "mods": {"ସାଢ଼େ": 0.5},
+    "ambiguous": set(),
+}
+
+CURRENCY_WORDS = frozenset({
+    "rs", "inr", "₹", "rupee", "rupees", "rupaye", "rupay", "rupaiye", "rupiya",
+    "रुपये", "रुपए", "रुपया", "रुपयों", "रु", "रुपयांचे",
+    "টাকা", "টাকার", "ரூபாய்", "ரூபாய", "రూపాయలు", "రూపాయి", "ଟଙ୍କା",
+})
+
+LANG_LEXICONS = {
+    "hi": (HINDI, HINGLISH, ENGLISH),
+    "mr": (MARATHI, HINDI, HINGLISH, ENGLISH),
+    "en": (ENGLISH, HINGLISH),
+    "bn": (BENGALI, ENGLISH),
+    "ta": (TAMIL, ENGLISH),
+    "te": (TELUGU, ENGLISH),
+    "or": (ODIA, ENGLISH),
+}
+
+
+# Compiled engine
+
+_Entry = Tuple[Text, object]  # (kind, value)
+
+_DECIMAL_TOKEN = re.compile(r"\d+(?:\.\d+)?")
+_NUMERIC_TOKEN = re.compile(r"\d+(?:,\d{2,3})*(?:\.\d+)?")  # "2.5", "5,000" left whole in raw text
+_MOD_BASE = {0.5: 1.5, 0.25: 1.25, -0.25: 0.75}  # "सवा लाख" = 1.25 lakh
+
+
+def _spellings(word: Text) -> List[Text]:
+    """A word plus its NFC/NFD forms (nukta letters like ज़ / ढ़ come either way from ASR)."""
+    return list({word, unicodedata.normalize("NFC", word), unicodedata.normalize("NFD", word)})
+
+
+def _compile(tables) -> Tuple[Dict[Text, _Entry], FrozenSet[Text], FrozenSet[Text]]:
+    lexicon: Dict[Text, _Entry] = {}
+    ambiguous = set()
+    connectors = set()
+
+    # Later tables never override earlier ones, so the main language wins clashes
+    for table in tables:
+        for kind in ("units", "tens", "mults", "fracs", "mods", "compounds"):
+            for word, value in table.get(kind, {}).items():
+                for spelling in _spellings(word):
+                    lexicon.setdefault(spelling, (kind, value))
+        for word in table.get("ambiguous", ()):
+            ambiguous.update(_spellings(word))
+        for word in table.get("connectors", ()):
+            connectors.update(_spellings(word))
+
+    return lexicon, frozenset(ambiguous), frozenset(connectors)
+
+
+def _format_number(value: float) -> Text:
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class _Span:
+    """The number currently being read: Indian place-value groups plus the open group."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.tokens: List[Text] = []
+        self.total = 0.0         # closed thousand / lakh / crore groups
+        self.current = 0.0       # value below the last big multiplier
+        self.group = None        # last big multiplier (>= 1000)
+        self.last = None         # kind of the last item
+        self.last_mult = None    # last multiplier, caps what may follow it
+        self.mod = 0.0           # pending साढ़े / सवा / पौने
+        self.items = 0           # numeric items read (mods excluded)
+        self.literal = None      # digit text, kept as-is for a lone digit token
+
+    def accepts(self, kind: Text, value) -> bool:
+        """Can this item continue the current number?"""
+        if self.last is None:
+            return True
+        if kind in ("units", "tens", "fracs", "digits"):
+            if self.last == "mods":
+                return True
+            if self.last == "mults":
+                return value < self.last_mult
+            return self.last == "tens" and kind == "units" and value < 10
+        if kind == "mults":
+            if self.last == "mults":
+                return value > self.last_mult
+            return True
+        if kind == "compounds":
+            return self.last == "mults" and value[0] * value[1] < self.last_mult
+        if kind == "mods":
+            return self.last == "mults"
+        return False
+
+    def add(self, kind: Text, value, tokens: List[Text], literal: Optional[Text] = None) -> None:
+        self.tokens.extend(tokens)
+
+        if kind == "mods":
+            self.mod = value
+            self.last = "mods"
+            return
+
+        self.items += 1
+        self.literal = literal if self.items == 1 else None
+
+        if kind == "compounds":
+            self._add_value(value[0])
+            self._add_mult(value[1])
+        elif kind == "mults":
+            self._add_mult(value)
+        else:
+            self._add_value(value)
+            self.last = kind
+
+    def _add_value(self, value: float) -> None:
+        self.current += value + self.mod
+        self.mod = 0.0
+
+    def _add_mult(self, m: int) -> None:
+        base = self.current or _MOD_BASE.get(self.mod, 1)
+        self.mod = 0.0
+        if m < 1000:
+            self.current = base * m
+        elif self.group is not None and m > self.group:
+            # "ढाई लाख करोड़": scale everything read so far
+            self.total = (self.total + self.current) * m
+            self.current = 0.0
+            self.group = m
+        else:
+            self.total += base * m
+            self.current = 0.0
+            self.group = m
+        self.last = "mults"
+        self.last_mult = m
+
+    def flush(self, out: List[Text]) -> None:
+        if not self.tokens:
+            return
+        if self.items == 0:
+            # Only a fraction word with nothing after it: leave the words alone
+            out.extend(self.tokens)
+        elif self.items == 1 and self.literal is not None:
+            out.append(self.literal)
+        else:
+            out.append(_format_number(self.total + self.current))
+        self.reset()
+
+
+class NumberParser:
+    """Number-word parser for one language's compiled lexicon."""
+
+    def __init__(self, tables):
+        self.lexicon, self.ambiguous, self.connectors = _compile(tables)
+
+    def _read_digits(self, tokens: List[Text], i: int) -> Tuple[float, int, Text]:
+        """
+        Digit token at tokens[i], in any script ("2.5" and "5,000" too), rejoining what the normalizer split:
+        "2 . 5" -> 2.5, "5 , 000" -> 5000, "1 , 00 , 000" -> 100000.
+        Returns (value, tokens consumed, ASCII text).
+        """
+        n = len(tokens)
+        head = "".join(str(unicodedata.digit(c, c)) for c in tokens[i] if c != ",")
+        width = 1
+
+        if not tokens[i].isdecimal():
+            return float(head), 1, head
+
+        if i + 2 < n and tokens[i + 1] == "." and tokens[i + 2].isdecimal():
+            frac = "".join(str(unicodedata.digit(c)) for c in tokens[i + 2])
+            text = f"{head}.{frac}"
+            return float(text), 3, text
+
+        # Thousands separators: groups of 2 or 3 digits, the last one of 3
+        j = i
+        groups: List[Text] = []
+        while j + 2 < n and tokens[j + 1] == "," and tokens[j + 2].isdecimal() and len(tokens[j + 2]) in (2, 3):
+            groups.append(tokens[j + 2])
+            j += 2
+        while groups and len(groups[-1]) != 3:
+            groups.pop()
+        if groups and len(tokens[i]) <= 3:
+            head += "".join(str(unicodedata.digit(c)) for g in groups for c in g)
+            width += 2 * len(groups)
+
+        return float(head), width, head
+
+    def _numeric_context(self, tokens: List[Text], nxt: int, span: _Span, value) -> bool:
+        """Should an ambiguous word ("दो", "do") worth value be read as a number here?"""
+        if span.last in ("mods", "units"):
+            return True
+        if span.last == "mults" and value < span.last_mult:
+            # The lower part of a number: "ek hazaar do" = 1002
+            return True
+        if nxt < len(tokens):
+            follow = tokens[nxt]
+            if follow in CURRENCY_WORDS:
+                return True
+            entry = self.lexicon.get(follow)
+            if entry is not None and entry[0] in ("mults", "compounds"):
+                return True
+        return False
+
+    def _joins_number(self, tokens: List[Text], nxt: int, span: _Span) -> bool:
+        """
+        Is the connector before tokens[nxt] inside one number? Only right after a
+        multiplier, before a smaller part: "five hundred and fifty" is one number,
+        "two hundred and three hundred" is two.
+        """
+        if span.last != "mults" or nxt >= len(tokens):
+            return False
+        tok = tokens[nxt]
+        entry = self.lexicon.get(tok)
+        if entry is None or entry[0] not in ("units", "tens", "fracs", "compounds"):
+            return False
+        if tok in self.ambiguous and not self._numeric_context(tokens, nxt + 1, span, entry[1]):
+            return False
+        if not span.accepts(*entry):
+            return False
+
+        # The part after the connector must stay below the multiplier before it
+        j = nxt + 1
+        while j < len(tokens) and self.lexicon.get(tokens[j], ("",))[0] in ("units", "tens"):
+            j += 1
+        follow = self.lexicon.get(tokens[j]) if j < len(tokens) else None
+        return not (follow is not None and follow[0] == "mults" and follow[1] >= span.last_mult)
+
+    def parse(self, text: Text) -> Text:
+        """Replace every spoken number in text with its digits."""
+        tokens = text.split()
+        out: List[Text] = []
+        span = _Span()
+        lexicon = self.lexicon
+
+        i = 0
+        n = len(tokens)
+        while i < n:
+            tok = tokens[i]
+            literal = None
+
+            if tok in self.connectors and self._joins_number(tokens, i + 1, span):
+                span.tokens.append(tok)
+                i += 1
+                continue
+
+            if tok.isdecimal() or _NUMERIC_TOKEN.fullmatch(tok):
+                value, width, literal = self._read_digits(tokens, i)
+                kind = "digits"
+            else:
+                entry = lexicon.get(tok)
+                if entry is None or (tok in self.ambiguous and not self._numeric_context(tokens, i + 1, span, entry[1])):
+                    span.flush(out)
+                    out.append(tok)
+                    i += 1
+                    continue
+                (kind, value), width = entry, 1
+
+            if not span.accepts(kind, value):
+                span.flush(out)
+            span.add(kind, value, tokens[i:i + width], literal)
+            i += width
+
+        span.flush(out)
+        return " ".join(out)
+
+
+_PARSERS = {lang: NumberParser(tables) for lang, tables in LANG_LEXICONS.items()}
+_DEFAULT_PARSER = NumberParser((HINDI, MARATHI, BENGALI, TAMIL, TELUGU, ODIA, HINGLISH, ENGLISH))
+
+
+def get_number_parser(lang_code: Optional[Text] = None) -> NumberParser:
+    """Parser for a language code; all languages if unknown or missing."""
+    if not lang_code:
+        return _DEFAULT_PARSER
+    return _PARSERS.get(lang_code.split("-")[0].lower(), _DEFAULT_PARSER)
+
+
+def parse_numbers(text: Text, lang_code: Optional[Text] = None) -> Text:
+    """Spoken numbers in text -> digits, e.g. "ढाई हजार भेजो" -> "2500 भेजो"."""
+    if not text:
+        return text
+    return get_number_parser(lang_code).parse(text)
+
+
+def extract_amount(text: Text, lang_code: Optional[Text] = None) -> Optional[float]:
+    """First amount in text (digits or number words), or None."""
+    m = _DECIMAL_TOKEN.search(parse_numbers(text, lang_code) if text else "")
+    return float(m.group()) if m else None
+
+
+# Quick manual check
+
+if __name__ == "__main__":
+    examples = [
+        ("पाँच हजार तीन सौ रुपये भेज दो", "hi"),
+        ("ढाई हजार", "hi"),
+        ("साढ़े तीन लाख", "hi"),
+        ("सवा लाख", "hi"),
+        ("पौने दो हजार", "hi"),
+        ("riya ko do hazaar bhej do", "hi"),
+        ("otp ek do teen chaar paanch chhe", "hi"),
+        ("दोन हजार पाचशे", "mr"),
+        ("আড়াই হাজার টাকা পাঠাও", "bn"),
+        ("இரண்டாயிரம் ஐந்நூறு ரூபாய்", "ta"),
+        ("రెండు వేల ఐదు వందలు", "te"),
+        ("twenty five thousand", "en"),
+        ("5 , 000 rupees", "en"),
+        ("२ . ५ लाख", "hi"),
+    ]
+    for text, lang in examples:
+        print(f"{lang}: {text!r} -> {parse_numbers(text, lang)!r}")
@@ -0,0 +1,252 @@
+# otp_store.py
+
+"""
+OTP storage for high-value transfers.
+
+Two implementations share one interface:
+  InMemoryOTPStore - one process only; a time-ordered heap drops expired OTPs
+                     even for users who never come back to verify
+  SharedOTPStore   - any number of action-server workers; state lives in the
+                     shared KV backend (Redis via REDIS_URL, or the local stand-in)
+                     and relies on key TTLs for expiry and INCR for counters
+
+Both limit how many OTPs a user can request per window and how many guesses one
+OTP allows. OTPs are never stored in clear text, only as HMAC-SHA256 digests
+keyed with OTP_SECRET. Without the key, a leaked digest can't be brute-forced
+over the 6-digit space. Set the same OTP_SECRET on every worker. If it is unset,
+the in-process store uses a random per-process key, and the shared store keeps a
+random key in the KV backend (printing a warning, since whoever reads the
+digests there can read that key too).
+"""
+
+import hashlib
+import heapq
+import hmac
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Text, Tuple
+
+from shared_kv import REDIS_URL, get_kv
+
+
+# Basic config
+OTP_TTL_S = int(os.getenv("OTP_TTL_S", "300"))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "3"))
+OTP_RATE_LIMIT = int(os.getenv("OTP_RATE_LIMIT", "3"))  # OTPs per user per window
+OTP_RATE_WINDOW_S = int(os.getenv("OTP_RATE_WINDOW_S", "600"))
+OTP_BACKEND = os.getenv("OTP_BACKEND", "shared" if REDIS_URL else "memory")  # memory|shared
+OTP_SECRET = os.getenv("OTP_SECRET", "")  # HMAC key for stored OTP digests
+
+_KEY_PREFIX = "otp"
+
+
+class OTPRateLimited(Exception):
+    """Raised when a user asks for too many OTPs within the rate window."""
+
+
+def _new_code() -> Text:
+    return f"{secrets.randbelow(900000) + 100000}"
+
+
+def _digest(secret: bytes, user_id: Text, otp: Text) -> Text:
+    return hmac.new(secret, f"{user_id}:{otp}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class OTPStore(ABC):
+    """generate() issues a fresh OTP for a user; verify() checks and consumes it."""
+
+    @abstractmethod
+    def generate(self, user_id: Text) -> Text:
+        """A fresh OTP for user_id (raises OTPRateLimited past the issue limit)."""
+
+    @abstractmethod
+    def verify(self, user_id: Text, provided_otp: Text) -> bool:
+        """True if provided_otp is the user's current OTP; a match consumes it."""
+
+
+class InMemoryOTPStore(OTPStore):
+    """Single-process store with heap-ordered expiry, under one lock."""
+
+    def __init__(
+        self,
+        ttl_s: int = OTP_TTL_S,
+        max_attempts: int = OTP_MAX_ATTEMPTS,
+        rate_limit: int = OTP_RATE_LIMIT,
+        rate_window_s: int = OTP_RATE_WINDOW_S,
+        secret: Text = OTP_SECRET,
+    ):
+        self.ttl_s = ttl_s
+        self.max_attempts = max_attempts
+        self.rate_limit = rate_limit
+        self.rate_window_s = rate_window_s
+        # OTPs live only in this process, so a random key is enough when none is set
+        self._secret = secret.encode("utf-8") if secret else secrets.token_bytes(32)
+        # user_id -> (digest, expires_at, attempts)
+        self._entries: Dict[Text, Tuple[Text, float, int]] = {}
+        self._expiry: List[Tuple[float, Text]] = []
+        self._issued: Dict[Text, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _purge_locked(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self._expiry)
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[user_id]
+                print(f"[OTP] OTP expired for user {user_id}")
+
+            issued = self._issued.get(user_id)
+            if issued is not None:
+                while issued and issued[0] <= now - self.rate_window_s:
+                    issued.popleft()
+                if not issued:
+                    del self._issued[user_id]
+
+    def generate(self, user_id: Text) -> Text:
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+
+            issued = self._issued.setdefault(user_id, deque())
+            while issued and issued[0] <= now - self.rate_window_s:
+                issued.popleft()
+            if len(issued) >= self.rate_limit:
+                raise OTPRateLimited(f"user {user_id} requested {len(issued)} OTPs in {self.rate_window_s}s")
+            issued.append(now)
+
+            otp = _new_code()
+            expires_at = now + self.ttl_s
+            self._entries[user_id] = (_digest(self._secret, user_id, otp), expires_at, 0)
+            heapq.heappush(self._expiry, (expires_at, user_id))
+            # Rate-window bookkeeping is cleaned up from the same heap
+            heapq.heappush(self._expiry, (now + self.rate_window_s, user_id))
+        return otp
+
+    def verify(self, user_id: Text, provided_otp: Text) -> bool:
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+
+            entry = self._entries.get(user_id)
+            if entry is None:
+                print(f"[OTP] No OTP found for user {user_id}")
+                return False
+
+            digest, expires_at, attempts = entry
+            if attempts >= self.max_attempts:
+                print(f"[OTP] Max attempts exceeded for user {user_id}")
+                del self._entries[user_id]
+                return False
+
+            if hmac.compare_digest(digest, _digest(self._secret, user_id, provided_otp)):
+                del self._entries[user_id]
+                return True
+
+            self._entries[user_id] = (digest, expires_at, attempts + 1)
+            print(f"[OTP] Invalid OTP for user {user_id}. {self.max_attempts - attempts - 1} attempts remaining")
+            return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_locked(time.time())
+            return len(self._entries)
+
+
+class SharedOTPStore(OTPStore):
+    """Multi-process store over the shared KV backend; every update is a single atomic command."""
+
+    def __init__(
+        self,
+        kv=None,
+        ttl_s: int = OTP_TTL_S,
+        max_attempts: int = OTP_MAX_ATTEMPTS,
+        rate_limit: int = OTP_RATE_LIMIT,
+        rate_window_s: int = OTP_RATE_WINDOW_S,
+        secret: Text = OTP_SECRET,
+    ):
+        self.kv = kv if kv is not None else get_kv()
+        self.ttl_s = ttl_s
+        self.max_attempts = max_attempts
+        self.rate_limit = rate_limit
+        self.rate_window_s = rate_window_s
+        self._secret = secret.encode("utf-8") if secret else self._shared_secret()
+
+    def _shared_secret(self) -> bytes:
+        """One random key for all workers, created by whichever asks first."""
+        print("[OTP] OTP_SECRET not set, keeping a generated key in the KV backend")
+        key = f"{_KEY_PREFIX}:hmac_key"
+        self.kv.set(key, secrets.token_hex(32), nx=True)
+        stored = self.kv.get(key)
+        return stored if isinstance(stored, bytes) else stored.encode("utf-8")
+
+    @staticmethod
+    def _key(user_id: Text, field: Text) -> Text:
+        return f"{_KEY_PREFIX}:{user_id}:{field}"
+
+    def _count(self, key: Text, window_s: int) -> int:
+        """Bump a counter that always expires: the key is created with its TTL, INCR keeps it."""
+        self.kv.set(key, 0, ex=window_s, nx=True)
+        return self.kv.incr(key)
+
+    def generate(self, user_id: Text) -> Text:
+        rate_key = self._key(user_id, "rate")
+        issued = self._count(rate_key, self.rate_window_s)
+        if issued > self.rate_limit:
+            raise OTPRateLimited(f"user {user_id} requested {issued} OTPs in {self.rate_window_s}s")
+
+        otp = _new_code()
+        self.kv.delete(self._key(user_id, "attempts"))
+        self.kv.set(self._key(user_id, "code"), _digest(self._secret, user_id, otp), ex=self.ttl_s)
+        return otp
+
+    def verify(self, user_id: Text, provided_otp: Text) -> bool:
+        code_key = self._key(user_id, "code")
+        attempts_key = self._key(user_id, "attempts")
+
+        stored = self.kv.get(code_key)
+        if stored is None:
+            print(f"[OTP] No OTP found (or expired) for user {user_id}")
+            return False
+
+        # Count the guess before comparing, so concurrent guesses can't exceed the limit
+        attempts = self._count(attempts_key, self.ttl_s)
+        if attempts > self.max_attempts:
+            print(f"[OTP] Max attempts exceeded for user {user_id}")
+            self.kv.delete(code_key, attempts_key)
+            return False
+
+        stored = stored.decode("utf-8") if isinstance(stored, bytes) else stored
+        if hmac.compare_digest(stored, _digest(self._secret, user_id, provided_otp)):
+            # Only the caller that actually removes the code wins; an OTP is single-use
+            if self.kv.delete(code_key) == 1:
+                self.kv.delete(attempts_key)
+                return True
+            return False
+
+        print(f"[OTP] Invalid OTP for user {user_id}. {self.max_attempts - attempts} attempts remaining")
+        return False
+
+
+_otp_store: Optional[OTPStore] = None
+_otp_store_lock = threading.Lock()
+
+
+def get_otp_store(backend: Text = OTP_BACKEND) -> OTPStore:
+    """The process-wide OTP store selected by OTP_BACKEND."""
+    global _otp_store
+
+    if _otp_store is None:
+        with _otp_store_lock:
+            if _otp_store is None:
+                if backend == "shared":
+                    _otp_store = SharedOTPStore()
+                elif backend == "memory":
+                    _otp_store = InMemoryOTPStore()
+                else:
+                    raise ValueError(f"Unknown OTP_BACKEND {backend!r}; choose 'memory' or 'shared'")
+                print(f"[OTP] Using {backend} OTP store")
+    return _otp_store
@@ -0,0 +1,112 @@
+# rasa_client.py
+
+"""
+Persistent async HTTP client for the gateway -> Rasa REST hop.
+
+Opened at app startup and closed at shutdown, with one keep-alive connection pool
+shared by all turns. Several Rasa upstreams can be listed in RASA_REST_URLS; each
+turn goes to the upstream with the fewest requests in flight. Multiple upstreams
+must share a tracker store and lock store (see endpoints.yml) so a conversation
+can land on any of them.
+
+The tracker helpers (get_tracker / append_events) use Rasa's HTTP API, which the
+server only exposes when started with --enable-api.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Text
+from urllib.parse import quote
+
+import httpx
+
+
+# Basic config
+RASA_REST_URL = os.getenv("RASA_REST_URL", "http://127.0.0.1:5005/webhooks/rest/webhook")
+RASA_REST_URLS = [u.strip() for u in os.getenv("RASA_REST_URLS", RASA_REST_URL).split(",") if u.strip()]
+RASA_MAX_CONNECTIONS = int(os.getenv("RASA_MAX_CONNECTIONS", "100"))
+RASA_MAX_KEEPALIVE = int(os.getenv("RASA_MAX_KEEPALIVE", "50"))
+RASA_TIMEOUT_S = float(os.getenv("RASA_TIMEOUT_S", "15"))
+RASA_CONNECT_TIMEOUT_S = float(os.getenv("RASA_CONNECT_TIMEOUT_S", "2"))
+RASA_TOKEN = os.getenv("RASA_TOKEN", "")  # --auth-token of the Rasa server, if set
+
+
+def _server_root(webhook_url: Text) -> Text:
+    """http://host:5005/webhooks/rest/webhook -> http://host:5005"""
+    return webhook_url.split("/webhooks/", 1)[0].rstrip("/")
+
+
+class RasaClient:
+    """Pooled async client with least-outstanding-requests balancing over Rasa upstreams."""
+
+    def __init__(self, urls: Optional[List[Text]] = None):
+        self.urls = list(urls or RASA_REST_URLS)
+        self._outstanding: Dict[Text, int] = {u: 0 for u in self.urls}
+        self._next = 0  # round-robin tie breaker
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=RASA_MAX_CONNECTIONS,
+                    max_keepalive_connections=RASA_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(RASA_TIMEOUT_S, connect=RASA_CONNECT_TIMEOUT_S),
+            )
+            print(f"[RASA_CLIENT] Pool open for {len(self.urls)} upstream(s): {', '.join(self.urls)}")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _pick(self) -> Text:
+        """Upstream with the fewest in-flight requests; ties rotate."""
+        n = len(self.urls)
+        order = [self.urls[(self._next + i) % n] for i in range(n)]
+        self._next = (self._next + 1) % n
+        return min(order, key=lambda u: self._outstanding[u])
+
+    async def send(self, payload: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        """POST one turn to the REST webhook and return Rasa's messages."""
+        if self._client is None:
+            await self.start()
+
+        url = self._pick()
+        self._outstanding[url] += 1
+        try:
+            resp = await self._client.post(url, json=payload)
+            resp.raise_for_status()
+            return resp.json()
+        finally:
+            self._outstanding[url] -= 1
+
+    async def _api(self, method: Text, path: Text, **kwargs) -> Any:
+        """Call Rasa's HTTP API on the least busy upstream."""
+        if self._client is None:
+            await self.start()
+
+        url = self._pick()
+        params = kwargs.pop("params", {})
+        if RASA_TOKEN:
+            params["token"] = RASA_TOKEN
+        self._outstanding[url] += 1
+        try:
+            resp = await self._client.request(method, _server_root(url) + path, params=params, **kwargs)
+            resp.raise_for_status()
+            return resp.json()
+        finally:
+            self._outstanding[url] -= 1
+
+    async def get_tracker(self, sender_id: Text) -> Dict[Text, Any]:
+        """Current tracker state (slots, latest message) without the event history."""
+        return await self._api("GET", f"/conversations/{quote(sender_id, safe='')}/tracker",
+                               params={"include_events": "NONE"})
+
+    async def append_events(self, sender_id: Text, events: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+        """Append events to a conversation's tracker (under Rasa's conversation lock)."""
+        return await self._api("POST", f"/conversations/{quote(sender_id, safe='')}/tracker/events",
+                               params={"include_events": "NONE"}, json=events)
+
+    def stats(self) -> Dict[Text, Any]:
+        return {"outstanding": dict(self._outstanding)}
@@ -0,0 +1,131 @@
+# shared_kv.py
+
+"""
+Small shared key-value backend for state that must survive across workers.
+
+With REDIS_URL set, returns a redis-py client (any Redis-compatible server works).
+Without it, returns LocalKV: an in-process stand-in that implements the same
+subset of commands, for single-process runs and tests.
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+
+# Basic config
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+
+class LocalKV:
+    """Thread-safe in-memory stand-in for the Redis commands we use."""
+
+    def __init__(self):
+        # key -> (value, expires_at or None)
+        self._data: Dict[Text, Tuple[Any, Optional[float]]] = {}
+        # (expires_at, key) min-heap, so keys nobody reads again still get dropped
+        self._expiry: List[Tuple[float, Text]] = []
+        self._lock = threading.Lock()
+
+    def _schedule(self, key: Text, expires_at: Optional[float]) -> None:
+        if expires_at is not None:
+            heapq.heappush(self._expiry, (expires_at, key))
+
+    def _purge(self) -> None:
+        """Drop every key whose expiry has passed (stale heap entries are skipped)."""
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+
+    def _live(self, key: Text) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def get(self, key: Text) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key: Text, value: Any, ex: Optional[int] = None, nx: bool = False) -> bool:
+        with self._lock:
+            self._purge()
+            if nx and self._live(key) is not None:
+                return False
+            expires = time.time() + ex if ex else None
+            self._data[key] = (self._encode(value), expires)
+            self._schedule(key, expires)
+            return True
+
+    def delete(self, *keys: Text) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._live(key) is not None:
+                    del self._data[key]
+                    removed += 1
+            return removed
+
+    def incr(self, key: Text, amount: int = 1) -> int:
+        with self._lock:
+            self._purge()
+            entry = self._live(key)
+            value = int(entry[0]) + amount if entry else amount
+            self._data[key] = (self._encode(value), entry[1] if entry else None)
+            return value
+
+    def expire(self, key: Text, seconds: int) -> bool:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return False
+            expires = time.time() + seconds
+            self._data[key] = (entry[0], expires)
+            self._schedule(key, expires)
+            return True
+
+    def ttl(self, key: Text) -> int:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(0, int(round(entry[1] - time.time())))
+
+
+_kv = None
+_kv_lock = threading.Lock()
+
+
+def get_kv(url: Text = REDIS_URL):
+    """Process-wide shared backend: Redis if configured, else the local stand-in."""
+    global _kv
+
+    if _kv is None:
+        with _kv_lock:
+            if _kv is None:
+                if url:
+                    import redis  # optional dependency, only needed with REDIS_URL
+
+                    _kv = redis.Redis.from_url(url)
+                    print("[KV] Using shared Redis backend")
+                else:
+                    _kv = LocalKV()
+                    print("[KV] REDIS_URL not set, using in-process stand-in")
+    return _kv
@@ -0,0 +1,263 @@
+# telemetry.py
+
+"""
+Per-stage latency telemetry for the voice pipeline.
+
+Each voice turn gets a request id. The gateway puts it in the Rasa message
+metadata, so the action server's spans for the same turn carry it too. Stages are
+timed with span(stage) and feed two things:
+  - a Prometheus histogram, sahayaa_stage_duration_seconds{stage, action},
+    served as text from /metrics (the gateway route, or start_metrics_server()
+    in the action server)
+  - one structured [TRACE] log line per turn listing every stage's milliseconds
+
+No client library is needed, and a span costs two perf_counter calls plus a
+locked bucket increment.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Text, Tuple
+
+
+# Basic config
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "1") == "1"
+TELEMETRY_TRACE_LOG = os.getenv("TELEMETRY_TRACE_LOG", "1") == "1"
+STAGE_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# Histograms
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: Text, help_text: Text, labelnames: Sequence[Text], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[Tuple[Text, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: Text) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[Text]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in sorted(self._series.items())]
+
+        for labels, counts, total, count in snapshot:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+def _escape(value: Text) -> Text:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram(
+    "sahayaa_stage_duration_seconds",
+    "Time spent in each voice pipeline stage.",
+    ("stage", "action"),
+    STAGE_BUCKETS_S,
+)
+_HISTOGRAMS: List[Histogram] = [STAGE_SECONDS]
+
+
+def render_metrics() -> Text:
+    """All histograms in Prometheus text exposition format."""
+    lines: List[Text] = []
+    for hist in _HISTOGRAMS:
+        lines.extend(hist.render())
+    return "\n".join(lines) + "\n"
+
+
+# Request traces
+
+class RequestTrace:
+    """Stage timings of one turn, keyed by request id."""
+
+    def __init__(self, request_id: Optional[Text] = None, kind: Text = "voice"):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[Text, float]] = []
+        self.notes: Dict[Text, Any] = {}  # per-turn data for other consumers (traffic capture)
+        self._lock = threading.Lock()
+
+    def add(self, stage: Text, seconds: float) -> None:
+        with self._lock:
+            self.spans.append((stage, seconds))
+
+    def summary(self) -> Dict[Text, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        stages: Dict[Text, float] = {}
+        for stage, seconds in spans:
+            stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000.0, 2)
+        return {
+            "request_id": self.request_id,
+            "kind": self.kind,
+            "total_ms": round((time.perf_counter() - self.started) * 1000.0, 2),
+            "stages_ms": stages,
+        }
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("sahayaa_trace", default=None)
+_current_action: contextvars.ContextVar[Text] = contextvars.ContextVar("sahayaa_action", default="")
+
+
+def start_trace(request_id: Optional[Text] = None, kind: Text = "voice") -> RequestTrace:
+    """Begin a trace for the current turn (context-local, follows awaits and to_thread calls)."""
+    trace = RequestTrace(request_id, kind)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_request_id() -> Optional[Text]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def annotate(key: Text, value: Any) -> None:
+    """Attach a value to the current turn's trace (no-op outside a trace)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.notes[key] = value
+
+
+def finish_trace(trace: Optional[RequestTrace] = None) -> Optional[Dict[Text, Any]]:
+    """Record the turn's total time and log its [TRACE] line."""
+    trace = trace or _current_trace.get()
+    if trace is None:
+        return None
+    summary = trace.summary()
+    if TELEMETRY_ENABLED:
+        STAGE_SECONDS.observe(summary["total_ms"] / 1000.0, f"{trace.kind}_total", _current_action.get())
+        if TELEMETRY_TRACE_LOG:
+            print("[TRACE]", json.dumps(summary, ensure_ascii=False))
+    return summary
+
+
+def observe(stage: Text, seconds: float, in_trace: bool = True) -> None:
+    """
+    Record a stage duration measured elsewhere.
+
+    in_trace=False keeps it out of the current request's trace, for work shared by
+    several requests (an ASR batch).
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    STAGE_SECONDS.observe(seconds, stage, _current_action.get())
+    trace = _current_trace.get()
+    if in_trace and trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: Text) -> Iterator[None]:
+    """Time the enclosed block as one stage (recorded even if it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def traced_action(run):
+    """
+    Decorator for Action.run: times the action and tags its spans with the action
+    name and the gateway's request id (from message metadata).
+    """
+
+    def _enter(action, tracker):
+        trace_token = None
+        if _current_trace.get() is None:
+            # Action server: continue the gateway's request id. The gateway's own
+            # fast path already has a trace running.
+            meta = tracker.latest_message.get("metadata") or {}
+            trace_token = _current_trace.set(RequestTrace(meta.get("request_id"), kind="action"))
+        action_token = _current_action.set(action.name())
+        return trace_token, action_token, time.perf_counter()
+
+    def _exit(trace_token, action_token, started):
+        observe("action", time.perf_counter() - started)
+        if trace_token is not None:
+            finish_trace()
+            _current_trace.reset(trace_token)
+        _current_action.reset(action_token)
+
+    if inspect.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def wrapper(self, dispatcher, tracker, domain):
+            state = _enter(self, tracker)
+            try:
+                return await run(self, dispatcher, tracker, domain)
+            finally:
+                _exit(*state)
+    else:
+        @functools.wraps(run)
+        def wrapper(self, dispatcher, tracker, domain):
+            state = _enter(self, tracker)
+            try:
+                return run(self, dispatcher, tracker, domain)
+            finally:
+                _exit(*state)
+    return wrapper
+
+
+# Standalone /metrics endpoint (action server)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: Text = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on its own port from a daemon thread (for processes without an HTTP app of ours)."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        # e.g. several action-server workers on one host: the first one wins
+        print(f"[TELEMETRY] Metrics port {port} unavailable: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[TELEMETRY] Serving /metrics on {host}:{port}")
+    return server
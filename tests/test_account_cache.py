@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from account_cache import AccountCache
+from shared_kv import LocalKV
+
+
+class StrictKV(LocalKV):
+    """LocalKV that rejects non-integer TTLs, like redis-py."""
+
+    def set(self, key, value, ex=None, nx=False):
+        if ex is not None and not isinstance(ex, int):
+            raise TypeError("ex must be datetime.timedelta or int")
+        return super().set(key, value, ex=ex, nx=nx)
+
+
+def test_read_through_fetches_once():
+    cache = AccountCache(kv=StrictKV(), ttl_s=20.0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"balance": 100}
+
+    async def run():
+        first = await cache.read_through("balance", "u1", "acct", fetch)
+        second = await cache.read_through("balance", "u1", "acct", fetch)
+        return first, second
+
+    assert asyncio.run(run()) == ({"balance": 100}, {"balance": 100})
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_float_ttl_is_stored_in_whole_seconds():
+    kv = StrictKV()
+    AccountCache(kv=kv, ttl_s=0.5).set("balance", "u1", "acct", {"balance": 1})
+    assert kv.ttl("acct_cache:u1:acct:balance") == 1
+
+
+def test_invalidate_drops_every_kind():
+    cache = AccountCache(kv=LocalKV(), ttl_s=20)
+    cache.set("balance", "u1", "acct", {"balance": 1})
+    cache.set("transactions", "u1", "acct", {"items": []})
+    cache.set("balance", "u1", "other", {"balance": 2})
+    cache.invalidate("u1", "acct", None)
+    assert cache.get("balance", "u1", "acct") is None
+    assert cache.get("transactions", "u1", "acct") is None
+    assert cache.get("balance", "u1", "other") == {"balance": 2}
+
+
+def test_disabled_cache_never_stores():
+    cache = AccountCache(kv=LocalKV(), ttl_s=20, enabled=False)
+    cache.set("balance", "u1", "acct", {"balance": 1})
+    assert cache.get("balance", "u1", "acct") is None
+
+
+class RemoteKV:
+    """Stands in for redis-py: records which thread each blocking call ran on."""
+
+    def __init__(self):
+        self._kv = LocalKV()
+        self.threads = []
+
+    def __getattr__(self, name):
+        method = getattr(self._kv, name)
+
+        def call(*args, **kwargs):
+            self.threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+
+        return call
+
+
+def test_shared_cache_calls_stay_off_the_event_loop():
+    kv = RemoteKV()
+    cache = AccountCache(kv=kv, ttl_s=20.0)
+
+    async def fetch():
+        return {"balance": 100}
+
+    async def run():
+        await cache.read_through("balance", "u1", "acct", fetch)
+        await cache.read_through("balance", "u1", "acct", fetch)
+        await cache.ainvalidate("u1", "acct")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(kv.threads) == 4
+    assert loop_thread not in kv.threads
+    assert cache.get("balance", "u1", "acct") is None
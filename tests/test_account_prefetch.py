@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from account_cache import AccountCache
+from account_prefetch import AccountPrefetch, use_prefetched
+from shared_kv import LocalKV
+
+
+class SharedKV:
+    """Stands in for Redis: AccountCache treats any backend but LocalKV as shared."""
+
+    def __init__(self):
+        self._kv = LocalKV()
+
+    def __getattr__(self, name):
+        return getattr(self._kv, name)
+
+
+class FakeBank:
+    """Answers post() after a delay; the cached getters must not be used with a local cache."""
+
+    def __init__(self, delay_s: float = 0.05, kv=None):
+        self.delay_s = delay_s
+        self.posts = []
+        self.cache = AccountCache(kv=kv if kv is not None else LocalKV(), ttl_s=20)
+
+    async def post(self, endpoint, payload):
+        self.posts.append(endpoint)
+        await asyncio.sleep(self.delay_s)
+        return {"endpoint": endpoint}
+
+    async def get_balance(self, payload):
+        raise AssertionError("prefetch must bypass the account cache")
+
+    get_transactions = get_balance
+
+
+def test_prefetch_goes_to_the_bank_and_stamps_arrival_time():
+    bank = FakeBank()
+
+    async def run():
+        prefetch = AccountPrefetch(bank, "u1", {}, account_id="acct").start()
+        started = prefetch.started_at
+        block = await prefetch.collect(wait_ms=1000)
+        return started, block
+
+    started, block = asyncio.run(run())
+    assert sorted(bank.posts) == ["balance", "transactions"]
+    assert block["balance"] == {"endpoint": "balance"}
+    assert block["fetched_at"] >= started + bank.delay_s * 0.9
+
+
+def test_use_prefetched_checks_owner_and_age():
+    block = {"user_id": "u1", "account_id": "acct", "fetched_at": time.time(), "balance": {"balance": 1}}
+    meta = {"prefetch": block}
+    assert use_prefetched(meta, "balance", "u1", "acct") == {"balance": 1}
+    assert use_prefetched(meta, "balance", "u2", "acct") is None
+    assert use_prefetched(meta, "transactions", "u1", "acct") is None
+
+    block["fetched_at"] = time.time() - 60
+    assert use_prefetched(meta, "balance", "u1", "acct", max_age_s=20) is None
+
+
+def test_nothing_finished_gives_no_block():
+    async def run():
+        prefetch = AccountPrefetch(FakeBank(delay_s=1.0), "u1", {}, account_id="acct").start()
+        return await prefetch.collect(wait_ms=10)
+
+    assert asyncio.run(run()) is None
+
+
+class CachedBank(FakeBank):
+    def __init__(self):
+        super().__init__(kv=SharedKV())
+        self.cache.set("balance", "u1", "acct", {"balance": 7})
+        self.cache.set("transactions", "u1", "acct", {"items": []})
+
+    async def get_balance(self, payload):
+        return await self.cache.read_through("balance", "u1", "acct", lambda: self.post("balance", payload))
+
+    async def get_transactions(self, payload):
+        return await self.cache.read_through("transactions", "u1", "acct", lambda: self.post("transactions", payload))
+
+
+def test_prefetch_reads_through_a_shared_cache():
+    bank = CachedBank()
+
+    async def run():
+        return await AccountPrefetch(bank, "u1", {}, account_id="acct").start().collect(wait_ms=1000)
+
+    block = asyncio.run(run())
+    assert bank.posts == []
+    assert block["balance"] == {"balance": 7}
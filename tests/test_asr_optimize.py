@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+
+from asr_optimize import _load_heldout, compare_wer, word_errors  # noqa: E402
+
+
+# Held-out check: point ASR_HELDOUT at a manifest (see asr_optimize.py) on a
+# machine with the model, e.g. ASR_HELDOUT=heldout/heldout.jsonl python -m pytest -q
+ASR_HELDOUT = os.getenv("ASR_HELDOUT", "")
+ASR_QUANTIZE_CHECK = os.getenv("ASR_QUANTIZE_CHECK", "int8")
+ASR_MAX_WER_INCREASE = float(os.getenv("ASR_MAX_WER_INCREASE", "0.01"))
+
+
+@pytest.mark.parametrize(
+    "ref, hyp, errors",
+    [
+        ("मेरा बैलेंस बताओ", "मेरा बैलेंस बताओ", 0),
+        ("मेरा बैलेंस बताओ", "मेरा बेलेंस बताओ", 1),
+        ("मेरा बैलेंस बताओ", "बैलेंस बताओ", 1),
+        ("बैलेंस बताओ", "मेरा बैलेंस बताओ ना", 2),
+        ("", "कुछ", 1),
+        ("कुछ", "", 1),
+    ],
+)
+def test_word_errors(ref, hyp, errors):
+    assert word_errors(ref.split(), hyp.split()) == errors
+
+
+def test_heldout_paths_resolve_next_to_the_manifest(tmp_path):
+    manifest = tmp_path / "heldout.jsonl"
+    rows = [
+        {"audio": "clips/001.webm", "text": "balance batao", "lang": "hi"},
+        {"audio": "/abs/002.webm", "text": "paise bhejo", "lang": "hi"},
+        {"audio": "clips/003.webm", "text": "bill bharo", "lang": "hi"},
+    ]
+    manifest.write_text("\n".join(json.dumps(r) for r in rows) + "\n\n", encoding="utf-8")
+
+    items = _load_heldout(str(manifest), limit=2)
+    assert [i["audio"] for i in items] == [str(tmp_path / "clips" / "001.webm"), "/abs/002.webm"]
+
+
+@pytest.mark.skipif(not ASR_HELDOUT, reason="set ASR_HELDOUT to a held-out manifest to run the WER check")
+def test_optimized_model_keeps_wer():
+    results = compare_wer(ASR_HELDOUT, quantize=ASR_QUANTIZE_CHECK)
+    assert results["wer_increase"] <= ASR_MAX_WER_INCREASE, results
@@ -0,0 +1,51 @@
+import time
+
+from banking_client import CircuitBreaker
+
+
+def _tripped(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout_s  # cool-down over
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_lets_exactly_one_probe_through():
+    breaker = _tripped(CircuitBreaker(failure_threshold=2, reset_timeout_s=30))
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_the_breaker():
+    breaker = _tripped(CircuitBreaker(failure_threshold=2, reset_timeout_s=30))
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_probe_failure_reopens_the_breaker():
+    breaker = _tripped(CircuitBreaker(failure_threshold=2, reset_timeout_s=30))
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = _tripped(CircuitBreaker(failure_threshold=2, reset_timeout_s=30))
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    assert not breaker.allow()
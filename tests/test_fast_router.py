@@ -0,0 +1,42 @@
+import pytest
+
+from fast_router import FastRouter, IntentMatcher, load_rule_routes
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return IntentMatcher.from_nlu_file()
+
+
+@pytest.mark.parametrize("text", ["balance batao", "मेरा बैलेंस बताओ", "check my balance"])
+def test_simple_balance_requests_match(matcher, text):
+    intent, confidence = matcher.match(IntentMatcher._prepare(text))
+    assert intent == "balance_check"
+    assert confidence >= 0.9
+
+
+def test_amounts_and_accounts_go_to_rasa(matcher):
+    # Entities need Rasa's extractors
+    assert matcher.match(IntentMatcher._prepare("riya ko 500 bhejo")) is None
+
+
+def test_mixed_intents_score_low(matcher):
+    hit = matcher.match(IntentMatcher._prepare("balance batao aur bill bharo"))
+    assert hit is None or hit[1] < 0.9
+
+
+def test_empty_text_does_not_match(matcher):
+    assert matcher.match("") is None
+    assert matcher.match("   ") is None
+
+
+def test_rule_routes_map_intents_to_actions():
+    routes = load_rule_routes()
+    assert routes["balance_check"].startswith("action_")
+
+
+def test_sender_lock_is_shared_per_sender():
+    router = FastRouter(rasa_client=None)
+    lock = router.sender_lock("u1")
+    assert router.sender_lock("u1") is lock
+    assert router.sender_lock("u2") is not lock
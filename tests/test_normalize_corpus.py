@@ -0,0 +1,78 @@
+import json
+import os
+
+from normalize_corpus import _checkpoint_path, normalize_corpus
+from normalizer_multi import normalize_text
+
+
+TEXTS = [
+    "Umm mera BALANCE batao na",
+    "uh send 500 rupees to riya",
+    "अरे मेरा बैलेंस बताओ",
+    "like, pay the bill yaar",
+    "haan balance check karo",
+    "hmm last transactions dikhao",
+    "please transfer to mom",
+    "ok bye",
+    "basically mera account",
+    "umm thank you",
+]
+
+
+def _write_corpus(path, records):
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+
+def _records():
+    return [{"id": i, "text": t, "lang": "hi" if i % 2 else "en"} for i, t in enumerate(TEXTS)]
+
+
+def test_output_keeps_input_order(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_corpus(src, _records())
+
+    stats = normalize_corpus(str(src), str(out), lang_field="lang", workers=2, chunk_lines=3)
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert stats["lines"] == len(TEXTS)
+    assert [r["id"] for r in rows] == list(range(len(TEXTS)))
+    assert [r["text"] for r in rows] == [normalize_text(r["text"], r["lang"]) for r in _records()]
+    assert not os.path.exists(_checkpoint_path(str(out)))
+
+
+def test_resume_after_a_killed_run_is_byte_identical(tmp_path):
+    src = tmp_path / "in.jsonl"
+    _write_corpus(src, _records())
+    full, resumed = tmp_path / "full.jsonl", tmp_path / "resumed.jsonl"
+    normalize_corpus(str(src), str(full), lang_field="lang", workers=1, chunk_lines=3)
+    expected = full.read_bytes()
+
+    # A run killed mid-chunk: two chunks checkpointed, then half a line of the third
+    done = b"".join(expected.splitlines(keepends=True)[:6])
+    resumed.write_bytes(done + b'{"id": 6, "te')
+    settings = {
+        "input": os.path.abspath(str(src)),
+        "format": "jsonl",
+        "fields": ["text"],
+        "out_field": "",
+        "lang": None,
+        "lang_field": "lang",
+    }
+    with open(_checkpoint_path(str(resumed)), "w", encoding="utf-8") as f:
+        json.dump({"settings": settings, "lines": 6, "bytes": len(done)}, f)
+
+    stats = normalize_corpus(str(src), str(resumed), lang_field="lang", workers=1, chunk_lines=3, resume=True)
+    assert stats["lines"] == len(TEXTS)
+    assert resumed.read_bytes() == expected
+
+
+def test_bad_lang_values_do_not_crash_the_chunk(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_corpus(src, [{"text": "umm balance", "lang": 5}, {"text": "umm balance", "lang": None}])
+    src.write_text(src.read_text(encoding="utf-8") + "not json\n", encoding="utf-8")
+
+    stats = normalize_corpus(str(src), str(out), lang_field="lang", workers=1, chunk_lines=2)
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert stats == {**stats, "lines": 3, "skipped": 1}
+    assert json.loads(lines[0])["text"] == normalize_text("umm balance")
+    assert lines[2] == "not json"
@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+from normalizer_multi import get_normalizer, is_filler_token, normalize_batch, normalize_text
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "normalizer_corpus.jsonl")
+
+
+def _corpus():
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+CORPUS = _corpus()
+
+
+@pytest.mark.parametrize("row", CORPUS, ids=lambda row: row["text"][:40] or "<empty>")
+def test_matches_baseline_corpus(row):
+    # "baseline" is the output of the pre-compiled implementation; "expected" is
+    # set only where the behaviour was changed on purpose
+    assert normalize_text(row["text"]) == row.get("expected", row["baseline"])
+
+
+def test_corpus_only_differs_on_multiword_fillers():
+    changed = [row for row in CORPUS if "expected" in row]
+    assert all("multiword" in row["note"] for row in changed)
+    assert len(changed) < len(CORPUS) // 20
+
+
+def test_batch_matches_single_calls_in_order():
+    texts = [row["text"] for row in CORPUS]
+    assert list(normalize_batch(texts, "hi")) == [normalize_text(t, "hi") for t in texts]
+
+
+def test_fillers_follow_the_language_profile():
+    # Tamil "ma" and Bengali "to" are fillers only in their own languages
+    assert normalize_text("ma balance", "hi") == "ma balance"
+    assert normalize_text("ma balance", "ta") == "balance"
+    assert normalize_text("to balance", "bn") == "balance"
+    assert is_filler_token("yaar", "hi")
+    assert not is_filler_token("yaar", "ta")
+
+
+def test_native_digits_are_folded():
+    assert normalize_text("५०० भेजो", "hi") == "500 भेजो"
+    assert normalize_text("৫০০ টাকা", "bn") == "500 টাকা"
+
+
+def test_unknown_lang_uses_union_profile():
+    assert get_normalizer("xx") is get_normalizer(None)
+    assert get_normalizer("ta-IN") is get_normalizer("ta")
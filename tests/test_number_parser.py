@@ -0,0 +1,88 @@
+import pytest
+
+from number_parser import extract_amount, parse_numbers
+
+
+@pytest.mark.parametrize(
+    "text, lang, expected",
+    [
+        ("पाँच हजार तीन सौ रुपये भेज दो", "hi", "5300 रुपये भेज दो"),
+        ("ढाई लाख", "hi", "250000"),
+        ("saadhe teen hazaar", "hi", "3500"),
+        ("৫ হাজার", "bn", "5000"),
+        ("இரண்டாயிரம் ஐந்நூறு", "ta", "2500"),
+        ("मला दोन हजार पाचशे रुपये पाठवा", "mr", "मला 2500 रुपये पाठवा"),
+        ("send two thousand five hundred rupees", "en", "send 2500 rupees"),
+        ("transfer 1.5 lakh", "en", "transfer 150000"),
+        ("5,000 bhejo", "hi", "5000 bhejo"),
+    ],
+)
+def test_spoken_amounts_become_digits(text, lang, expected):
+    assert parse_numbers(text, lang) == expected
+
+
+def test_spoken_digit_sequences_stay_separate():
+    assert parse_numbers("एक दो तीन चार", "hi") == "1 2 3 4"
+
+
+def test_ambiguous_words_need_numeric_context():
+    # "do" = give, unless it is part of an amount
+    assert parse_numbers("paise do", "hi") == "paise do"
+    assert parse_numbers("do hazaar bhejo", "hi") == "2000 bhejo"
+
+
+@pytest.mark.parametrize(
+    "text, lang, expected, amount",
+    [
+        ("ek sau das", "hi", "110", 110.0),
+        ("paanch sau bees", "hi", "520", 520.0),
+        ("ek hazaar do", "hi", "1002", 1002.0),
+        ("one hundred one", "en", "101", 101.0),
+        ("एक सौ दो", "hi", "102", 102.0),
+    ],
+)
+def test_ambiguous_word_after_a_larger_multiplier_is_a_number(text, lang, expected, amount):
+    assert parse_numbers(text, lang) == expected
+    assert extract_amount(text, lang) == amount
+
+
+def test_extract_amount():
+    assert extract_amount("ढाई हजार भेजो", "hi") == 2500.0
+    assert extract_amount("balance batao", "hi") is None
+    assert extract_amount("") is None
+
+
+@pytest.mark.parametrize(
+    "text, lang, expected, amount",
+    [
+        ("send five hundred and fifty rupees", "en", "send 550 rupees", 550.0),
+        ("two thousand and five hundred", "en", "2500", 2500.0),
+        ("one lakh and twenty thousand", "en", "120000", 120000.0),
+        ("one thousand and one rupees", "en", "1001 rupees", 1001.0),
+        ("send five hundred and fifty rupees", "hi", "send 550 rupees", 550.0),
+        ("ek lakh aur bees hazaar", "hi", "120000", 120000.0),
+        ("तीन सौ और पचास रुपये", "hi", "350 रुपये", 350.0),
+        ("पाचशे आणि पन्नास", "mr", "550", 550.0),
+        ("তিনশো আর পঞ্চাশ", "bn", "350", 350.0),
+        ("ஐந்நூறு மற்றும் ஐம்பது", "ta", "550", 550.0),
+        ("ఐదు వందల మరియు యాభై", "te", "550", 550.0),
+    ],
+)
+def test_connector_inside_a_number_is_absorbed(text, lang, expected, amount):
+    assert parse_numbers(text, lang) == expected
+    assert extract_amount(text, lang) == amount
+
+
+@pytest.mark.parametrize(
+    "text, lang, expected",
+    [
+        ("two hundred and three hundred", "en", "200 and 300"),
+        ("five and six", "en", "5 and 6"),
+        ("riya and mom", "en", "riya and mom"),
+        ("five hundred and", "en", "500 and"),
+        ("balance aur transactions", "hi", "balance aur transactions"),
+        ("तीन सौ और चार सौ", "hi", "300 और 400"),
+    ],
+)
+def test_connector_between_separate_numbers_is_kept(text, lang, expected):
+    assert parse_numbers(text, lang) == expected
@@ -0,0 +1,91 @@
+import hashlib
+import hmac
+
+import pytest
+
+from otp_store import InMemoryOTPStore, OTPRateLimited, OTPStore, SharedOTPStore
+from shared_kv import LocalKV
+
+
+@pytest.fixture(params=["memory", "shared"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryOTPStore(ttl_s=60, max_attempts=3, rate_limit=2, rate_window_s=60)
+    return SharedOTPStore(kv=LocalKV(), ttl_s=60, max_attempts=3, rate_limit=2, rate_window_s=60)
+
+
+def test_otp_is_single_use(store):
+    otp = store.generate("u1")
+    assert store.verify("u1", otp)
+    assert not store.verify("u1", otp)
+
+
+def test_otp_is_per_user(store):
+    otp = store.generate("u1")
+    assert not store.verify("u2", otp)
+    assert store.verify("u1", otp)
+
+
+def test_attempts_are_limited(store):
+    otp = store.generate("u1")
+    wrong = "000000" if otp != "000000" else "111111"
+    for _ in range(3):
+        assert not store.verify("u1", wrong)
+    assert not store.verify("u1", otp)
+
+
+def test_generation_is_rate_limited(store):
+    store.generate("u1")
+    store.generate("u1")
+    with pytest.raises(OTPRateLimited):
+        store.generate("u1")
+    store.generate("u2")
+
+
+def test_shared_counters_always_expire():
+    kv = LocalKV()
+    store = SharedOTPStore(kv=kv, ttl_s=60, rate_window_s=120)
+    store.generate("u1")
+    store.verify("u1", "not-the-code")
+    assert 0 < kv.ttl("otp:u1:rate") <= 120
+    assert 0 < kv.ttl("otp:u1:attempts") <= 60
+
+
+class NoExpireKV(LocalKV):
+    """Fails if a TTL is set in a separate command (a crash in between leaves a counter forever)."""
+
+    def expire(self, key, seconds):
+        raise AssertionError("counter TTL must be set when the key is created")
+
+
+def test_shared_counters_get_their_ttl_on_creation():
+    kv = NoExpireKV()
+    store = SharedOTPStore(kv=kv, ttl_s=60, rate_window_s=120)
+    store.generate("u1")
+    store.generate("u1")
+    store.verify("u1", "not-the-code")
+    assert kv.get("otp:u1:rate") == b"2"
+    assert 0 < kv.ttl("otp:u1:attempts") <= 60
+
+
+def test_incomplete_store_fails_at_construction():
+    class GenerateOnly(OTPStore):
+        def generate(self, user_id):
+            return "123456"
+
+    with pytest.raises(TypeError):
+        GenerateOnly()
+
+
+def test_stored_digest_is_keyed_with_the_secret():
+    kv = LocalKV()
+    otp = SharedOTPStore(kv=kv, secret="server-secret").generate("u1")
+    stored = kv.get("otp:u1:code").decode("utf-8")
+    assert stored != hashlib.sha256(f"u1:{otp}".encode("utf-8")).hexdigest()
+    assert stored == hmac.new(b"server-secret", f"u1:{otp}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def test_workers_without_a_secret_share_a_generated_key():
+    kv = LocalKV()
+    otp = SharedOTPStore(kv=kv, secret="").generate("u1")
+    assert SharedOTPStore(kv=kv, secret="").verify("u1", otp)
@@ -0,0 +1,47 @@
+import asyncio
+
+import telemetry
+from telemetry import Histogram, annotate, finish_trace, span, start_trace
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("t_seconds", "test", ("stage",), (0.1, 1.0))
+    hist.observe(0.05, "asr")
+    hist.observe(0.5, "asr")
+    hist.observe(5.0, "asr")
+    lines = hist.render()
+    assert 't_seconds_bucket{stage="asr",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="asr",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="asr",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="asr"} 3' in lines
+    assert 't_seconds_sum{stage="asr"} 5.550000' in lines
+
+
+def test_histogram_escapes_label_values():
+    hist = Histogram("t_seconds", "test", ("stage",), (1.0,))
+    hist.observe(0.5, 'a"b')
+    assert 't_seconds_count{stage="a\\"b"} 1' in hist.render()
+
+
+def test_trace_collects_spans_and_notes(monkeypatch):
+    monkeypatch.setattr(telemetry, "TELEMETRY_ENABLED", True)
+    monkeypatch.setattr(telemetry, "TELEMETRY_TRACE_LOG", False)
+
+    async def turn():
+        trace = start_trace("req-1")
+        with span("asr"):
+            await asyncio.sleep(0)
+        with span("asr"):
+            pass
+        annotate("route", "rasa")
+        return trace, finish_trace(trace)
+
+    trace, summary = asyncio.run(turn())
+    assert summary["request_id"] == "req-1"
+    assert set(summary["stages_ms"]) == {"asr"}
+    assert trace.notes == {"route": "rasa"}
+
+
+def test_annotate_outside_a_trace_is_a_no_op():
+    asyncio.run(asyncio.sleep(0))  # fresh context
+    annotate("route", "rasa")
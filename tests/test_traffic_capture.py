@@ -0,0 +1,46 @@
+import json
+import os
+import time
+
+from traffic_capture import TrafficCapture
+
+
+def _touch(path, content=b"", age_s=0.0):
+    with open(path, "wb") as f:
+        f.write(content)
+    stamp = time.time() - age_s
+    os.utime(path, (stamp, stamp))
+
+
+def test_rotation_prunes_only_own_closed_files(tmp_path):
+    pid = os.getpid()
+    other = tmp_path / "traffic-20200101-000000-1-0000.jsonl"
+    _touch(other, age_s=100)
+    for i in range(3):
+        _touch(tmp_path / f"traffic-20200101-00000{i}-{pid}-{i:04d}.jsonl", age_s=50 - i)
+
+    capture = TrafficCapture(directory=str(tmp_path), keep=2)
+    capture._open_new_file()
+    capture._file.close()
+
+    names = sorted(p.name for p in tmp_path.glob("traffic-*.jsonl"))
+    assert other.name in names
+    assert f"traffic-20200101-000002-{pid}-0002.jsonl" in names
+    assert len(names) == 3  # the other process's file, our newest closed file, the open one
+
+
+def test_rotation_prunes_unreferenced_audio(tmp_path):
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    kept, orphan, fresh = "a" * 64, "b" * 64, "c" * 64
+    _touch(tmp_path / "traffic-20200101-000000-1-0000.jsonl",
+           json.dumps({"audio_sha256": kept}).encode() + b"\n")
+    _touch(audio / f"{kept}.webm", age_s=3600)
+    _touch(audio / f"{orphan}.webm", age_s=3600)
+    _touch(audio / f"{fresh}.webm")
+
+    capture = TrafficCapture(directory=str(tmp_path), store_audio=True, keep=2)
+    capture._open_new_file()
+    capture._file.close()
+
+    assert sorted(p.name for p in audio.iterdir()) == [f"{kept}.webm", f"{fresh}.webm"]
@@ -0,0 +1,21 @@
+import wave
+
+import pytest
+
+from tts_backends import StubSynthesizer, Synthesizer
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Half(Synthesizer):
+        name = "half"
+
+    with pytest.raises(TypeError):
+        Half()
+
+
+def test_stub_writes_a_short_wav(tmp_path):
+    out = tmp_path / "reply.wav"
+    StubSynthesizer(latency_ms=0).synthesize("नमस्ते", "hi", str(out))
+    with wave.open(str(out), "rb") as w:
+        assert w.getframerate() == 16000
+        assert w.getnframes() == 4000
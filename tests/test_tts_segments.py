@@ -0,0 +1,39 @@
+import wave
+
+from tts_segments import concat_audio, fixed_fragments, template_pieces
+
+
+TEMPLATE = "आपके खाते {account_id} में वर्तमान बैलेंस {balance} रुपये है।"
+
+
+def test_template_pieces_mark_slot_values():
+    pieces = template_pieces(TEMPLATE, {"account_id": "1234", "balance": "5000"})
+    assert pieces == [
+        ("आपके खाते", False),
+        ("1234", True),
+        ("में वर्तमान बैलेंस", False),
+        ("5000", True),
+        ("रुपये है।", False),
+    ]
+
+
+def test_fixed_pieces_match_warmup_fragments():
+    pieces = template_pieces(TEMPLATE, {"account_id": "1", "balance": "2"})
+    assert [text for text, is_value in pieces if not is_value] == fixed_fragments(TEMPLATE)
+
+
+def test_concat_wav_joins_frames(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"{i}.wav"
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\x00\x00" * 100)
+        paths.append(str(path))
+
+    out = tmp_path / "out.wav"
+    concat_audio(paths, str(out), "wav")
+    with wave.open(str(out), "rb") as w:
+        assert w.getnframes() == 200
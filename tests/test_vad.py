@@ -0,0 +1,48 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+
+from audio_decode import TARGET_SAMPLE_RATE  # noqa: E402
+from vad import speech_regions, split_segments, trim_silence  # noqa: E402
+
+
+def _clip(*parts):
+    """(1, T) clip from (seconds, amplitude) parts; amplitude 0 is silence."""
+    gen = torch.Generator().manual_seed(0)
+    chunks = []
+    for seconds, amp in parts:
+        n = int(seconds * TARGET_SAMPLE_RATE)
+        chunks.append(torch.randn(n, generator=gen) * amp if amp else torch.zeros(n))
+    return torch.cat(chunks).unsqueeze(0)
+
+
+def test_silence_has_no_speech():
+    wav = _clip((1.0, 0))
+    assert speech_regions(wav) == []
+    assert trim_silence(wav) is None
+    assert split_segments(wav) == []
+
+
+def test_leading_and_trailing_silence_is_trimmed():
+    wav = _clip((1.0, 0.001), (1.0, 0.3), (1.0, 0.001))
+    trimmed = trim_silence(wav)
+    seconds = trimmed.shape[-1] / TARGET_SAMPLE_RATE
+    assert 1.0 <= seconds <= 1.5
+
+
+def test_short_pauses_are_bridged():
+    wav = _clip((0.5, 0), (0.5, 0.3), (0.1, 0), (0.5, 0.3), (0.5, 0))
+    assert len(speech_regions(wav)) == 1
+
+
+def test_blips_are_dropped():
+    wav = _clip((1.0, 0), (0.03, 0.5), (1.0, 0))
+    assert speech_regions(wav) == []
+
+
+def test_long_speech_is_split_at_pauses():
+    wav = _clip((2.0, 0.3), (1.0, 0), (2.0, 0.3))
+    pieces = split_segments(wav, max_seconds=3.0)
+    assert len(pieces) == 2
+    assert all(p.shape[-1] <= 3 * TARGET_SAMPLE_RATE for p in pieces)
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import voice_api  # noqa: E402
+
+
+def test_empty_upload_is_no_speech_without_asr_or_prefetch(monkeypatch):
+    def unexpected(*args, **kwargs):
+        raise AssertionError("empty uploads must not reach ASR or the bank")
+
+    monkeypatch.setattr(voice_api, "run_asr", unexpected)
+    monkeypatch.setattr(voice_api, "start_prefetch", unexpected)
+    monkeypatch.setattr(voice_api.model_lifecycle._ready, "is_set", lambda: True)
+
+    resp = TestClient(voice_api.app).post(
+        "/api/voice-query", files={"file": ("empty.webm", b"")}, data={"lang": "hi"}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["no_speech"] is True
+    assert body["user_text"] == ""
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+
+from audio_decode import TARGET_SAMPLE_RATE  # noqa: E402
+from voice_stream import StreamingSession  # noqa: E402
+
+
+def _session(seconds: float, **kwargs):
+    lengths = []
+
+    async def transcribe(wav):
+        lengths.append(wav.shape[-1])
+        return f"{wav.shape[-1]} samples"
+
+    session = StreamingSession(transcribe, **kwargs)
+
+    async def decode():
+        return torch.zeros(1, int(seconds * TARGET_SAMPLE_RATE))
+
+    session._decode = decode
+    session._check_end_of_speech = lambda wav: None
+    return session, lengths
+
+
+def test_partials_only_recognize_the_trailing_window():
+    session, lengths = _session(3.0, window_s=1.0)
+
+    async def run():
+        session.feed(b"chunk")
+        await session.run_partial()
+        return await session.finalize()
+
+    final = asyncio.run(run())
+    # Partial: last second only; final: the whole utterance
+    assert lengths == [TARGET_SAMPLE_RATE, 3 * TARGET_SAMPLE_RATE]
+    assert final == f"{3 * TARGET_SAMPLE_RATE} samples"
+
+
+def test_short_utterance_reuses_the_partial():
+    session, lengths = _session(0.5, window_s=1.0)
+
+    async def run():
+        session.feed(b"chunk")
+        await session.run_partial()
+        return await session.finalize()
+
+    asyncio.run(run())
+    assert len(lengths) == 1
+
+
+def test_buffer_cap_ends_the_stream():
+    async def run():
+        session, _ = _session(1.0, max_bytes=10)
+        assert session.feed(b"12345")
+        assert not session.feed(b"123456")
+        return session
+
+    session = asyncio.run(run())
+    assert session.end_of_speech.is_set()
+    assert session.audio == b"12345"
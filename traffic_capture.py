@@ -0,0 +1,266 @@
+# traffic_capture.py
+
+"""
+Optional capture of live voice turns for later replay (see benchmarks/replay.py).
+
+With TRAFFIC_CAPTURE_ENABLED=1 the gateway appends one JSON line per turn. The
+line holds the request id, time, sender, language, a sha256 of the audio, the ASR
+output, normalized and number-parsed text, the route taken, Rasa's messages and
+the per-stage timings from telemetry. Auth metadata is never written.
+TRAFFIC_CAPTURE_AUDIO=1 also stores each distinct upload once, under
+audio/<sha256>, so turns can be replayed through ASR.
+
+The request path only does a non-blocking queue put. Hashing, serialisation and
+file I/O run on one writer thread. If the queue is full, turns are dropped and
+counted rather than slowing requests down. Files are append-only and rotate at
+TRAFFIC_CAPTURE_MAX_MB. Each process writes its own files (pid in the name) and
+on rotation keeps only its newest TRAFFIC_CAPTURE_KEEP; files of other processes
+are never touched. Stored audio is shared, so it is pruned by reference instead:
+on rotation, audio that no remaining JSONL file mentions is removed once it is
+older than a short grace period (a writer may not have appended its line yet).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Text
+
+from telemetry import RequestTrace
+
+
+# Basic config
+TRAFFIC_CAPTURE_ENABLED = os.getenv("TRAFFIC_CAPTURE_ENABLED", "0") == "1"
+TRAFFIC_CAPTURE_DIR = os.getenv("TRAFFIC_CAPTURE_DIR", "traffic_capture")
+TRAFFIC_CAPTURE_AUDIO = os.getenv("TRAFFIC_CAPTURE_AUDIO", "0") == "1"
+TRAFFIC_CAPTURE_SAMPLE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE", "1.0"))  # fraction of turns kept
+TRAFFIC_CAPTURE_MAX_MB = float(os.getenv("TRAFFIC_CAPTURE_MAX_MB", "64"))
+TRAFFIC_CAPTURE_KEEP = int(os.getenv("TRAFFIC_CAPTURE_KEEP", "20"))
+TRAFFIC_CAPTURE_QUEUE = int(os.getenv("TRAFFIC_CAPTURE_QUEUE", "10000"))
+
+_FILE_GLOB = "traffic-*.jsonl"
+_AUDIO_REF = re.compile(rb'"audio_sha256": "([0-9a-f]{64})"')
+_AUDIO_GRACE_S = 300.0  # audio this fresh may belong to a line not yet written
+
+
+def audio_digest(audio: bytes) -> Text:
+    return hashlib.sha256(audio).hexdigest()
+
+
+class TrafficCapture:
+    """Bounded queue + writer thread appending turns to rotating JSONL files."""
+
+    def __init__(
+        self,
+        directory: Text = TRAFFIC_CAPTURE_DIR,
+        store_audio: bool = TRAFFIC_CAPTURE_AUDIO,
+        sample: float = TRAFFIC_CAPTURE_SAMPLE,
+        max_bytes: int = int(TRAFFIC_CAPTURE_MAX_MB * 2 ** 20),
+        keep: int = TRAFFIC_CAPTURE_KEEP,
+        queue_size: int = TRAFFIC_CAPTURE_QUEUE,
+    ):
+        self.directory = directory
+        self.store_audio = store_audio
+        self.sample = sample
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._queue: "queue.Queue[Optional[Dict[Text, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._written = 0
+        self._files_opened = 0
+        self.captured = 0
+        self.dropped = 0
+
+    # Request side
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self.store_audio:
+            os.makedirs(os.path.join(self.directory, "audio"), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        print(f"[CAPTURE] Recording turns to {os.path.abspath(self.directory)}")
+
+    def record_turn(
+        self,
+        trace: RequestTrace,
+        summary: Optional[Dict[Text, Any]],
+        kind: Text,
+        sender_id: Text,
+        lang: Text,
+        audio: bytes,
+        filename: Text,
+        status: Text,
+    ) -> None:
+        """Queue one finished turn; never blocks."""
+        if not self.enabled or (self.sample < 1.0 and random.random() >= self.sample):
+            return
+        item = {
+            "trace": trace,
+            "summary": summary or trace.summary(),
+            "kind": kind,
+            "sender_id": sender_id,
+            "lang": lang,
+            "audio": audio,
+            "filename": filename,
+            "status": status,
+            "ts": time.time(),
+        }
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def stats(self) -> Dict[Text, Any]:
+        return {
+            "enabled": self.enabled,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        """Flush what is queued and stop the writer."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout_s)
+        except queue.Full:
+            pass
+        self._thread.join(timeout_s)
+        self._thread = None
+
+    # Writer side
+
+    def _to_record(self, item: Dict[Text, Any]) -> Dict[Text, Any]:
+        notes = item["trace"].notes
+        summary = item["summary"]
+        audio = item["audio"] or b""
+        digest = audio_digest(audio) if audio else None
+
+        if digest and self.store_audio:
+            ext = os.path.splitext(item["filename"] or "")[1] or ".bin"
+            path = os.path.join(self.directory, "audio", digest + ext)
+            try:
+                # Fresh mtime keeps a re-used file inside the prune grace period
+                os.utime(path)
+            except FileNotFoundError:
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp, path)
+
+        return {
+            "ts": round(item["ts"] - summary["total_ms"] / 1000.0, 3),
+            "request_id": summary["request_id"],
+            "kind": item["kind"],
+            "status": item["status"],
+            "sender_id": item["sender_id"],
+            "lang": item["lang"],
+            "audio_sha256": digest,
+            "audio_bytes": len(audio),
+            "filename": item["filename"],
+            "asr_raw": notes.get("asr_raw"),
+            "normalized": notes.get("normalized"),
+            "user_text": notes.get("user_text"),
+            "route": notes.get("route"),
+            "rasa_messages": notes.get("rasa_messages"),
+            "total_ms": summary["total_ms"],
+            "stages_ms": summary["stages_ms"],
+        }
+
+    def _open_new_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        name = time.strftime("traffic-%Y%m%d-%H%M%S", time.gmtime()) + f"-{os.getpid()}-{self._files_opened:04d}.jsonl"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, "ab")
+        self._files_opened += 1
+        self._written = 0
+        self._prune(path)
+
+    def _prune(self, current: Text) -> None:
+        """Drop this process's oldest closed files, then audio no kept file refers to."""
+        if self.keep <= 0:
+            return
+        own = glob.glob(os.path.join(self.directory, f"traffic-*-{os.getpid()}-*.jsonl"))
+        own = sorted((p for p in own if p != current), key=lambda p: (os.path.getmtime(p), p))
+        for old in own[:max(0, len(own) - (self.keep - 1))]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+        if self.store_audio:
+            self._prune_audio()
+
+    def _prune_audio(self) -> None:
+        referenced: Set[Text] = set()
+        for path in glob.glob(os.path.join(self.directory, _FILE_GLOB)):
+            try:
+                with open(path, "rb") as f:
+                    for line in f:
+                        referenced.update(m.decode("ascii") for m in _AUDIO_REF.findall(line))
+            except OSError:
+                pass
+
+        cutoff = time.time() - _AUDIO_GRACE_S
+        for path in glob.glob(os.path.join(self.directory, "audio", "*")):
+            digest = os.path.basename(path).split(".", 1)[0]
+            try:
+                if digest not in referenced and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Drain whatever else is waiting so one flush covers a burst
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            lines = []
+            for entry in batch:
+                if entry is None:
+                    continue
+                try:
+                    lines.append(json.dumps(self._to_record(entry), ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                except Exception as e:
+                    print("[CAPTURE] Could not serialise turn:", repr(e))
+
+            if lines:
+                try:
+                    if self._file is None or self._written >= self.max_bytes:
+                        self._open_new_file()
+                    data = b"".join(lines)
+                    self._file.write(data)
+                    self._file.flush()
+                    self._written += len(data)
+                    self.captured += len(lines)
+                except OSError as e:
+                    print("[CAPTURE] Write failed:", repr(e))
+                    self.dropped += len(lines)
+
+            if batch[-1] is None:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
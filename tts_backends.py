@@ -0,0 +1,179 @@
+# tts_backends.py
+
+"""
+Pluggable speech synthesizers for the action server.
+
+TTS_BACKEND selects one:
+  gtts - Google TTS over HTTP (needs network), mp3 output
+  mms  - local CPU VITS models (facebook/mms-tts-*), fully offline once the
+         weights are on disk, wav output
+  stub - short silent wav after a fixed delay (TTS_STUB_LATENCY_MS), for
+         benchmarks and load tests
+
+Each backend loads its models once per process and is shared by all actions.
+"""
+
+import os
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Text
+
+
+# Basic config
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+TTS_MODEL_DIR = os.getenv("TTS_MODEL_DIR", "")  # local snapshots: <dir>/mms-tts-hin, ...
+TTS_LOCAL_FILES_ONLY = os.getenv("TTS_LOCAL_FILES_ONLY", "1") == "1"
+TTS_NUM_THREADS = int(os.getenv("TTS_NUM_THREADS", "0"))  # 0 = torch default
+TTS_STUB_LATENCY_MS = float(os.getenv("TTS_STUB_LATENCY_MS", "50"))
+
+
+class Synthesizer(ABC):
+    """Turns text in one of our language codes into an audio file."""
+
+    name = "base"
+    ext = "mp3"
+
+    @property
+    def voice(self) -> Text:
+        """Identity used in TTS cache keys; changes whenever output would change."""
+        return self.name
+
+    @abstractmethod
+    def synthesize(self, text: Text, lang: Text, out_path: Text) -> None:
+        """Write the audio for text to out_path."""
+
+
+class GTTSSynthesizer(Synthesizer):
+    """Google Translate TTS; one HTTP round trip per call."""
+
+    name = "gtts"
+    ext = "mp3"
+
+    def synthesize(self, text: Text, lang: Text, out_path: Text) -> None:
+        from gtts import gTTS
+
+        gTTS(text=text, lang=lang).save(out_path)
+
+
+class MMSSynthesizer(Synthesizer):
+    """Offline Meta MMS VITS voices, one small model per language, run on CPU."""
+
+    name = "mms"
+    ext = "wav"
+
+    MODEL_IDS = {
+        "hi": "facebook/mms-tts-hin",
+        "bn": "facebook/mms-tts-ben",
+        "mr": "facebook/mms-tts-mar",
+        "or": "facebook/mms-tts-ory",
+        "ta": "facebook/mms-tts-tam",
+        "te": "facebook/mms-tts-tel",
+        "en": "facebook/mms-tts-eng",
+    }
+
+    def __init__(self, model_dir: Text = TTS_MODEL_DIR, local_files_only: bool = TTS_LOCAL_FILES_ONLY):
+        self.model_dir = model_dir
+        self.local_files_only = local_files_only
+        self._models: Dict[Text, Any] = {}
+        self._locks: Dict[Text, threading.Lock] = {lang: threading.Lock() for lang in self.MODEL_IDS}
+
+        if TTS_NUM_THREADS > 0:
+            import torch
+            torch.set_num_threads(TTS_NUM_THREADS)
+
+    def _source(self, lang: Text) -> Text:
+        model_id = self.MODEL_IDS[lang]
+        if self.model_dir:
+            return os.path.join(self.model_dir, model_id.split("/", 1)[1])
+        return model_id
+
+    def _load(self, lang: Text):
+        """(tokenizer, model) for a language, loaded on first use."""
+        if lang not in self.MODEL_IDS:
+            raise ValueError(f"No offline voice for language {lang!r}")
+
+        bundle = self._models.get(lang)
+        if bundle is not None:
+            return bundle
+
+        with self._locks[lang]:
+            bundle = self._models.get(lang)
+            if bundle is None:
+                from transformers import AutoTokenizer, VitsModel
+
+                source = self._source(lang)
+                print(f"[TTS] Loading offline voice {source}")
+                tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=self.local_files_only)
+                model = VitsModel.from_pretrained(source, local_files_only=self.local_files_only).eval()
+                bundle = (tokenizer, model)
+                self._models[lang] = bundle
+        return bundle
+
+    def preload(self) -> None:
+        """Load every language up front (e.g. at action-server start)."""
+        for lang in self.MODEL_IDS:
+            self._load(lang)
+
+    def synthesize(self, text: Text, lang: Text, out_path: Text) -> None:
+        import torch
+
+        tokenizer, model = self._load(lang)
+        if getattr(tokenizer, "is_uroman", False):
+            raise ValueError(f"Voice for {lang!r} needs uroman romanization, which is not installed")
+
+        inputs = tokenizer(text, return_tensors="pt")
+        with torch.inference_mode():
+            waveform = model(**inputs).waveform[0]
+
+        pcm = (waveform.clamp(-1.0, 1.0) * 32767.0).to(torch.int16).numpy().tobytes()
+        with wave.open(out_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(model.config.sampling_rate)
+            wf.writeframes(pcm)
+
+
+class StubSynthesizer(Synthesizer):
+    """No model and no network: waits as long as a real call would, then writes silence."""
+
+    name = "stub"
+    ext = "wav"
+
+    def __init__(self, latency_ms: float = TTS_STUB_LATENCY_MS, sample_rate: int = 16000):
+        self.latency_ms = latency_ms
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: Text, lang: Text, out_path: Text) -> None:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        with wave.open(out_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(b"\x00\x00" * (self.sample_rate // 4))
+
+
+_BACKENDS = {
+    "gtts": GTTSSynthesizer,
+    "mms": MMSSynthesizer,
+    "stub": StubSynthesizer,
+}
+
+_synthesizer: Optional[Synthesizer] = None
+_synthesizer_lock = threading.Lock()
+
+
+def get_synthesizer(name: Text = TTS_BACKEND) -> Synthesizer:
+    """The process-wide synthesizer selected by TTS_BACKEND."""
+    global _synthesizer
+
+    if _synthesizer is None:
+        with _synthesizer_lock:
+            if _synthesizer is None:
+                if name not in _BACKENDS:
+                    raise ValueError(f"Unknown TTS_BACKEND {name!r}; choose from {sorted(_BACKENDS)}")
+                _synthesizer = _BACKENDS[name]()
+                print(f"[TTS] Using {name} synthesizer")
+    return _synthesizer
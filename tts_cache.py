@@ -0,0 +1,194 @@
+# tts_cache.py
+
+"""
+Content-addressed cache for synthesized replies.
+
+Audio files live on disk under a name derived from (normalized text, language,
+voice); an in-memory LRU index tracks their size and last use and evicts by entry
+count, total bytes and age. Repeated replies are served without calling the
+synthesizer. Files are written atomically, so processes sharing the directory
+can adopt each other's entries.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Text
+
+from tts_store import atomic_write
+
+
+# Basic config
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join("tts_responses", "cache"))
+TTS_CACHE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "5000"))
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024)
+TTS_CACHE_MAX_AGE_S = float(os.getenv("TTS_CACHE_MAX_AGE_S", str(7 * 24 * 3600)))
+
+
+# Keys
+
+def normalize_tts_text(text: Text) -> Text:
+    """Canonical form used for keys: NFC, trimmed, single spaces."""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def cache_key(text: Text, lang: Text, voice: Text) -> Text:
+    """Stable hex digest for one (text, lang, voice) triple."""
+    raw = "\x1f".join([normalize_tts_text(text), lang, voice])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Cache
+
+class TTSCache:
+    """LRU index over audio files, bounded by entries, bytes and age."""
+
+    def __init__(
+        self,
+        directory: Text = TTS_CACHE_DIR,
+        max_entries: int = TTS_CACHE_MAX_ENTRIES,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        max_age_s: float = TTS_CACHE_MAX_AGE_S,
+        ext: Text = "mp3",
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.ext = ext
+
+        # key -> (size_bytes, created_at); order = least to most recently used
+        self._index: "OrderedDict[Text, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def path_for(self, key: Text) -> Text:
+        return os.path.join(self.directory, f"{key}.{self.ext}")
+
+    def _load_index(self) -> None:
+        """Rebuild the index from files already on disk, oldest first."""
+        entries = []
+        suffix = f".{self.ext}"
+        for name in os.listdir(self.directory):
+            if not name.endswith(suffix) or "." in name[: -len(suffix)]:
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[: -len(suffix)], st.st_size))
+
+        for mtime, key, size in sorted(entries):
+            self._index[key] = (size, mtime)
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict_locked()
+
+    # Lookup
+
+    def get(self, text: Text, lang: Text, voice: Text) -> Optional[Text]:
+        """Return the cached file path for this reply, or None."""
+        key = cache_key(text, lang, voice)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                entry = self._adopt_locked(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() - entry[1] > self.max_age_s or not os.path.exists(self.path_for(key)):
+                self._drop_locked(key)
+                self.misses += 1
+                return None
+
+            self._index.move_to_end(key)
+            self.hits += 1
+            return self.path_for(key)
+
+    def get_or_create(
+        self,
+        text: Text,
+        lang: Text,
+        voice: Text,
+        synthesize: Callable[[Text], None],
+    ) -> Text:
+        """Return a cached path, or call synthesize(out_path) once and cache the result."""
+        cached = self.get(text, lang, voice)
+        if cached:
+            return cached
+
+        key = cache_key(text, lang, voice)
+        out_path = atomic_write(self.path_for(key), synthesize)
+        self.put(key)
+        return out_path
+
+    # Maintenance
+
+    def put(self, key: Text) -> None:
+        """Register a file that was just written at path_for(key)."""
+        size = os.path.getsize(self.path_for(key))
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[0]
+            self._index[key] = (size, time.time())
+            self._total_bytes += size
+            self._evict_locked()
+
+    def _adopt_locked(self, key: Text) -> Optional[tuple]:
+        """Index a file another process already wrote for this key."""
+        try:
+            st = os.stat(self.path_for(key))
+        except OSError:
+            return None
+        entry = (st.st_size, st.st_mtime)
+        self._index[key] = entry
+        self._total_bytes += st.st_size
+        return entry
+
+    def _drop_locked(self, key: Text) -> None:
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry[0]
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        """Drop expired entries, then least recently used ones until under limits."""
+        cutoff = time.time() - self.max_age_s
+        for key in [k for k, (_, created) in self._index.items() if created < cutoff]:
+            self._drop_locked(key)
+            self.evictions += 1
+
+        while self._index and (
+            len(self._index) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key = next(iter(self._index))
+            self._drop_locked(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[Text, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
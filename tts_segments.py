@@ -0,0 +1,104 @@
+# tts_segments.py
+
+"""
+Template-aware segmented TTS.
+
+A template like "आपके खाते {account_id} में वर्तमान बैलेंस {balance} रुपये है।" is
+split at its placeholders. The fixed fragments are synthesized once and served
+from the TTS cache. Only the slot values (amounts, account ids, tx ids) need new
+audio. They are short, but they are per-turn account data, so callers keep them
+out of the shared cache. The segments are then joined into one reply file.
+"""
+
+import string
+import wave
+from typing import Any, Dict, List, Text, Tuple
+
+
+_ID3_HEADER_LEN = 10
+
+
+def _speakable(fragment: Text) -> bool:
+    """Skip fragments that are only spaces or punctuation (e.g. a trailing '।')."""
+    return any(ch.isalnum() for ch in fragment)
+
+
+def template_pieces(template: Text, values: Dict[Text, Any]) -> List[Tuple[Text, bool]]:
+    """
+    Split a template into ordered speakable (text, is_value) pieces.
+
+    Joining the texts with spaces reads the same as template.format(**values).
+    """
+    pieces: List[Tuple[Text, bool]] = []
+    formatter = string.Formatter()
+
+    for literal, field, spec, conversion in formatter.parse(template):
+        if literal and _speakable(literal):
+            pieces.append((literal.strip(), False))
+        if field is None:
+            continue
+        value = formatter.get_field(field, (), values)[0]
+        value = formatter.convert_field(value, conversion)
+        value = formatter.format_field(value, spec or "")
+        if _speakable(value):
+            pieces.append((value.strip(), True))
+
+    return pieces
+
+
+def fixed_fragments(template: Text) -> List[Text]:
+    """The speakable fixed pieces of a template, without any slot values."""
+    return [
+        literal.strip()
+        for literal, _, _, _ in string.Formatter().parse(template)
+        if literal and _speakable(literal)
+    ]
+
+
+# Audio concatenation
+
+def _mp3_payload(data: bytes) -> bytes:
+    """Drop a leading ID3v2 tag so frames from several files can be chained."""
+    if data[:3] != b"ID3" or len(data) < _ID3_HEADER_LEN:
+        return data
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    return data[_ID3_HEADER_LEN + size:]
+
+
+def _concat_mp3(paths: List[Text], out_path: Text) -> None:
+    with open(out_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as f:
+                out.write(_mp3_payload(f.read()))
+
+
+def _concat_wav(paths: List[Text], out_path: Text) -> None:
+    params = None
+    frames = []
+    for path in paths:
+        with wave.open(path, "rb") as wf:
+            p = wf.getparams()
+            if params is None:
+                params = p
+            elif (p.nchannels, p.sampwidth, p.framerate) != (params.nchannels, params.sampwidth, params.framerate):
+                raise ValueError(f"WAV segment {path} has a different format")
+            frames.append(wf.readframes(wf.getnframes()))
+
+    with wave.open(out_path, "wb") as out:
+        out.setnchannels(params.nchannels)
+        out.setsampwidth(params.sampwidth)
+        out.setframerate(params.framerate)
+        for chunk in frames:
+            out.writeframes(chunk)
+
+
+def concat_audio(paths: List[Text], out_path: Text, fmt: Text = "mp3") -> None:
+    """Join same-format segment files into out_path (MP3 frames are chained as-is)."""
+    if not paths:
+        raise ValueError("No audio segments to join")
+    if fmt == "wav":
+        _concat_wav(paths, out_path)
+    else:
+        _concat_mp3(paths, out_path)
@@ -0,0 +1,188 @@
+# tts_store.py
+
+"""
+Disk store for TTS reply audio.
+
+Every per-session reply gets a unique file name, all writes go to a temp file in
+the same directory and are renamed into place, and a background sweeper expires
+old session files and keeps the whole store under a disk cap. Several
+action-server processes can share one store: renames are atomic, deletions are
+idempotent, and only one process sweeps at a time (advisory file lock).
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Text, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sweeps are idempotent, so just skip the lock
+    fcntl = None
+
+
+# Basic config
+TTS_SESSION_TTL_S = float(os.getenv("TTS_SESSION_TTL_S", "900"))
+TTS_STORE_MAX_BYTES = int(float(os.getenv("TTS_STORE_MAX_MB", "1024")) * 1024 * 1024)
+TTS_SWEEP_INTERVAL_S = float(os.getenv("TTS_SWEEP_INTERVAL_S", "60"))
+
+SESSIONS_SUBDIR = "sessions"
+CACHE_SUBDIR = "cache"
+_TMP_SUFFIX = ".tmp"
+_TMP_MAX_AGE_S = 3600.0
+_AUDIO_EXTS = (".mp3", ".wav")
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class TTSStore:
+    """Atomic, collision-free audio storage with background expiry and a disk cap."""
+
+    def __init__(
+        self,
+        root: Text,
+        session_ttl_s: float = TTS_SESSION_TTL_S,
+        max_bytes: int = TTS_STORE_MAX_BYTES,
+        sweep_interval_s: float = TTS_SWEEP_INTERVAL_S,
+    ):
+        self.root = root
+        self.session_ttl_s = session_ttl_s
+        self.max_bytes = max_bytes
+        self.sweep_interval_s = sweep_interval_s
+
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        os.makedirs(os.path.join(self.root, SESSIONS_SUBDIR), exist_ok=True)
+        os.makedirs(os.path.join(self.root, CACHE_SUBDIR), exist_ok=True)
+
+    # Paths
+
+    def cache_dir(self) -> Text:
+        return os.path.join(self.root, CACHE_SUBDIR)
+
+    def new_session_path(self, session_id: Text, ext: Text = "mp3") -> Text:
+        """Unique path for one reply in one conversation."""
+        safe = _SAFE_ID.sub("_", session_id or "anon")[:64]
+        directory = os.path.join(self.root, SESSIONS_SUBDIR, safe)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{uuid.uuid4().hex}.{ext}")
+
+    def atomic_write(self, path: Text, writer: Callable[[Text], None]) -> Text:
+        return atomic_write(path, writer)
+
+    # Expiry
+
+    def start_sweeper(self) -> None:
+        """Start the background expiry thread (once per process)."""
+        if self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="tts-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval_s):
+            try:
+                self.sweep()
+            except Exception as e:
+                print("[TTS_STORE] sweep failed:", repr(e))
+
+    def _list_files(self) -> List[Tuple[float, int, Text, bool]]:
+        """(mtime, size, path, is_cache) for every audio or temp file under the store."""
+        cache_root = self.cache_dir()
+        files = []
+        for dirpath, _, names in os.walk(self.root):
+            is_cache = dirpath.startswith(cache_root)
+            for name in names:
+                if not name.endswith(_AUDIO_EXTS + (_TMP_SUFFIX,)):
+                    continue  # manifest, lock file
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path, is_cache))
+        return files
+
+    def sweep(self) -> int:
+        """Expire old session files and stale temp files, then enforce the disk cap."""
+        lock_path = os.path.join(self.root, ".sweep.lock")
+        with open(lock_path, "a") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0  # another process is sweeping
+            try:
+                return self._sweep_locked()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sweep_locked(self) -> int:
+        now = time.time()
+        removed = 0
+        kept = []
+
+        for mtime, size, path, is_cache in self._list_files():
+            age = now - mtime
+            expired = (
+                (path.endswith(_TMP_SUFFIX) and age > _TMP_MAX_AGE_S)
+                or (not is_cache and not path.endswith(_TMP_SUFFIX) and age > self.session_ttl_s)
+            )
+            if expired and _remove(path):
+                removed += 1
+            else:
+                kept.append((mtime, size, path, is_cache))
+
+        total = sum(size for _, size, _, _ in kept)
+        if total > self.max_bytes:
+            # Oldest session files go first, cache entries after them
+            for mtime, size, path, is_cache in sorted(kept, key=lambda f: (f[3], f[0])):
+                if total <= self.max_bytes:
+                    break
+                if path.endswith(_TMP_SUFFIX):
+                    continue
+                if _remove(path):
+                    total -= size
+                    removed += 1
+
+        # Only long-idle session dirs, so a writer that just created one is not raced
+        sessions_root = os.path.join(self.root, SESSIONS_SUBDIR)
+        for dirpath, dirnames, names in os.walk(sessions_root, topdown=False):
+            if dirnames or names or dirpath == sessions_root:
+                continue
+            try:
+                if now - os.stat(dirpath).st_mtime > self.session_ttl_s:
+                    os.rmdir(dirpath)
+            except OSError:
+                pass
+
+        if removed:
+            print(f"[TTS_STORE] Swept {removed} file(s); store size {total} bytes")
+        return removed
+
+
+def atomic_write(path: Text, writer: Callable[[Text], None]) -> Text:
+    """Call writer(tmp_path) in the target directory, then rename the finished file onto path."""
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}{_TMP_SUFFIX}"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            _remove(tmp_path)
+    return path
+
+
+def _remove(path: Text) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
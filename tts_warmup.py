@@ -0,0 +1,128 @@
+# tts_warmup.py
+
+"""
+Pre-render audio for the fully static reply templates.
+
+Every template without placeholders (greet, goodbye, OTP prompts, loan_info,
+error_* ...) is synthesized in every language into the TTS cache, in parallel.
+The fixed fragments of templated replies (balance, transfer_success ...) are
+rendered into the cache as well, for segmented TTS. Replies find their audio in
+the cache by content, so an edited template is simply a cache miss. The manifest
+written next to the cache (template -> lang -> audio path) is a report of what
+was rendered, not a lookup table.
+Runs in the background when the action server starts, or from the CLI:
+
+    python tts_warmup.py [--workers 8] [--manifest tts_responses/manifest.json]
+"""
+
+import argparse
+import json
+import os
+import string
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Text, Tuple
+
+from tts_segments import fixed_fragments
+from tts_store import atomic_write
+
+
+# Basic config
+TTS_WARMUP_WORKERS = int(os.getenv("TTS_WARMUP_WORKERS", "8"))
+TTS_MANIFEST_PATH = os.getenv("TTS_MANIFEST_PATH", os.path.join("tts_responses", "manifest.json"))
+
+Manifest = Dict[Text, Dict[Text, Text]]
+# synthesize(text, lang, name) -> audio path ("" on failure)
+Synthesize = Callable[[Text, Text, Text], Text]
+
+
+def is_static(template: Text) -> bool:
+    """True if the template has no {placeholders}."""
+    return all(field is None for _, field, _, _ in string.Formatter().parse(template))
+
+
+def static_jobs(templates: Dict[Text, Dict[Text, Text]]) -> List[Tuple[Text, Text, Text]]:
+    """(template name, lang, text) for every placeholder-free template."""
+    return [
+        (name, lang, text)
+        for name, by_lang in templates.items()
+        for lang, text in by_lang.items()
+        if text and is_static(text)
+    ]
+
+
+def fragment_jobs(templates: Dict[Text, Dict[Text, Text]]) -> List[Tuple[Text, Text, Text]]:
+    """(template name, lang, fragment) for the fixed text of every templated reply."""
+    jobs = []
+    for name, by_lang in templates.items():
+        for lang, text in by_lang.items():
+            if text and not is_static(text):
+                jobs.extend((name, lang, frag) for frag in fixed_fragments(text))
+    return jobs
+
+
+def warm_templates(
+    templates: Dict[Text, Dict[Text, Text]],
+    synthesize: Synthesize,
+    workers: int = TTS_WARMUP_WORKERS,
+    manifest_path: Text = TTS_MANIFEST_PATH,
+    voice: Text = "",
+) -> Manifest:
+    """Render all static templates (and templated-reply fragments) in parallel and write the manifest."""
+    jobs = static_jobs(templates)
+    fragments = fragment_jobs(templates)
+    t0 = time.perf_counter()
+
+    def _run(job: Tuple[Text, Text, Text]) -> Tuple[Text, Text, Text]:
+        name, lang, text = job
+        return name, lang, synthesize(text, lang, name)
+
+    manifest: Manifest = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tts-warmup") as pool:
+        for name, lang, path in pool.map(_run, jobs):
+            if path:
+                manifest.setdefault(name, {})[lang] = path
+            else:
+                failed += 1
+        # Fragments are only rendered into the cache; the manifest lists whole replies
+        fragment_failed = sum(1 for _, _, path in pool.map(_run, fragments) if not path)
+
+    payload = {"voice": voice, "created_at": time.time(), "templates": manifest}
+
+    def _write(tmp_path: Text) -> None:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    atomic_write(manifest_path, _write)
+
+    print(
+        f"[TTS_WARMUP] {len(jobs) - failed}/{len(jobs)} static replies and "
+        f"{len(fragments) - fragment_failed}/{len(fragments)} fragments ready "
+        f"in {time.perf_counter() - t0:.1f}s -> {manifest_path}"
+    )
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-render static reply audio for SahaYaa.")
+    parser.add_argument("--workers", type=int, default=TTS_WARMUP_WORKERS)
+    parser.add_argument("--manifest", default=TTS_MANIFEST_PATH)
+    args = parser.parse_args()
+
+    # Imported here so the action server can import this module without a cycle
+    os.environ["TTS_WARMUP_ON_START"] = "0"
+    import actions
+
+    warm_templates(
+        actions.TEMPLATES,
+        actions.synthesize_tts,
+        workers=args.workers,
+        manifest_path=args.manifest,
+        voice=actions.TTS_VOICE,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# vad.py
+
+"""
+Energy-based voice activity detection on decoded 16 kHz waveforms.
+
+The browser recorder captures dead air between the button press and the first
+word, and again after the last one. ASR cost grows with input length, so the
+gateway trims that silence before recognition, skips uploads with no speech at
+all, and can split long recordings at pauses so the pieces are recognized as one
+batch.
+
+Each short frame is classed as speech when its RMS clears both an absolute floor
+and a multiple of the clip's own noise floor (a low percentile of frame energy),
+so quiet rooms and noisy ones both work without tuning. Short gaps are bridged,
+blips shorter than VAD_MIN_SPEECH_MS are dropped, and regions are padded so word
+onsets are not clipped.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import torch
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+
+# Basic config
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_FRAME_MS = float(os.getenv("VAD_FRAME_MS", "30"))
+VAD_MIN_RMS = float(os.getenv("VAD_MIN_RMS", "0.01"))          # absolute floor, same scale as STREAM_SILENCE_RMS
+VAD_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))   # speech must be this much above the noise floor
+VAD_NOISE_PERCENTILE = float(os.getenv("VAD_NOISE_PERCENTILE", "0.1"))
+VAD_MIN_SPEECH_MS = float(os.getenv("VAD_MIN_SPEECH_MS", "120"))
+VAD_MAX_GAP_MS = float(os.getenv("VAD_MAX_GAP_MS", "300"))     # pauses shorter than this stay inside one region
+VAD_PAD_MS = float(os.getenv("VAD_PAD_MS", "200"))
+VAD_SEGMENT_SECONDS = float(os.getenv("VAD_SEGMENT_SECONDS", "0"))  # 0 = never split
+
+Region = Tuple[int, int]  # [start, end) in samples
+
+
+def _ms_to_samples(ms: float) -> int:
+    return int(TARGET_SAMPLE_RATE * ms / 1000.0)
+
+
+def frame_rms(samples: torch.Tensor, frame_len: int) -> torch.Tensor:
+    """RMS of consecutive frames of a 1-D signal (the last frame is zero-padded)."""
+    n_frames = -(-samples.numel() // frame_len)
+    padded = torch.nn.functional.pad(samples, (0, n_frames * frame_len - samples.numel()))
+    return padded.view(n_frames, frame_len).pow(2).mean(dim=1).sqrt()
+
+
+def speech_regions(
+    wav: torch.Tensor,
+    frame_ms: float = VAD_FRAME_MS,
+    min_rms: float = VAD_MIN_RMS,
+    noise_ratio: float = VAD_NOISE_RATIO,
+    min_speech_ms: float = VAD_MIN_SPEECH_MS,
+    max_gap_ms: float = VAD_MAX_GAP_MS,
+    pad_ms: float = VAD_PAD_MS,
+) -> List[Region]:
+    """Sample ranges that contain speech, in order; empty if the clip is silent."""
+    samples = wav.reshape(-1)
+    if samples.numel() == 0:
+        return []
+
+    frame_len = max(1, _ms_to_samples(frame_ms))
+    rms = frame_rms(samples, frame_len)
+
+    # Clips that are speech end to end have a high "noise" floor; never demand
+    # more than half the energy of the loud frames
+    noise = torch.quantile(rms, VAD_NOISE_PERCENTILE).item()
+    loud = torch.quantile(rms, 0.9).item()
+    threshold = max(min_rms, min(noise * noise_ratio, loud * 0.5))
+    active = (rms > threshold).tolist()
+
+    # Runs of active frames, bridging short pauses
+    max_gap = max_gap_ms / frame_ms
+    runs: List[List[int]] = []
+    for i, is_speech in enumerate(active):
+        if not is_speech:
+            continue
+        if runs and i - runs[-1][1] <= max_gap:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+
+    min_frames = min_speech_ms / frame_ms
+    pad = _ms_to_samples(pad_ms)
+    total = samples.numel()
+
+    regions: List[Region] = []
+    for start, end in runs:
+        if end - start < min_frames:
+            continue
+        s = max(0, start * frame_len - pad)
+        e = min(total, end * frame_len + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def trim_silence(wav: torch.Tensor, regions: Optional[List[Region]] = None) -> Optional[torch.Tensor]:
+    """(1, T) waveform from the first to the last speech region, or None if there is no speech."""
+    regions = speech_regions(wav) if regions is None else regions
+    if not regions:
+        return None
+    return wav[:, regions[0][0]:regions[-1][1]]
+
+
+def split_segments(
+    wav: torch.Tensor,
+    max_seconds: float = VAD_SEGMENT_SECONDS,
+    regions: Optional[List[Region]] = None,
+) -> List[torch.Tensor]:
+    """
+    Speech in (1, T) pieces of at most max_seconds, cut at pauses where possible.
+
+    Neighbouring regions are packed together while they fit; a single region longer
+    than max_seconds is cut into equal parts. Returns [] for a silent clip.
+    """
+    regions = speech_regions(wav) if regions is None else regions
+    if not regions:
+        return []
+    if max_seconds <= 0:
+        return [wav[:, regions[0][0]:regions[-1][1]]]
+
+    limit = int(TARGET_SAMPLE_RATE * max_seconds)
+    spans: List[Region] = []
+    for start, end in regions:
+        if spans and end - spans[-1][0] <= limit:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+
+    pieces: List[torch.Tensor] = []
+    for start, end in spans:
+        n_parts = -(-(end - start) // limit)
+        step = -(-(end - start) // n_parts)
+        for s in range(start, end, step):
+            pieces.append(wav[:, s:min(end, s + step)])
+    return pieces
+
+
+def speech_segments(wav: torch.Tensor, max_seconds: float = VAD_SEGMENT_SECONDS) -> List[torch.Tensor]:
+    """What ASR should see for one decoded clip: trimmed (and optionally split) speech, [] if silent."""
+    if not VAD_ENABLED:
+        return [wav]
+
+    regions = speech_regions(wav)
+    pieces = split_segments(wav, max_seconds, regions)
+    kept = sum(p.shape[-1] for p in pieces)
+    print(
+        f"[VAD] {wav.shape[-1] / TARGET_SAMPLE_RATE:.2f}s in, "
+        f"{kept / TARGET_SAMPLE_RATE:.2f}s speech in {len(pieces)} segment(s)"
+    )
+    return pieces
@@ -1,182 +1,175 @@
 # voice_api.py
 
-import subprocess
-from pathlib import Path
+import asyncio
+import json
 import os
-import shutil
-import tempfile
-import re
 from typing import Any, Dict, List, Optional
 
-import torch
-import torchaudio
-import requests
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 
-from transformers import AutoModel
 from normalizer_multi import normalize_text  # you already have this
+from number_parser import parse_numbers
+from asr_batcher import ASRBatcher
+from inference_pool import DEVICE, InferencePool, forward_batch
+from model_lifecycle import ModelLifecycle
+from audio_decode import decode_audio_bytes
+from voice_stream import StreamingSession
+from vad import speech_segments
+from rasa_client import RASA_REST_URL, RasaClient
+from banking_client import BankingClient
+from account_prefetch import PREFETCH_ENABLED, AccountPrefetch
+from fast_router import FAST_PATH_ENABLED, FastRouter
+from telemetry import annotate, current_request_id, finish_trace, render_metrics, span, start_trace
+from traffic_capture import TRAFFIC_CAPTURE_ENABLED, TrafficCapture
 
 # Basic config
-RASA_REST_URL = os.getenv(
-    "RASA_REST_URL",
-    "http://127.0.0.1:5005/webhooks/rest/webhook"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TTS_DIR = os.path.join(BASE_DIR, "tts_responses")  # where actions.py writes reply audio
+
+# FastAPI app
+
+app = FastAPI(title="SahaYaa Voice Gateway")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],   # for local demo
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
 )
 
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# Expose generated TTS files
+if os.path.isdir(TTS_DIR):
+    app.mount(
+        "/tts_responses",
+        StaticFiles(directory=TTS_DIR),
+        name="tts_responses"
+    )
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TTS_DIR = os.path.join(BASE_DIR, "tts_responses")  # where actions.py writes mp3s
+# ASR model (runs on the inference pool, see inference_pool.py)
 
-# Hindi number conversion
+print("[VOICE_API] Using device:", DEVICE)
 
-HINDI_NUMBER_MAP = {
-    'एक': 1, 'दो': 2, 'तीन': 3, 'चार': 4, 'पांच': 5,
-    'छह': 6, 'छ': 6, 'सात': 7, 'आठ': 8, 'नौ': 9, 'दस': 10,
+inference_pool = InferencePool()
+asr_batcher = ASRBatcher(forward_batch, max_inflight=inference_pool.workers)
 
-    'ग्यारह': 11, 'बारह': 12, 'तेरह': 13, 'चौदह': 14, 'पंद्रह': 15,
-    'सोलह': 16, 'सत्रह': 17, 'अठारह': 18, 'उन्नीस': 19, 'बीस': 20,
 
-    'तीस': 30, 'चालीस': 40, 'पचास': 50, 'साठ': 60, 'सत्तर': 70,
-    'अस्सी': 80, 'नब्बे': 90,
+def _attach_batcher(pool: InferencePool) -> None:
+    asr_batcher.executor = pool.executor
 
-    'सौ': 100, 'हज़ार': 1000, 'हजार': 1000, 'लाख': 100000
-}
 
+model_lifecycle = ModelLifecycle(inference_pool, on_ready=_attach_batcher)
 
-def convert_hindi_numbers_to_digits(text: str) -> str:
-    """
-    Convert Hindi number words to digits where possible.
-    """
-    if not text:
-        return text
 
-    original_text = text
+@app.on_event("startup")
+async def start_inference_pool():
+    """Start loading the model in the background; /readyz reports when it is done."""
+    model_lifecycle.start()
 
-    pattern1 = r'(एक|दो|तीन|चार|पांच|पाँच|छः|छह|छ|सात|आठ|नौ|दस|[०-९]+)\s*(हज़ार|हजार|सौ|लाख)'
 
-    def replace_match(match):
-        num_part = match.group(1)
-        multiplier_part = match.group(2)
+@app.on_event("shutdown")
+async def stop_inference_pool():
+    inference_pool.shutdown()
 
-        devanagari_to_arabic = {
-            '०': '0', '१': '1', '२': '2', '३': '3', '४': '4',
-            '५': '5', '६': '6', '७': '7', '८': '8', '९': '9'
-        }
 
-        if any(c in devanagari_to_arabic for c in num_part):
-            num_part = ''.join(devanagari_to_arabic.get(c, c) for c in num_part)
-            base_num = int(num_part)
-        else:
-            base_num = HINDI_NUMBER_MAP.get(num_part, 1)
+# Rasa connection pool
 
-        multiplier = HINDI_NUMBER_MAP.get(multiplier_part, 1)
+rasa_client = RasaClient()
 
-        result = base_num * multiplier
-        return str(result)
 
-    text = re.sub(pattern1, replace_match, text, flags=re.IGNORECASE)
+@app.on_event("startup")
+async def open_rasa_client():
+    await rasa_client.start()
 
-    for hindi_word, digit in HINDI_NUMBER_MAP.items():
-        if hindi_word in ['हज़ार', 'हजार', 'सौ', 'लाख']:
-            continue
-        text = re.sub(r'\b' + re.escape(hindi_word) + r'\b', str(digit), text, flags=re.IGNORECASE)
 
-    if text != original_text:
-        print(f"[HINDI_CONVERTER] '{original_text}' → '{text}'")
+@app.on_event("shutdown")
+async def close_rasa_client():
+    await rasa_client.close()
 
-    return text
 
+# Speculative account prefetch (see account_prefetch.py)
 
-# FastAPI app
+# Reads through the account cache only when it is shared (see account_prefetch.py)
+prefetch_client = BankingClient()
 
-app = FastAPI(title="SahaYaa Voice Gateway")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],   # for local demo
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@app.on_event("shutdown")
+async def close_prefetch_client():
+    await prefetch_client.aclose()
 
-# Expose generated TTS files
-if os.path.isdir(TTS_DIR):
-    app.mount(
-        "/tts_responses",
-        StaticFiles(directory=TTS_DIR),
-        name="tts_responses"
-    )
 
-# ASR model
+def gateway_auth(sender: str) -> Dict[str, Any]:
+    """Auth block the gateway attaches to every turn."""
+    return {
+        "user_id": sender,
+        "biometric_score": 0.92,
+        "liveness_passed": True,
+        "otp_verified": False,
+        "channel": "voice",
+        "risk_label": "low",
+    }
 
-print("[VOICE_API] Using device:", DEVICE)
-print("[VOICE_API] Loading IndicConformer...")
 
-asr_model = AutoModel.from_pretrained(
-    "ai4bharat/indic-conformer-600m-multilingual",
-    trust_remote_code=True
-).to(DEVICE)
+def start_prefetch(sender: str) -> Optional[AccountPrefetch]:
+    if not PREFETCH_ENABLED:
+        return None
+    return AccountPrefetch(prefetch_client, sender, gateway_auth(sender)).start()
 
-FFMPEG_BIN = os.getenv("FFMPEG_PATH", "ffmpeg")
 
+# Fast path for simple intents (see fast_router.py)
 
-# Audio preprocessing
+fast_router = FastRouter(rasa_client)
 
-def ensure_wav_16k(input_path: str) -> str:
-    """
-    Make sure audio is mono 16kHz WAV; convert with ffmpeg if needed.
-    """
-    p = Path(input_path)
 
-    if p.suffix.lower() == ".wav":
-        return str(p)
+@app.on_event("startup")
+async def start_fast_router():
+    if FAST_PATH_ENABLED:
+        await run_in_threadpool(fast_router.start)
 
-    out_path = p.with_suffix(".wav")
 
-    cmd = [
-        FFMPEG_BIN,
-        "-y",
-        "-i", str(p),
-        "-ac", "1",
-        "-ar", "16000",
-        str(out_path),
-    ]
+# Traffic capture for replay (see traffic_capture.py)
+
+traffic_capture = TrafficCapture()
 
-    try:
-        subprocess.run(
-            cmd,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        print(f"[FFMPEG] Converted {p} -> {out_path}")
-    except Exception as e:
-        print("[FFMPEG ERROR]", e)
-        raise RuntimeError(f"Failed to convert {input_path} to wav") from e
 
-    return str(out_path)
+@app.on_event("startup")
+async def start_traffic_capture():
+    if TRAFFIC_CAPTURE_ENABLED:
+        traffic_capture.start()
+
+
+@app.on_event("shutdown")
+async def stop_traffic_capture():
+    await run_in_threadpool(traffic_capture.close)
 
 
 # ASR
 
-def run_asr(audio_path: str, lang_code: str) -> Dict[str, Any]:
-    """Run IndicConformer and return raw + normalized text."""
-    wav_path = ensure_wav_16k(audio_path)
+async def transcribe_speech(wav, lang_code: str) -> str:
+    """Trim silence, then run IndicConformer on the speech segments (batched together)."""
+    with span("vad"):
+        segments = await run_in_threadpool(speech_segments, wav)
+    if not segments:
+        print("[VAD] No speech detected, skipping ASR")
+        return ""
 
-    wav, sr = torchaudio.load(wav_path)
-    wav = torch.mean(wav, dim=0, keepdim=True)
+    with span("asr"):
+        texts = await asyncio.gather(*(asr_batcher.transcribe(seg, lang_code) for seg in segments))
+    return " ".join(t.strip() for t in texts if t and t.strip())
 
-    target_sample_rate = 16000
-    if sr != target_sample_rate:
-        resampler = torchaudio.transforms.Resample(orig_freq=sr, new_freq=target_sample_rate)
-        wav = resampler(wav)
 
-    wav = wav.to(DEVICE)
+async def run_asr(audio: bytes, filename: str, lang_code: str) -> Dict[str, Any]:
+    """Decode in memory, run IndicConformer (through the batcher), return raw + normalized text."""
+    with span("decode"):
+        wav = await run_in_threadpool(decode_audio_bytes, audio, filename)
 
-    raw_text = asr_model(wav, lang_code, "rnnt")
-    norm_text = normalize_text(raw_text, lang_code)
+    raw_text = await transcribe_speech(wav, lang_code)
+    with span("normalize"):
+        norm_text = normalize_text(raw_text, lang_code)
 
     return {
         "raw": raw_text,
@@ -186,28 +179,37 @@ def run_asr(audio_path: str, lang_code: str) -> Dict[str, Any]:
 
 # Rasa bridge
 
-def call_rasa(text: str, lang: str, sender: str = "cust_demo") -> List[Dict[str, Any]]:
+def turn_metadata(lang: str, sender: str, prefetch: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Message metadata the actions read (language, auth, request id, prefetched account data)."""
+    metadata = {
+        "lang": lang,
+        "auth": gateway_auth(sender),
+        "request_id": current_request_id(),
+    }
+    if prefetch:
+        metadata["prefetch"] = prefetch
+    return metadata
+
+
+async def call_rasa(
+    text: str,
+    lang: str,
+    sender: str = "cust_demo",
+    prefetch: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
     """Send one turn to Rasa REST channel and return its messages."""
     payload = {
         "sender": sender,
         "message": text,
-        "metadata": {
-            "lang": lang,
-            "auth": {
-                "user_id": sender,
-                "biometric_score": 0.92,
-                "liveness_passed": True,
-                "otp_verified": False,
-                "channel": "voice",
-                "risk_label": "low",
-            },
-        },
+        "metadata": turn_metadata(lang, sender),
     }
-    print("[VOICE_API] Sending to Rasa:", payload)
+    # Never log the metadata: it carries the auth block
+    print(f"[VOICE_API] Sending to Rasa: sender={sender} lang={lang} request_id={payload['metadata']['request_id']}")
+    if prefetch:
+        payload["metadata"]["prefetch"] = prefetch
 
-    resp = requests.post(RASA_REST_URL, json=payload, timeout=15)
-    resp.raise_for_status()
-    return resp.json()
+    with span("rasa"):
+        return await rasa_client.send(payload)
 
 
 # Response extraction
@@ -245,54 +247,251 @@ def extract_bot_and_audio(rasa_messages: List[Dict[str, Any]]) -> Dict[str, Opti
 
 @app.post("/api/voice-query")
 async def voice_query(
+    request: Request,
     file: UploadFile = File(...),
     lang: str = Form("hi"),
     sender_id: str = Form("cust_demo"),
 ) -> Dict[str, Any]:
     """
     Full pipeline: audio -> ASR -> Rasa -> TTS (path).
+
+    Account data is prefetched in parallel with ASR. Every stage is timed under one
+    request id (X-Request-ID if the client sends one), see telemetry.py.
     """
-    suffix = ".wav" if file.filename.endswith(".wav") else ".webm"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
+    if not model_lifecycle.ready:
+        raise HTTPException(status_code=503, detail="ASR model is still loading")
 
+    trace = start_trace(request.headers.get("x-request-id"))
+    prefetch = None
+    audio = b""
+    status = "error"
     try:
-        asr_out = run_asr(tmp_path, lang)
+        with span("upload_read"):
+            audio = await file.read()
+
+        if not audio:
+            # Nothing to decode: answer like silence, without the model or the bank
+            status = "no_speech"
+            return {"user_text": "", "bot_text": None, "audio_url": None, "lang": lang, "no_speech": True,
+                    "request_id": trace.request_id}
+
+        prefetch = start_prefetch(sender_id)
+        asr_out = await run_asr(audio, file.filename or "", lang)
         raw = asr_out["raw"]
         norm = asr_out["normalized"]
         print("\n[ASR] RAW TEXT:", raw)
         print("[ASR] NORMALIZED TEXT:", norm)
+        annotate("asr_raw", raw)
+        annotate("normalized", norm)
 
-        converted_text = convert_hindi_numbers_to_digits(norm)
-        print("[CONVERTED] TEXT:", converted_text)
+        if not norm.strip():
+            status = "no_speech"
+            return {"user_text": "", "bot_text": None, "audio_url": None, "lang": lang, "no_speech": True,
+                    "request_id": trace.request_id}
 
-        rasa_msgs = call_rasa(converted_text, lang, sender=sender_id)
-        print("[RASA] RESPONSES:", rasa_msgs)
+        reply = await answer_turn(norm, lang, sender_id, prefetch)
+        status = "ok"
+        return reply
+    finally:
+        if prefetch:
+            prefetch.cancel()
+        summary = finish_trace(trace)
+        traffic_capture.record_turn(trace, summary, "voice", sender_id, lang, audio, file.filename or "", status)
 
-        extracted = extract_bot_and_audio(rasa_msgs)
 
-        return {
-            "user_text": converted_text,
-            "bot_text": extracted["bot_text"],
-            "audio_url": extracted["audio_url"],
-            "lang": lang,
-        }
-    finally:
+async def answer_turn(
+    norm: str,
+    lang: str,
+    sender_id: str,
+    prefetch: Optional[AccountPrefetch] = None,
+) -> Dict[str, Any]:
+    """Normalized text -> digits -> fast path or Rasa -> reply text and audio path."""
+    with span("number_parse"):
+        converted_text = parse_numbers(norm, lang)
+    print("[CONVERTED] TEXT:", converted_text)
+    annotate("user_text", converted_text)
+
+    with span("prefetch_wait"):
+        prefetched = await prefetch.collect() if prefetch else None
+
+    rasa_msgs = None
+    route = "rasa"
+    # The fast path reads the tracker and appends to it later; keep the sender's turns in order
+    async with fast_router.sender_lock(sender_id):
+        if FAST_PATH_ENABLED:
+            with span("fast_path"):
+                rasa_msgs = await fast_router.handle(converted_text, sender_id, turn_metadata(lang, sender_id, prefetched))
+            if rasa_msgs is not None:
+                route = "fast_path"
+        if rasa_msgs is None:
+            rasa_msgs = await call_rasa(converted_text, lang, sender=sender_id, prefetch=prefetched)
+    print("[RASA] RESPONSES:", rasa_msgs)
+    annotate("route", route)
+    annotate("rasa_messages", rasa_msgs)
+
+    extracted = extract_bot_and_audio(rasa_msgs)
+
+    return {
+        "user_text": converted_text,
+        "bot_text": extracted["bot_text"],
+        "audio_url": extracted["audio_url"],
+        "lang": lang,
+        "request_id": current_request_id(),
+    }
+
+
+# Streaming endpoint
+
+@app.websocket("/ws/voice-query")
+async def voice_query_stream(
+    websocket: WebSocket,
+    lang: str = "hi",
+    sender_id: str = "cust_demo",
+):
+    """
+    Streaming pipeline over a WebSocket.
+
+    Client sends binary audio chunks while recording and {"type": "end"} when done.
+    Server sends {"type": "partial"} transcripts, {"type": "end_of_speech"} when it
+    hears the user stop, and one {"type": "final"} reply before closing.
+    """
+    await websocket.accept()
+    if not model_lifecycle.ready:
+        await websocket.send_json({"type": "error", "detail": "ASR model is still loading"})
+        await websocket.close(code=1013)
+        return
+
+    trace = start_trace(websocket.headers.get("x-request-id"), kind="stream")
+
+    async def transcribe(wav):
+        return await transcribe_speech(wav, lang)
+
+    async def send_partial(text: str):
+        await websocket.send_json({"type": "partial", "text": normalize_text(text, lang)})
+
+    session = StreamingSession(transcribe)
+    eos_wait = asyncio.create_task(session.end_of_speech.wait())
+    prefetch = start_prefetch(sender_id)
+    status = "error"
+
+    try:
+        while True:
+            recv = asyncio.create_task(websocket.receive())
+            done, _ = await asyncio.wait({recv, eos_wait}, return_when=asyncio.FIRST_COMPLETED)
+
+            if recv not in done:
+                recv.cancel()
+                await websocket.send_json({"type": "end_of_speech"})
+                break
+
+            msg = recv.result()
+            if msg["type"] == "websocket.disconnect":
+                status = "disconnected"
+                return
+
+            if msg.get("bytes"):
+                if not session.feed(msg["bytes"]):
+                    # Over the buffer cap: answer what was received
+                    await websocket.send_json({"type": "end_of_speech"})
+                    break
+                if session.partial_due():
+                    session.start_partial(send_partial)
+            elif msg.get("text"):
+                try:
+                    control = json.loads(msg["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "end":
+                    break
+
+        raw = await session.finalize()
+        norm = normalize_text(raw, lang)
+        print("\n[STREAM] RAW TEXT:", raw)
+        print("[STREAM] NORMALIZED TEXT:", norm)
+        annotate("asr_raw", raw)
+        annotate("normalized", norm)
+
+        if norm.strip():
+            reply = await answer_turn(norm, lang, sender_id, prefetch)
+            status = "ok"
+        else:
+            reply = {"user_text": "", "bot_text": None, "audio_url": None, "lang": lang, "no_speech": True,
+                     "request_id": trace.request_id}
+            status = "no_speech"
+        await websocket.send_json({"type": "final", **reply})
+        await websocket.close()
+    except WebSocketDisconnect:
+        status = "disconnected"
+    except Exception as e:
+        print("[STREAM ERROR]", repr(e))
         try:
-            os.remove(tmp_path)
+            await websocket.send_json({"type": "error", "detail": "voice stream failed"})
+            await websocket.close(code=1011)
         except Exception:
             pass
+    finally:
+        eos_wait.cancel()
+        if prefetch:
+            prefetch.cancel()
+        summary = finish_trace(trace)
+        if traffic_capture.enabled:
+            traffic_capture.record_turn(trace, summary, "stream", sender_id, lang, session.audio, session.filename, status)
+
+
+# ASR batching metrics
 
+@app.get("/api/asr/stats")
+async def asr_stats():
+    """Queue depth and batch-size metrics for the ASR batcher."""
+    return asr_batcher.stats()
 
-# Health check
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/fast-path/stats")
+async def fast_path_stats():
+    """How many turns the fast path answered, passed on, or fell back on."""
+    return fast_router.stats()
+
+
+@app.get("/api/capture/stats")
+async def capture_stats():
+    """Turns captured for replay, and any dropped because the writer fell behind."""
+    return traffic_capture.stats()
+
+
+# Health checks
 
 @app.get("/")
 async def health_check():
-    """Basic readiness probe for the voice gateway."""
+    """Service info for the voice gateway."""
     return {
-        "status": "ok",
+        "status": "ok" if model_lifecycle.ready else model_lifecycle.state,
         "service": "SahaYaa Voice Gateway",
         "device": DEVICE,
-        "rasa_url": RASA_REST_URL
+        "inference_backend": inference_pool.backend,
+        "model": model_lifecycle.status(),
+        "rasa_url": RASA_REST_URL,
+        "rasa_upstreams": rasa_client.urls,
     }
+
+
+@app.get("/healthz")
+async def liveness():
+    """Liveness: the process is serving. Fails only if the model load failed for good."""
+    if model_lifecycle.failed:
+        return JSONResponse(status_code=500, content={"status": "failed", "error": model_lifecycle.error})
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness: 200 once the ASR model is loaded, 503 while it is loading."""
+    status = model_lifecycle.status()
+    if not model_lifecycle.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
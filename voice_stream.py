@@ -0,0 +1,177 @@
+# voice_stream.py
+
+"""
+Streaming voice session for the WebSocket endpoint.
+
+Buffers audio chunks as the browser records them, re-decodes the growing buffer
+(MediaRecorder WebM chunks are not decodable on their own) and runs ASR at a fixed
+cadence to produce partial transcripts. The VAD (vad.py) on the decoded buffer
+detects end of speech, so the final transcript is usually ready by the time the
+user stops talking.
+
+Partials only recognize the last STREAM_PARTIAL_WINDOW_S seconds, so each pass
+costs the same however long the user talks. The final transcript always covers
+the whole utterance. The buffer is capped at STREAM_MAX_BYTES; past that the
+stream is ended as if the user had stopped.
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+import torch
+from starlette.concurrency import run_in_threadpool
+
+from audio_decode import TARGET_SAMPLE_RATE, decode_audio_bytes
+from telemetry import span
+from vad import speech_regions
+
+
+# Basic config
+STREAM_PARTIAL_INTERVAL_MS = float(os.getenv("STREAM_PARTIAL_INTERVAL_MS", "700"))
+STREAM_EOS_SILENCE_MS = float(os.getenv("STREAM_EOS_SILENCE_MS", "900"))
+STREAM_SILENCE_RMS = float(os.getenv("STREAM_SILENCE_RMS", "0.01"))
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "30"))
+STREAM_PARTIAL_WINDOW_S = float(os.getenv("STREAM_PARTIAL_WINDOW_S", "8"))
+# Default allows 16 kHz 16-bit PCM for STREAM_MAX_SECONDS, far above what Opus needs
+STREAM_MAX_BYTES = int(os.getenv("STREAM_MAX_BYTES", str(int(STREAM_MAX_SECONDS * 32000))))
+
+Transcriber = Callable[[torch.Tensor], Awaitable[str]]
+
+
+class StreamingSession:
+    """Per-connection audio buffer with partial ASR and end-of-speech detection."""
+
+    def __init__(
+        self,
+        transcribe: Transcriber,
+        filename: str = "stream.webm",
+        max_bytes: int = STREAM_MAX_BYTES,
+        window_s: float = STREAM_PARTIAL_WINDOW_S,
+    ):
+        self.transcribe = transcribe
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.window_len = int(TARGET_SAMPLE_RATE * window_s)
+
+        self._buffer = bytearray()
+        self._decoded_len = 0          # buffer size at last partial
+        self._last_partial_at = 0.0
+        self._partial_text = ""
+        self._partial_complete = False  # last partial covered the whole buffer
+        self._partial_task: Optional[asyncio.Task] = None
+        self.overflowed = False
+
+        self.end_of_speech = asyncio.Event()
+
+    # Input
+
+    def feed(self, chunk: bytes) -> bool:
+        """Append one recorder chunk; False (and end of speech) once the buffer cap is hit."""
+        if self.overflowed or len(self._buffer) + len(chunk) > self.max_bytes:
+            if not self.overflowed:
+                print(f"[STREAM] Buffer cap of {self.max_bytes} bytes reached, ending stream")
+            self.overflowed = True
+            self.end_of_speech.set()
+            return False
+        self._buffer.extend(chunk)
+        return True
+
+    @property
+    def audio(self) -> bytes:
+        """Everything received so far."""
+        return bytes(self._buffer)
+
+    @property
+    def partial_text(self) -> str:
+        return self._partial_text
+
+    def partial_due(self) -> bool:
+        """True when enough time has passed and a partial pass is not already running."""
+        if self._partial_task is not None and not self._partial_task.done():
+            return False
+        if len(self._buffer) == self._decoded_len:
+            return False
+        elapsed_ms = (time.monotonic() - self._last_partial_at) * 1000.0
+        return elapsed_ms >= STREAM_PARTIAL_INTERVAL_MS
+
+    # Recognition
+
+    async def _decode(self) -> Optional[torch.Tensor]:
+        data = bytes(self._buffer)
+        try:
+            with span("decode"):
+                return await run_in_threadpool(decode_audio_bytes, data, self.filename)
+        except Exception as e:
+            # A half-written cluster at the end of the buffer is expected mid-stream
+            print(f"[STREAM] decode skipped: {e!r}")
+            return None
+
+    def _check_end_of_speech(self, wav: torch.Tensor) -> None:
+        """Mark end of speech once speech was heard and the tail has been quiet long enough."""
+        tail_len = int(TARGET_SAMPLE_RATE * STREAM_EOS_SILENCE_MS / 1000.0)
+        total = wav.shape[-1]
+
+        if total >= TARGET_SAMPLE_RATE * STREAM_MAX_SECONDS:
+            self.end_of_speech.set()
+            return
+
+        regions = speech_regions(wav, min_rms=STREAM_SILENCE_RMS, pad_ms=0)
+        if regions and total - regions[-1][1] >= tail_len:
+            self.end_of_speech.set()
+
+    async def run_partial(self) -> Optional[str]:
+        """Decode what was received so far and transcribe its trailing window; returns new text or None."""
+        self._last_partial_at = time.monotonic()
+        size = len(self._buffer)
+
+        wav = await self._decode()
+        if wav is None or wav.numel() == 0:
+            return None
+
+        self._check_end_of_speech(wav)
+
+        complete = wav.shape[-1] <= self.window_len
+        text = await self.transcribe(wav if complete else wav[:, -self.window_len:])
+        self._decoded_len = size
+        self._partial_complete = complete
+        if text == self._partial_text:
+            return None
+        self._partial_text = text
+        return text
+
+    def start_partial(self, on_partial: Callable[[str], Awaitable[None]]) -> None:
+        """Run a partial pass in the background and report its text via on_partial."""
+
+        async def _job():
+            try:
+                text = await self.run_partial()
+                if text:
+                    await on_partial(text)
+            except Exception as e:
+                print("[STREAM] partial pass failed:", repr(e))
+
+        self._partial_task = asyncio.create_task(_job())
+
+    async def finalize(self) -> str:
+        """Return the transcript for the full buffer, reusing the last partial when current."""
+        if self._partial_task is not None:
+            try:
+                await self._partial_task
+            except Exception:
+                pass
+
+        if not self._buffer:
+            return ""
+        if len(self._buffer) == self._decoded_len and self._partial_complete:
+            return self._partial_text
+
+        wav = await self._decode()
+        if wav is None or wav.numel() == 0:
+            return self._partial_text
+
+        self._partial_text = await self.transcribe(wav)
+        self._decoded_len = len(self._buffer)
+        self._partial_complete = True
+        return self._partial_text